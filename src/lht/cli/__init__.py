@@ -6,9 +6,6 @@ This module provides argument parsing and command routing for the LHT CLI.
 
 import argparse
 from typing import List, Optional
-from lht.cli.commands.create_connection import snowflake
-from lht.cli.commands.list_connections import list_connections as list_connections_cmd
-from lht.cli.commands.edit_connection import edit_connection
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -31,11 +28,17 @@ Examples:
   lht edit-connection                  Edit an existing connection
   lht set-primary CONNECTION           Set a connection as primary
   lht sync --sobject Account --table ACCOUNT  Sync Salesforce Account to Snowflake
+  lht sync --sobject Account --table ACCOUNT --orgs emea,apac  Sync Account from several orgs into one table
   lht retl upsert --sobject Account --match-field External_Id__c --sql "SELECT ..."  Push data from Snowflake into Salesforce
   lht list-jobs                        List Bulk API 2.0 jobs from Salesforce
   lht show-job <JOB_ID>                Show details about a specific Bulk API 2.0 job
   lht delete-job <JOB_ID>              Delete a specific Bulk API 2.0 job
   lht get-job-results <JOB_ID>         Download ingest job results as CSV files
+  lht limits                           Show remaining Salesforce API and Bulk API allocations
+  lht cache warm --sobjects Account,Contact  Pre-fetch SObject describes into the local cache
+  lht cache clear                      Remove cached SObject describes
+  lht plan show --sobject Account      Show the saved sync plan for Account
+  lht plan refresh --sobject Account --table ACCOUNT  Recompile a sync plan
         """
     )
     
@@ -113,12 +116,12 @@ Examples:
     sync_parser.add_argument(
         '--sobject',
         required=True,
-        help='Salesforce object name (e.g., Account, Contact)'
+        help='Salesforce object name (e.g., Account, Contact); comma-separated to sync several objects in one run'
     )
     sync_parser.add_argument(
         '--table',
         required=True,
-        help='Snowflake table name'
+        help='Snowflake table name; comma-separated, one per object, with several objects'
     )
     
     # Optional arguments with defaults from connection
@@ -181,6 +184,48 @@ Examples:
         '--where',
         help='Optional SOQL WHERE clause to append to the Salesforce query (e.g., "IsPersonAccount = False")'
     )
+    sync_parser.add_argument(
+        '--api-reserve-pct',
+        type=float,
+        metavar='PCT',
+        help='Percent of daily Salesforce API/Bulk allocations to leave untouched (default: 10)'
+    )
+    sync_parser.add_argument(
+        '--sf-timeout',
+        type=float,
+        metavar='SECONDS',
+        help='Seconds to wait for a Salesforce response (default: 300)'
+    )
+    sync_parser.add_argument(
+        '--sf-retries',
+        type=int,
+        metavar='N',
+        help='Retries of transient Salesforce failures (connection errors, 429/5xx) per request (default: 4)'
+    )
+    sync_parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        metavar='N',
+        help='Upper bound of Salesforce requests in flight per org; the adaptive limit stays below it (default: 32)'
+    )
+    sync_parser.add_argument(
+        '--reuse-job-max-age',
+        type=float,
+        metavar='MINUTES',
+        help='Reuse a completed Bulk API job with the same query if it is at most this old (default: 60; 0 disables)'
+    )
+    sync_parser.add_argument(
+        '--orgs',
+        metavar='NAMES',
+        help='Comma-separated Salesforce connection names; syncs every org into one table with an ORG_ID column'
+    )
+    sync_parser.add_argument(
+        '--sessions',
+        type=int,
+        default=1,
+        metavar='N',
+        help='With --orgs or several objects, load them in parallel through a pool of N Snowflake sessions (default: 1)'
+    )
 
     # retl command
     retl_parser = subparsers.add_parser(
@@ -218,8 +263,71 @@ Examples:
     retl_parser.add_argument(
         '--batch-size',
         type=int,
-        default=25000,
-        help='Upsert batch size (default: 25000)'
+        metavar='ROWS',
+        help='Upsert: maximum rows per Bulk ingest job (default: no row limit, jobs are split by --job-size-mb)'
+    )
+    retl_parser.add_argument(
+        '--job-size-mb',
+        type=float,
+        default=100.0,
+        metavar='MB',
+        help='Upsert: maximum CSV upload per Bulk ingest job in MB (default: 100)'
+    )
+    retl_parser.add_argument(
+        '--max-in-flight',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Upsert: number of Bulk ingest jobs running at once while later batches are read (default: 1)'
+    )
+    retl_parser.add_argument(
+        '--parent-field',
+        metavar='FIELD',
+        help='Upsert: parent lookup column (e.g. AccountId); all rows of a parent go into the same job so parallel jobs avoid UNABLE_TO_LOCK_ROW (not with --changed-columns)'
+    )
+    retl_parser.add_argument(
+        '--retry-attempts',
+        type=int,
+        metavar='N',
+        help='Upsert: rounds of re-sending records that failed for a transient reason such as UNABLE_TO_LOCK_ROW (default: 3, 0 disables)'
+    )
+    retl_parser.add_argument(
+        '--retry-rows',
+        type=int,
+        metavar='ROWS',
+        help='Upsert: maximum rows per retry job (default: 10000)'
+    )
+    retl_parser.add_argument(
+        '--retry-error',
+        action='append',
+        metavar='CODE',
+        help='Upsert: also retry records failing with this status code, e.g. UNKNOWN_EXCEPTION (repeatable; default: lock, timeout and server-unavailable codes only)'
+    )
+    retl_parser.add_argument(
+        '--parallel-retries',
+        action='store_true',
+        help='Upsert: let retry jobs of different batches run at the same time (default: one retry job at a time)'
+    )
+    retl_parser.add_argument(
+        '--collections-threshold',
+        type=int,
+        metavar='ROWS',
+        help='Send sources of at most ROWS rows through REST sObject Collections (200 records per call) instead of Bulk API jobs (default: 1000, 0 disables)'
+    )
+    retl_parser.add_argument(
+        '--delta',
+        action='store_true',
+        help='Upsert/update: send only rows that are new or changed since the last successful push (row hashes kept in --state-table)'
+    )
+    retl_parser.add_argument(
+        '--changed-columns',
+        action='store_true',
+        help='Upsert/update: like --delta, but send only the changed columns, one job group per set of changed columns'
+    )
+    retl_parser.add_argument(
+        '--state-table',
+        metavar='TABLE',
+        help='--delta/--changed-columns: Snowflake table holding pushed row hashes (default: LOGS.RETL_STATE)'
     )
     retl_parser.add_argument(
         '--snowflake',
@@ -241,6 +349,30 @@ Examples:
         action='store_true',
         help='Show detailed progress and debug output'
     )
+    retl_parser.add_argument(
+        '--api-reserve-pct',
+        type=float,
+        metavar='PCT',
+        help='Percent of daily Salesforce API/Bulk allocations to leave untouched (default: 10)'
+    )
+    retl_parser.add_argument(
+        '--sf-timeout',
+        type=float,
+        metavar='SECONDS',
+        help='Seconds to wait for a Salesforce response (default: 300)'
+    )
+    retl_parser.add_argument(
+        '--sf-retries',
+        type=int,
+        metavar='N',
+        help='Retries of transient Salesforce failures (connection errors, 429/5xx) per request (default: 4)'
+    )
+    retl_parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        metavar='N',
+        help='Upper bound of Salesforce requests in flight per org; the adaptive limit stays below it (default: 32)'
+    )
     
     # list-jobs command
     list_jobs_parser = subparsers.add_parser(
@@ -322,6 +454,83 @@ Examples:
         help='Salesforce API version (default: v58.0)'
     )
     
+    # limits command
+    limits_parser = subparsers.add_parser(
+        'limits',
+        help='Show remaining Salesforce API and Bulk API allocations',
+        description='Show daily Salesforce API request and Bulk API allocations for an org'
+    )
+    limits_parser.add_argument(
+        '--salesforce',
+        metavar='NAME',
+        help='Salesforce connection name (defaults to primary connection)'
+    )
+    limits_parser.add_argument(
+        '--all',
+        action='store_true',
+        dest='show_all',
+        help='Show every limit returned by Salesforce'
+    )
+    
+    # cache command
+    cache_parser = subparsers.add_parser(
+        'cache',
+        help='Manage the local SObject describe cache',
+        description='Warm or clear the SObject describe cache in ~/.solomo/cache/describe'
+    )
+    cache_parser.add_argument(
+        'action',
+        choices=['clear', 'warm'],
+        help='Action to perform'
+    )
+    cache_parser.add_argument(
+        '--sobjects',
+        help='Comma-separated SObject names (required for warm; limits clear to these objects)'
+    )
+    cache_parser.add_argument(
+        '--salesforce',
+        metavar='NAME',
+        help='Salesforce connection name (warm: defaults to primary; clear: only this org)'
+    )
+    
+    # plan command
+    plan_parser = subparsers.add_parser(
+        'plan',
+        help='Show or recompile saved sync plans',
+        description='Show or recompile the compiled sync plans in ~/.solomo/plans'
+    )
+    plan_parser.add_argument(
+        'action',
+        choices=['show', 'refresh'],
+        help='Action to perform'
+    )
+    plan_parser.add_argument(
+        '--sobject',
+        help='Salesforce object name (required for refresh; filters show)'
+    )
+    plan_parser.add_argument(
+        '--table',
+        help='Snowflake table name (required for refresh; filters show)'
+    )
+    plan_parser.add_argument(
+        '--schema',
+        help='Snowflake schema (refresh; defaults to connection if available)'
+    )
+    plan_parser.add_argument(
+        '--database',
+        help='Snowflake database (refresh; defaults to connection if available)'
+    )
+    plan_parser.add_argument(
+        '--snowflake',
+        metavar='NAME',
+        help='Snowflake connection name (refresh; defaults to primary connection)'
+    )
+    plan_parser.add_argument(
+        '--salesforce',
+        metavar='NAME',
+        help='Salesforce connection name (refresh; defaults to primary connection)'
+    )
+    
     return parser
 
 
@@ -341,6 +550,7 @@ def main(args: Optional[List[str]] = None) -> int:
     # Route to appropriate command handler
     if parsed_args.command == 'create-connection':
         if parsed_args.snowflake:
+            from lht.cli.commands.create_connection import snowflake
             return snowflake()
         elif parsed_args.salesforce:
             from lht.cli.commands.create_connection import salesforce
@@ -348,8 +558,10 @@ def main(args: Optional[List[str]] = None) -> int:
         else:
             parser.error("Connection type required. Use --snowflake or --salesforce")
     elif parsed_args.command == 'list-connections':
-        return list_connections_cmd()
+        from lht.cli.commands.list_connections import list_connections
+        return list_connections()
     elif parsed_args.command == 'edit-connection':
+        from lht.cli.commands.edit_connection import edit_connection
         return edit_connection()
     elif parsed_args.command == 'set-primary':
         from lht.cli.commands.set_primary import set_primary
@@ -373,7 +585,14 @@ def main(args: Optional[List[str]] = None) -> int:
             force_bulk_api=parsed_args.force_bulk_api,
             existing_job_id=parsed_args.existing_job_id,
             delete_job=not parsed_args.no_delete_job,
-            where_clause=parsed_args.where
+            where_clause=parsed_args.where,
+            api_reserve_pct=parsed_args.api_reserve_pct,
+            reuse_job_max_age=parsed_args.reuse_job_max_age,
+            orgs=parsed_args.orgs,
+            sessions=parsed_args.sessions,
+            sf_timeout=parsed_args.sf_timeout,
+            sf_retries=parsed_args.sf_retries,
+            max_concurrency=parsed_args.max_concurrency
         )
     elif parsed_args.command == 'list-jobs':
         from lht.cli.commands.list_jobs import list_jobs
@@ -411,10 +630,49 @@ def main(args: Optional[List[str]] = None) -> int:
             sql_file=parsed_args.sql_file,
             match_field=parsed_args.match_field,
             batch_size=parsed_args.batch_size,
+            max_in_flight=parsed_args.max_in_flight,
+            job_size_mb=parsed_args.job_size_mb,
+            delta=parsed_args.delta,
+            changed_columns=parsed_args.changed_columns,
+            parent_field=parsed_args.parent_field,
+            retry_attempts=parsed_args.retry_attempts,
+            retry_rows=parsed_args.retry_rows,
+            retry_errors=parsed_args.retry_error,
+            parallel_retries=parsed_args.parallel_retries,
+            collections_threshold=parsed_args.collections_threshold,
+            state_table=parsed_args.state_table,
             snowflake_connection=parsed_args.snowflake,
             salesforce_connection=parsed_args.salesforce,
             log_results=parsed_args.log_results,
-            verbose=parsed_args.verbose
+            verbose=parsed_args.verbose,
+            api_reserve_pct=parsed_args.api_reserve_pct,
+            sf_timeout=parsed_args.sf_timeout,
+            sf_retries=parsed_args.sf_retries,
+            max_concurrency=parsed_args.max_concurrency
+        )
+    elif parsed_args.command == 'limits':
+        from lht.cli.commands.limits import limits
+        return limits(
+            salesforce_connection=parsed_args.salesforce,
+            show_all=parsed_args.show_all
+        )
+    elif parsed_args.command == 'cache':
+        from lht.cli.commands.cache import cache
+        return cache(
+            action=parsed_args.action,
+            sobjects=parsed_args.sobjects,
+            salesforce_connection=parsed_args.salesforce
+        )
+    elif parsed_args.command == 'plan':
+        from lht.cli.commands.plan import plan
+        return plan(
+            action=parsed_args.action,
+            sobject=parsed_args.sobject,
+            table=parsed_args.table,
+            schema=parsed_args.schema,
+            database=parsed_args.database,
+            snowflake_connection=parsed_args.snowflake,
+            salesforce_connection=parsed_args.salesforce
         )
     
     # No command provided
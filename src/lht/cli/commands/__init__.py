@@ -1,13 +1,30 @@
 """
 Command implementations for LHT CLI.
+
+Commands are imported on first access (PEP 562) so that running one command
+doesn't import the dependencies of every other command.
 """
 
-from lht.cli.commands.create_connection import snowflake, salesforce
-from lht.cli.commands.list_connections import list_connections
-from lht.cli.commands.edit_connection import edit_connection
-from lht.cli.commands.set_primary import set_primary
-from lht.cli.commands.sync_sobject import sync_sobject
-from lht.cli.commands.connect import connect
+import importlib
+
+# Exported name -> module that defines it
+_LAZY_EXPORTS = {
+    'snowflake': 'lht.cli.commands.create_connection',
+    'salesforce': 'lht.cli.commands.create_connection',
+    'list_connections': 'lht.cli.commands.list_connections',
+    'edit_connection': 'lht.cli.commands.edit_connection',
+    'set_primary': 'lht.cli.commands.set_primary',
+    'sync_sobject': 'lht.cli.commands.sync_sobject',
+    'connect': 'lht.cli.commands.connect',
+}
 
 __all__ = ['snowflake', 'salesforce', 'list_connections', 'edit_connection', 'set_primary', 'sync_sobject', 'connect']
 
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
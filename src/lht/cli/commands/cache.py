@@ -0,0 +1,59 @@
+"""
+Describe cache command implementation.
+"""
+
+from typing import Optional
+
+
+def cache(action: str, sobjects: Optional[str] = None, salesforce_connection: Optional[str] = None) -> int:
+    """
+    Warm or clear the local SObject describe cache.
+
+    Args:
+        action: 'warm' or 'clear'
+        sobjects: Comma-separated SObject names
+        salesforce_connection: Optional Salesforce connection name (defaults to primary for warm)
+
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    try:
+        from lht.salesforce import describe_cache
+        from lht.user.salesforce_auth import get_salesforce_access_info
+
+        names = [name.strip() for name in sobjects.split(',') if name.strip()] if sobjects else []
+
+        if action == 'clear':
+            instance_url = None
+            if salesforce_connection:
+                instance_url = get_salesforce_access_info(connection_name=salesforce_connection)['instance_url']
+            removed = 0
+            for name in names or [None]:
+                removed += describe_cache.clear(instance_url=instance_url, sobject=name)
+            print(f"✅ Removed {removed} cached describe(s) from {describe_cache.get_cache_dir()}")
+            return 0
+
+        if not names:
+            print("Error: --sobjects is required for 'lht cache warm'")
+            return 1
+
+        try:
+            access_info = get_salesforce_access_info(connection_name=salesforce_connection)
+        except ValueError as e:
+            print(f"Error: {e}")
+            print("\nPlease create a Salesforce connection first using:")
+            print("  lht create-connection --salesforce")
+            return 1
+
+        results = describe_cache.warm(access_info, names)
+        for name, ok in results.items():
+            print(f"{'✅' if ok else '❌'} {name}")
+        failed = [name for name, ok in results.items() if not ok]
+        print(f"\nCached {len(results) - len(failed)} of {len(results)} describe(s) for {access_info['instance_url']}")
+        return 1 if failed else 0
+
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
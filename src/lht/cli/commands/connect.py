@@ -3,7 +3,6 @@ Connect command implementation - verify a connection works.
 """
 
 import sys
-from lht.user.auth import create_session
 from lht.user.salesforce_auth import get_salesforce_access_info
 from lht.user.connections import load_connection
 
@@ -50,6 +49,9 @@ def connect(connection_name: str) -> int:
 def _verify_snowflake(connection_name: str) -> int:
     """Verify a Snowflake connection."""
     try:
+        # Snowpark is only needed for Snowflake connections
+        from lht.user.auth import create_session
+        
         # create_session() already tests the connection and prints success/failure
         session = create_session(connection_name=connection_name)
         
@@ -84,12 +86,12 @@ def _verify_snowflake(connection_name: str) -> int:
 def _verify_salesforce(connection_name: str) -> int:
     """Verify a Salesforce connection."""
     try:
-        # get_salesforce_access_info() already authenticates and validates
-        access_info = get_salesforce_access_info(connection_name)
+        # Authenticate from scratch rather than reusing a cached token
+        access_info = get_salesforce_access_info(connection_name, use_cache=False)
         
         # Make a simple API call to verify it works
         print("Verifying connection with API call...")
-        import requests
+        from lht.salesforce import client
         
         headers = {
             "Authorization": f"Bearer {access_info['access_token']}",
@@ -97,7 +99,7 @@ def _verify_salesforce(connection_name: str) -> int:
         }
         url = f"{access_info['instance_url']}/services/data/v58.0/sobjects"
         
-        response = requests.get(url, headers=headers)
+        response = client.get(access_info, url, headers=headers)
         response.raise_for_status()
         
         print()
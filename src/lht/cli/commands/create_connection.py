@@ -3,8 +3,6 @@ Create connection command implementations.
 """
 
 import sys
-from lht.user.auth import authenticate
-from lht.user.salesforce_auth import authenticate_salesforce
 
 
 def snowflake() -> int:
@@ -18,6 +16,7 @@ def snowflake() -> int:
         Exit code (0 for success, 1 for error)
     """
     try:
+        from lht.user.auth import authenticate
         credentials = authenticate()
         
         if credentials:
@@ -50,6 +49,7 @@ def salesforce() -> int:
         Exit code (0 for success, 1 for error)
     """
     try:
+        from lht.user.salesforce_auth import authenticate_salesforce
         credentials = authenticate_salesforce()
         
         if credentials:
@@ -0,0 +1,70 @@
+"""
+Show Salesforce API limits command implementation.
+"""
+
+from typing import Optional
+from tabulate import tabulate
+
+# Limits shown by default; --all shows every entry returned by /limits
+DEFAULT_LIMITS = [
+    'DailyApiRequests',
+    'DailyBulkV2QueryJobs',
+    'DailyBulkV2QueryFileStorageMB',
+    'DailyBulkApiBatches',
+]
+
+
+def limits(salesforce_connection: Optional[str] = None, show_all: bool = False) -> int:
+    """
+    Show remaining daily Salesforce API and Bulk API allocations.
+
+    Args:
+        salesforce_connection: Optional Salesforce connection name (defaults to primary)
+        show_all: Show every limit returned by Salesforce, not only the API/Bulk ones
+
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    try:
+        from lht.user.salesforce_auth import get_salesforce_access_info
+        from lht.salesforce import limits as sf_limits
+
+        try:
+            access_info = get_salesforce_access_info(connection_name=salesforce_connection)
+        except ValueError as e:
+            print(f"Error: {e}")
+            print("\nPlease create a Salesforce connection first using:")
+            print("  lht create-connection --salesforce")
+            return 1
+
+        governor = sf_limits.get_governor(access_info)
+        org_limits = governor.refresh_limits(access_info, force=True)
+        if not org_limits:
+            print("Error: Could not retrieve limits from Salesforce")
+            return 1
+
+        names = sorted(org_limits) if show_all else [name for name in DEFAULT_LIMITS if name in org_limits]
+        table_data = []
+        for name in names:
+            entry = org_limits[name]
+            maximum = entry.get('Max', 0)
+            remaining = entry.get('Remaining', 0)
+            pct = (100.0 * remaining / maximum) if maximum else 0.0
+            table_data.append([name, f"{maximum - remaining:,}", f"{maximum:,}", f"{remaining:,}", f"{pct:.1f}%"])
+
+        print("\n" + "=" * 80)
+        print(f"Salesforce Limits ({access_info['instance_url']})")
+        print("=" * 80)
+        print()
+        print(tabulate(table_data, headers=['Limit', 'Used', 'Max', 'Remaining', 'Remaining %'], tablefmt='grid'))
+        print()
+        print(f"Reserve: {governor.api_reserve_pct:.1f}% of API requests, "
+              f"{governor.bulk_reserve_pct:.1f}% of Bulk allocations")
+        print()
+        return 0
+
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
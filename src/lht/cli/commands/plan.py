@@ -0,0 +1,101 @@
+"""
+Sync plan command implementation.
+"""
+
+import time
+from typing import Optional
+
+
+def plan(action: str,
+         sobject: Optional[str] = None,
+         table: Optional[str] = None,
+         schema: Optional[str] = None,
+         database: Optional[str] = None,
+         snowflake_connection: Optional[str] = None,
+         salesforce_connection: Optional[str] = None) -> int:
+    """
+    Show or recompile saved sync plans.
+
+    Args:
+        action: 'show' or 'refresh'
+        sobject: SObject name (required for refresh; filters show)
+        table: Snowflake table name (required for refresh; filters show)
+        schema: Snowflake schema (refresh; defaults to the connection's schema)
+        database: Snowflake database (refresh; defaults to the connection's database)
+        snowflake_connection: Snowflake connection name (refresh; defaults to primary)
+        salesforce_connection: Salesforce connection name (refresh; defaults to primary)
+
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    try:
+        from lht.salesforce import sync_plan
+
+        if action == 'show':
+            plans = sync_plan.list_plans(sobject=sobject, table=table)
+            if not plans:
+                print(f"No sync plans found in {sync_plan.get_plan_dir()}")
+                return 0
+            for saved in plans:
+                _print_plan(saved, detailed=len(plans) == 1)
+            return 0
+
+        if not sobject or not table:
+            print("Error: --sobject and --table are required for 'lht plan refresh'")
+            return 1
+
+        from lht.user.connections import get_primary_connection, load_connection
+        from lht.util import catalog
+        from lht.cli.commands import startup
+
+        if snowflake_connection is None:
+            snowflake_connection = get_primary_connection('snowflake')
+        if snowflake_connection is None:
+            print("Error: No Snowflake connection specified and no primary Snowflake connection found.")
+            return 1
+        if salesforce_connection is None:
+            salesforce_connection = get_primary_connection('salesforce')
+        if salesforce_connection is None:
+            print("Error: No Salesforce connection specified and no primary Salesforce connection found.")
+            return 1
+
+        snowflake_creds = load_connection(snowflake_connection) or {}
+        schema = schema or snowflake_creds.get('schema')
+        if not schema:
+            print("Error: Schema is required. Please specify --schema or ensure your Snowflake connection has a schema configured.")
+            return 1
+
+        session, access_info, _ = startup.connect(snowflake_connection, salesforce_connection)
+        try:
+            database = database or snowflake_creds.get('database') or catalog.get_catalog(session).current_database()
+            compiled = sync_plan.get_plan(session, access_info, sobject, database, schema, table, refresh=True)
+        finally:
+            session.close()
+
+        print(f"✅ Recompiled sync plan for {sobject} -> {database}.{schema}.{table}")
+        _print_plan(compiled, detailed=False)
+        return 0
+
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+def _print_plan(saved, detailed: bool = False) -> None:
+    """Print a plan summary; with detailed, also its SOQL and SQL."""
+    compiled_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(saved.get('compiled_at', 0)))
+    print(f"\n📐 {saved['sobject']} -> {saved['database']}.{saved['schema']}.{saved['table']}")
+    print(f"   Org:          {saved['instance_url']}")
+    print(f"   Compiled:     {compiled_at}")
+    print(f"   Fields:       {len(saved['query_fields'])} queried of {len(saved['fields'])}")
+    if saved.get('excluded_fields'):
+        print(f"   Excluded:     {', '.join(saved['excluded_fields'])}")
+    print(f"   Describe fp:  {saved['describe_fingerprint'][:16]}")
+    print(f"   Table fp:     {saved['table_fingerprint'][:16]}")
+    if detailed:
+        print(f"\nSOQL:\n{saved['soql']}")
+        print(f"\nDDL:\n{saved['create_table_sql']}")
+        if saved.get('cast_select'):
+            print(f"\nCast SELECT:\n{saved['cast_select']}")
@@ -6,11 +6,10 @@ Push data from Snowflake into Salesforce using Bulk API 2.0 Ingest.
 
 import sys
 import logging
-from typing import Optional
+from typing import List, Optional
 
-from lht.user.auth import create_session
-from lht.user.salesforce_auth import get_salesforce_access_info
 from lht.user.connections import get_primary_connection, load_connection
+from lht.cli.commands import startup
 
 
 def _read_sql(sql: Optional[str], sql_file: Optional[str]) -> str:
@@ -27,23 +26,78 @@ def _read_sql(sql: Optional[str], sql_file: Optional[str]) -> str:
     raise ValueError("One of --sql or --sql-file is required")
 
 
+def _report_batches(result, job_ids, final_failures, collections_runs) -> None:
+    """
+    Print the summary of a batched push (upsert or delta update) and collect its jobs for logging.
+    """
+    if result and (result.get('records_failed') or result.get('records_recovered')):
+        codes = ', '.join(f"{code}: {count:,}" for code, count in result['failure_codes'].items())
+        print(f"🔁 Failed records: {result['records_failed']:,}{f' ({codes})' if codes else ''}, "
+              f"recovered by retries: {result['records_recovered']:,}")
+    if result and result.get('contention'):
+        report = result['contention']
+        print(f"🔒 Lock contention: {report['risk']} ({report['parents']:,} parents in {report['jobs']} jobs, "
+              f"{report['shared_parents']} shared across jobs, {report['straddling_parents']} straddling internal chunks)")
+    # Extract job IDs from batch results
+    if result and 'batch_results' in result:
+        for batch in result['batch_results']:
+            if batch.get('job_id'):
+                job_ids.append(batch['job_id'])
+                if 'failures' in batch:
+                    # Recovered rows succeeded in a retry job; log only what is still failing
+                    final_failures[batch['job_id']] = [
+                        {'sf__Id': '', 'sf__Error': failure['error'], **failure['record']}
+                        for failure in batch['failures']
+                    ]
+                    for retry_job_id in batch.get('retry_job_ids', ()):
+                        job_ids.append(retry_job_id)
+                        final_failures[retry_job_id] = []
+            elif batch.get('engine') == 'collections':
+                collections_runs.append((batch['run_id'], batch['successful_results'], batch['failed_results']))
+
+
 def retl(
     operation: str,
     sobject: str,
     sql: Optional[str] = None,
     sql_file: Optional[str] = None,
     match_field: Optional[str] = None,
-    batch_size: int = 25000,
+    batch_size: Optional[int] = None,
+    max_in_flight: int = 1,
+    job_size_mb: float = 100.0,
+    delta: bool = False,
+    changed_columns: bool = False,
+    parent_field: Optional[str] = None,
+    retry_attempts: Optional[int] = None,
+    retry_rows: Optional[int] = None,
+    retry_errors: Optional[List[str]] = None,
+    parallel_retries: bool = False,
+    collections_threshold: Optional[int] = None,
+    state_table: Optional[str] = None,
     snowflake_connection: Optional[str] = None,
     salesforce_connection: Optional[str] = None,
     log_results: bool = False,
     verbose: bool = False,
+    api_reserve_pct: Optional[float] = None,
+    sf_timeout: Optional[float] = None,
+    sf_retries: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
 ) -> int:
     """
     Run a Reverse ETL operation using a Snowflake SQL query as the source.
 
     Notes:
       - Salesforce API version remains hardcoded inside the existing RETL implementation.
+      - api_reserve_pct overrides the share of daily API/Bulk allocations left untouched.
+      - sf_timeout / sf_retries / max_concurrency tune the Salesforce HTTP client and its adaptive concurrency.
+      - max_in_flight sets how many upsert ingest jobs run at once.
+      - Upsert jobs are split at job_size_mb of CSV (and batch_size rows, if given).
+      - delta upserts/updates only rows changed since the last push (hashes kept in state_table).
+      - changed_columns also narrows each job to the columns that changed.
+      - parent_field keeps all rows of a parent record in one job (lock-contention-aware partitioning).
+      - retry_attempts / retry_rows / parallel_retries configure the re-drive of transient upsert failures;
+        retry_errors adds status codes (e.g. UNKNOWN_EXCEPTION) to the retried ones.
+      - Sources of at most collections_threshold rows go through sObject Collections instead of Bulk API (0 disables).
     """
     # Set logging level based on verbose flag
     log_level = logging.DEBUG if verbose else logging.INFO
@@ -57,8 +111,14 @@ def retl(
     try:
         op = operation.lower().strip()
         sql_text = _read_sql(sql, sql_file).strip()
-        # Normalize so LIMIT/OFFSET concatenation in retl.upsert stays valid
+        # A trailing semicolon would break the single-statement source query
         sql_text = sql_text.rstrip(";")
+        if (delta or changed_columns) and op not in ("upsert", "update"):
+            print("Error: --delta and --changed-columns only apply to upsert and update")
+            return 1
+        if parent_field and changed_columns:
+            print("Error: --parent-field can't be combined with --changed-columns")
+            return 1
 
         # Resolve connections (use primary if not provided)
         if snowflake_connection is None:
@@ -80,16 +140,30 @@ def retl(
             return 1
 
         print(f"✓ Using Snowflake connection: {snowflake_connection}")
-        print("✓ Connecting to Snowflake...")
-        session = create_session(connection_name=snowflake_connection)
-        print("✓ Connected to Snowflake")
-
         print(f"✓ Using Salesforce connection: {salesforce_connection}")
+
+        startup.configure_salesforce_http(timeout=sf_timeout, max_retries=sf_retries, max_concurrency=max_concurrency)
+
+        # Connect to Snowflake and authenticate with Salesforce in parallel
+        print("✓ Connecting to Snowflake...")
         print("✓ Authenticating with Salesforce...")
-        access_info = get_salesforce_access_info(salesforce_connection)
+        session, access_info, timings = startup.connect(
+            snowflake_connection,
+            salesforce_connection,
+            warehouse=snowflake_creds.get("warehouse"),
+        )
+        print("✓ Connected to Snowflake")
         print("✓ Authenticated with Salesforce")
+        print(f"⏱ Startup: {startup.format_timings(timings)}")
 
         from lht.salesforce import retl as retl_mod
+        from lht.salesforce import limits as sf_limits
+        from lht.salesforce import retl_retry
+        from lht.salesforce import sobject_collections
+        sobject_collections.configure(max_rows=collections_threshold)
+        retl_retry.configure(max_attempts=retry_attempts, max_rows_per_job=retry_rows,
+                             serial=False if parallel_retries else None, extra_errors=retry_errors)
+        sf_limits.configure(api_reserve_pct=api_reserve_pct, bulk_reserve_pct=api_reserve_pct)
 
         print("\n" + "=" * 60)
         print("RETL Configuration")
@@ -98,7 +172,14 @@ def retl(
         print(f"Salesforce Object: {sobject}")
         if op == "upsert":
             print(f"Match Field: {match_field}")
-            print(f"Batch Size: {batch_size:,}")
+            print(f"Job Size: {job_size_mb:,.0f} MB" + (f" / {batch_size:,} rows" if batch_size else ""))
+            print(f"Jobs In Flight: {max_in_flight}")
+            print(f"Delta: {'Changed columns' if changed_columns else 'Yes' if delta else 'No'}")
+            if parent_field:
+                print(f"Parent Field: {parent_field}")
+        elif op == "update":
+            print(f"Delta: {'Changed columns' if changed_columns else 'Yes' if delta else 'No'}")
+        print(f"sObject Collections: up to {sobject_collections.max_rows():,} rows" if sobject_collections.max_rows() else "sObject Collections: Off")
         print(f"Log Results: {'Yes' if log_results else 'No'}")
         print("=" * 60)
         if verbose:
@@ -108,8 +189,11 @@ def retl(
             print("-" * 40)
         print()
 
-        # Collect job IDs for logging
+        # Collect job IDs for logging; sObject Collections runs carry their results
         job_ids = []
+        collections_runs = []
+        # Jobs whose failures were re-driven: failure rows to log instead of their failedResults
+        final_failures = {}
 
         if op == "upsert":
             if not match_field:
@@ -122,48 +206,80 @@ def retl(
                 query=sql_text,
                 field=match_field,
                 batch_size=batch_size,
+                max_in_flight=max_in_flight,
+                max_bytes=int(job_size_mb * 1024 * 1024),
+                delta=delta,
+                by_column=changed_columns,
+                state_table=state_table or retl_mod.retl_state.STATE_TABLE,
+                parent_field=parent_field,
             )
-            # Extract job IDs from batch results
-            if result and 'batch_results' in result:
-                for batch in result['batch_results']:
-                    if batch.get('job_id'):
-                        job_ids.append(batch['job_id'])
+            _report_batches(result, job_ids, final_failures, collections_runs)
         elif op == "insert":
             result = retl_mod.insert(session, access_info, sobject, sql_text)
-            if result and 'id' in result:
-                job_ids.append(result['id'])
+            if result and result.get('engine') == 'collections':
+                collections_runs.append((result['id'], result['successful_results'], result['failed_results']))
+            elif result and 'id' in result:
+                job_ids.extend(result.get('job_ids', [result['id']]))
+        elif op == "update" and (delta or changed_columns):
+            result = retl_mod.update(
+                session,
+                access_info,
+                sobject,
+                sql_text,
+                delta=delta,
+                by_column=changed_columns,
+                state_table=state_table or retl_mod.retl_state.STATE_TABLE,
+            )
+            _report_batches(result, job_ids, final_failures, collections_runs)
         elif op == "update":
             result = retl_mod.update(session, access_info, sobject, sql_text)
-            if result and 'id' in result:
-                job_ids.append(result['id'])
+            if result and result.get('engine') == 'collections':
+                collections_runs.append((result['id'], result['successful_results'], result['failed_results']))
+            elif result and 'id' in result:
+                job_ids.extend(result.get('job_ids', [result['id']]))
         elif op == "delete":
             # retl.delete signature includes `field` but it's unused; pass None for compatibility
             result = retl_mod.delete(session, access_info, sobject, sql_text, field=None)
-            if result and 'id' in result:
-                job_ids.append(result['id'])
+            if result and result.get('engine') == 'collections':
+                collections_runs.append((result['id'], result['successful_results'], result['failed_results']))
+            elif result and 'id' in result:
+                job_ids.extend(result.get('job_ids', [result['id']]))
         else:
             print("Error: operation must be one of: upsert, insert, update, delete")
             return 1
 
-        if log_results and job_ids:
-            from lht.salesforce.results_bapi import process_bulk_api_results
+        if result and result.get('engine') == 'collections':
+            failed_count = result.get('numberRecordsFailed', result.get('records_failed', 0))
+            print(f"⚡ Sent through sObject Collections: {failed_count:,} failed record(s)")
+
+        if log_results and (job_ids or collections_runs):
+            from lht.salesforce.results_bapi import process_bulk_api_results, process_collections_results
             print("\n" + "=" * 60)
             print("Logging Results to Snowflake")
             print("=" * 60)
             for job_id in job_ids:
                 print(f"📋 Processing results for job: {job_id}")
                 try:
-                    log_result = process_bulk_api_results(session, access_info, job_id)
+                    log_result = process_bulk_api_results(session, access_info, job_id,
+                                                          failures=final_failures.get(job_id))
                     if log_result.get('success'):
                         print(f"   ✅ Logged: {log_result.get('success_count', 0)} success, {log_result.get('failure_count', 0)} failures")
                     else:
                         print(f"   ⚠️ Logging failed: {log_result.get('error', 'Unknown error')}")
                 except Exception as log_error:
                     print(f"   ⚠️ Error logging results: {log_error}")
+            for run_id, successful, failed in collections_runs:
+                print(f"📋 Processing results for sObject Collections run: {run_id}")
+                log_result = process_collections_results(session, run_id, successful, failed)
+                if log_result.get('success'):
+                    print(f"   ✅ Logged: {log_result.get('success_count', 0)} success, {log_result.get('failure_count', 0)} failures")
+                else:
+                    print(f"   ⚠️ Logging failed: {log_result.get('error', 'Unknown error')}")
             print("=" * 60)
-        elif log_results and not job_ids:
+        elif log_results:
             print("⚠️ No job IDs to log (operation may have had no records to process)")
 
+        print(f"Salesforce API usage: {sf_limits.format_usage(sf_limits.usage_snapshot(access_info))}")
         print("✓ RETL completed successfully")
         return 0
 
@@ -0,0 +1,109 @@
+"""
+Shared startup for commands that need both Snowflake and Salesforce.
+
+The Snowflake JWT handshake and the Salesforce OAuth flow are independent
+network round trips, so they run concurrently. Once the session exists the
+warehouse resume is submitted asynchronously, overlapping with whatever is
+left of the Salesforce authentication and with the command's own setup.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+
+def connect(snowflake_connection: str,
+            salesforce_connection: Optional[str] = None,
+            warehouse: Optional[str] = None) -> Tuple[Any, Optional[Dict[str, Any]], Dict[str, float]]:
+    """
+    Open a Snowflake session and authenticate to Salesforce in parallel.
+
+    Args:
+        snowflake_connection: Snowflake connection name
+        salesforce_connection: Salesforce connection name (None skips Salesforce)
+        warehouse: Warehouse to resume as soon as the session is open
+
+    Returns:
+        tuple: (session, access_info or None, step latencies in seconds)
+
+    Raises:
+        Exception: Whatever the Snowflake or Salesforce authentication raised
+    """
+    from lht.user.auth import create_session
+    from lht.user.salesforce_auth import get_salesforce_access_info
+
+    timings: Dict[str, float] = {}
+    start = time.time()
+
+    def _salesforce():
+        step_start = time.time()
+        try:
+            return get_salesforce_access_info(salesforce_connection)
+        finally:
+            timings['salesforce_auth'] = time.time() - step_start
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='lht-startup') as executor:
+        salesforce_future = executor.submit(_salesforce) if salesforce_connection else None
+
+        step_start = time.time()
+        session = create_session(connection_name=snowflake_connection)
+        timings['snowflake_session'] = time.time() - step_start
+
+        if warehouse:
+            step_start = time.time()
+            _resume_warehouse(session, warehouse)
+            timings['warehouse_resume_submit'] = time.time() - step_start
+
+        access_info = salesforce_future.result() if salesforce_future else None
+
+    timings['total'] = time.time() - start
+    return session, access_info, timings
+
+
+def configure_salesforce_http(timeout: Optional[float] = None,
+                              max_retries: Optional[int] = None,
+                              max_concurrency: Optional[int] = None) -> None:
+    """
+    Apply the Salesforce HTTP options of a command.
+
+    Called before the first Salesforce request, so every client and
+    concurrency controller is created with these settings. ``None`` keeps
+    the default.
+
+    Args:
+        timeout: Seconds to wait for a Salesforce response
+        max_retries: Retries of transient Salesforce failures per request
+        max_concurrency: Upper bound of Salesforce requests in flight per org
+    """
+    from lht.salesforce import client, concurrency
+
+    client.configure(timeout=(client.CONNECT_TIMEOUT, timeout) if timeout else None, max_retries=max_retries)
+    concurrency.configure(max_limit=max_concurrency)
+
+
+def _resume_warehouse(session, warehouse: str) -> None:
+    """Submit a warehouse resume without waiting for it; failures are left to the first real query."""
+    try:
+        session.sql(f"ALTER WAREHOUSE IF EXISTS {warehouse} RESUME IF SUSPENDED").collect_nowait()
+    except Exception:
+        # Missing OPERATE privilege is fine: the warehouse auto-resumes on first use
+        pass
+
+
+def format_timings(timings: Dict[str, float]) -> str:
+    """
+    One-line summary of startup latencies.
+
+    Args:
+        timings: Latencies returned by ``connect``
+
+    Returns:
+        str: e.g. "Snowflake 2.31s, Salesforce 0.84s (parallel), total 2.35s"
+    """
+    parts = [f"Snowflake {timings.get('snowflake_session', 0):.2f}s"]
+    if 'salesforce_auth' in timings:
+        parts.append(f"Salesforce {timings['salesforce_auth']:.2f}s (parallel)")
+    if 'warehouse_resume_submit' in timings:
+        parts.append(f"warehouse resume submitted in {timings['warehouse_resume_submit']:.2f}s")
+    parts.append(f"total {timings.get('total', 0):.2f}s")
+    return ', '.join(parts)
@@ -5,10 +5,12 @@ Sync Salesforce object command implementation.
 import sys
 import logging
 from typing import Optional
-from lht.user.auth import create_session
 from lht.user.salesforce_auth import get_salesforce_access_info
 from lht.user.connections import get_primary_connection, load_connection
 from lht.salesforce import sync_sobject_intelligent
+from lht.salesforce import limits as sf_limits
+from lht.salesforce import job_reuse
+from lht.cli.commands import startup
 
 
 def sync_sobject(
@@ -25,14 +27,24 @@ def sync_sobject(
     force_bulk_api: bool = False,
     existing_job_id: Optional[str] = None,
     delete_job: bool = True,
-    where_clause: Optional[str] = None
+    where_clause: Optional[str] = None,
+    api_reserve_pct: Optional[float] = None,
+    reuse_job_max_age: Optional[float] = None,
+    orgs: Optional[str] = None,
+    sessions: int = 1,
+    sf_timeout: Optional[float] = None,
+    sf_retries: Optional[int] = None,
+    max_concurrency: Optional[int] = None
 ) -> int:
     """
     Sync a Salesforce object to Snowflake.
     
+    Several comma-separated objects (with one table each) are synced in one
+    run: their describes are fetched in batches up front.
+    
     Args:
-        sobject: Salesforce object name (required)
-        table: Snowflake table name (required)
+        sobject: Salesforce object name, or comma-separated names (required)
+        table: Snowflake table name, or comma-separated names, one per object (required)
         schema: Snowflake schema (optional, uses connection default if available)
         database: Snowflake database (optional, uses connection default if available)
         snowflake_connection: Snowflake connection name (optional, uses primary if not specified)
@@ -45,6 +57,13 @@ def sync_sobject(
         existing_job_id: Optional existing Bulk API job ID to use
         delete_job: Whether to delete the Bulk API job after completion (default: True)
         where_clause: Optional SOQL WHERE clause to filter records (e.g., "IsPersonAccount = False")
+        api_reserve_pct: Percent of daily Salesforce API/Bulk allocations to leave untouched
+        reuse_job_max_age: Minutes within which a completed Bulk API job with the same query is reused (0 disables)
+        orgs: Comma-separated Salesforce connection names to sync into one table keyed on (ORG_ID, ID)
+        sessions: Number of pooled Snowflake sessions used to load orgs or objects in parallel
+        sf_timeout: Seconds to wait for a Salesforce response (default: 300)
+        sf_retries: Retries of transient Salesforce failures per request (default: 4)
+        max_concurrency: Upper bound of Salesforce requests in flight per org (default: 32)
         
     Returns:
         Exit code (0 for success, 1 for error)
@@ -58,6 +77,19 @@ def sync_sobject(
     )
     
     try:
+        sobjects = [name.strip() for name in sobject.split(',') if name.strip()]
+        tables = [name.strip() for name in table.split(',') if name.strip()]
+        if len(sobjects) != len(tables):
+            print(f"Error: --table needs one table per object ({len(sobjects)} objects, {len(tables)} tables)")
+            return 1
+        if len(sobjects) > 1:
+            if orgs:
+                print("Error: --orgs syncs one object at a time")
+                return 1
+            if use_stage or existing_job_id or where_clause:
+                print("Error: --use-stage, --existing-job-id and --where apply to a single object")
+                return 1
+        
         # Get Snowflake connection
         if snowflake_connection is None:
             snowflake_connection = get_primary_connection('snowflake')
@@ -109,54 +141,79 @@ def sync_sobject(
             print("Error: Schema is required. Please specify --schema or ensure your Snowflake connection has a schema configured.")
             return 1
         
-        # Create Snowflake session
-        print(f"✓ Connecting to Snowflake...")
-        session = create_session(connection_name=snowflake_connection)
-        print(f"✓ Connected to Snowflake")
-        
-        # Get Salesforce connection
-        if salesforce_connection is None:
-            salesforce_connection = get_primary_connection('salesforce')
+        if not orgs:
+            # Get Salesforce connection
             if salesforce_connection is None:
-                # Try to find a Salesforce connection automatically
-                from lht.user.connections import list_connections as get_all_connections
-                all_connections = get_all_connections()
-                salesforce_connections = []
-                for conn_name in all_connections:
-                    conn_details = load_connection(conn_name)
-                    if conn_details:
-                        conn_type = conn_details.get('connection_type', 'snowflake').lower()
-                        if conn_type == 'salesforce':
-                            salesforce_connections.append(conn_name)
+                salesforce_connection = get_primary_connection('salesforce')
+                if salesforce_connection is None:
+                    # Try to find a Salesforce connection automatically
+                    from lht.user.connections import list_connections as get_all_connections
+                    all_connections = get_all_connections()
+                    salesforce_connections = []
+                    for conn_name in all_connections:
+                        conn_details = load_connection(conn_name)
+                        if conn_details:
+                            conn_type = conn_details.get('connection_type', 'snowflake').lower()
+                            if conn_type == 'salesforce':
+                                salesforce_connections.append(conn_name)
                 
-                if len(salesforce_connections) == 1:
-                    # Only one Salesforce connection, use it automatically
-                    salesforce_connection = salesforce_connections[0]
-                    print(f"ℹ Using the only available Salesforce connection: {salesforce_connection}")
-                elif len(salesforce_connections) > 1:
-                    print("Error: No Salesforce connection specified and no primary Salesforce connection found.")
-                    print(f"Found {len(salesforce_connections)} Salesforce connections: {', '.join(salesforce_connections)}")
-                    print("Please specify a connection with --salesforce or set a primary connection using:")
-                    print("  lht edit-connection")
-                    return 1
-                else:
-                    print("Error: No Salesforce connection specified and no primary Salesforce connection found.")
-                    print("Please create a Salesforce connection first using:")
-                    print("  lht create-connection --salesforce")
-                    return 1
+                    if len(salesforce_connections) == 1:
+                        # Only one Salesforce connection, use it automatically
+                        salesforce_connection = salesforce_connections[0]
+                        print(f"ℹ Using the only available Salesforce connection: {salesforce_connection}")
+                    elif len(salesforce_connections) > 1:
+                        print("Error: No Salesforce connection specified and no primary Salesforce connection found.")
+                        print(f"Found {len(salesforce_connections)} Salesforce connections: {', '.join(salesforce_connections)}")
+                        print("Please specify a connection with --salesforce or set a primary connection using:")
+                        print("  lht edit-connection")
+                        return 1
+                    else:
+                        print("Error: No Salesforce connection specified and no primary Salesforce connection found.")
+                        print("Please create a Salesforce connection first using:")
+                        print("  lht create-connection --salesforce")
+                        return 1
         
-        print(f"✓ Using Salesforce connection: {salesforce_connection}")
-        
-        # Authenticate with Salesforce and get access_info
-        print(f"✓ Authenticating with Salesforce...")
-        access_info = get_salesforce_access_info(salesforce_connection)
-        print(f"✓ Authenticated with Salesforce")
+            print(f"✓ Using Salesforce connection: {salesforce_connection}")
         
         # Validate stage_name if use_stage is True
         if use_stage and not stage_name:
             print("Error: --stage-name is required when --use-stage is specified")
             return 1
         
+        startup.configure_salesforce_http(timeout=sf_timeout, max_retries=sf_retries, max_concurrency=max_concurrency)
+
+        # Connect to Snowflake and authenticate with Salesforce in parallel
+        print(f"✓ Connecting to Snowflake...")
+        if not orgs:
+            print(f"✓ Authenticating with Salesforce...")
+        session, access_info, timings = startup.connect(
+            snowflake_connection,
+            None if orgs else salesforce_connection,
+            warehouse=snowflake_creds.get('warehouse')
+        )
+        print(f"✓ Connected to Snowflake")
+        if not orgs:
+            print(f"✓ Authenticated with Salesforce")
+        print(f"⏱ Startup: {startup.format_timings(timings)}")
+        
+        sf_limits.configure(api_reserve_pct=api_reserve_pct, bulk_reserve_pct=api_reserve_pct)
+        if reuse_job_max_age is not None:
+            job_reuse.configure(max_age_seconds=reuse_job_max_age * 60, enabled=reuse_job_max_age > 0)
+        
+        if orgs:
+            return _sync_multi_org(
+                session, orgs, sobject, table, schema, database,
+                force_full_sync, delete_job, where_clause,
+                snowflake_connection=snowflake_connection, sessions=sessions
+            )
+        
+        if len(sobjects) > 1:
+            return _sync_multi_object(
+                session, access_info, dict(zip(sobjects, tables)), schema, database,
+                match_field, force_full_sync, delete_job,
+                snowflake_connection=snowflake_connection, sessions=sessions
+            )
+        
         # Display sync configuration
         print("\n" + "=" * 60)
         print("Sync Configuration")
@@ -196,7 +253,8 @@ def sync_sobject(
             force_bulk_api=force_bulk_api,
             existing_job_id=existing_job_id,
             delete_job=delete_job,
-            where_clause=where_clause
+            where_clause=where_clause,
+            database=database
         )
         
         # Display results
@@ -209,6 +267,8 @@ def sync_sobject(
         print(f"Duration: {result.get('sync_duration_seconds', 0):.2f} seconds")
         if result.get('last_modified_date'):
             print(f"Last Modified Date: {result.get('last_modified_date')}")
+        if result.get('api_usage'):
+            print(f"Salesforce API: {sf_limits.format_usage(result['api_usage'])}")
         print("=" * 60)
         
         if result.get('sync_method') == 'failed':
@@ -227,3 +287,127 @@ def sync_sobject(
         traceback.print_exc()
         return 1
 
+
+def _sync_multi_org(session, orgs: str, sobject: str, table: str, schema: str, database: Optional[str],
+                    force_full_sync: bool, delete_job: bool, where_clause: Optional[str],
+                    snowflake_connection: Optional[str] = None, sessions: int = 1) -> int:
+    """
+    Sync one object from several Salesforce connections into a single table.
+    
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    from lht.salesforce.multi_org import sync_sobject_multi_org
+    
+    connection_names = [name.strip() for name in orgs.split(',') if name.strip()]
+    if not connection_names:
+        print("Error: --orgs requires at least one Salesforce connection name")
+        return 1
+    
+    access_infos = {}
+    for name in connection_names:
+        print(f"✓ Authenticating with Salesforce connection: {name}...")
+        access_infos[name] = get_salesforce_access_info(name)
+    print(f"✓ Authenticated with {len(access_infos)} Salesforce org(s)")
+    
+    session_pool = None
+    if sessions > 1:
+        from lht.user.session_pool import SessionPool
+        session_pool = SessionPool(connection_name=snowflake_connection, size=sessions)
+        print(f"✓ Using a pool of up to {sessions} Snowflake sessions")
+    
+    print("\nStarting multi-org sync...")
+    try:
+        result = sync_sobject_multi_org(
+            session=session,
+            access_infos=access_infos,
+            sobject=sobject,
+            schema=schema,
+            table=table,
+            database=database,
+            force_full_sync=force_full_sync,
+            where_clause=where_clause,
+            delete_job=delete_job,
+            session_pool=session_pool
+        )
+    finally:
+        if session_pool is not None:
+            session_pool.close()
+    
+    print("\n" + "=" * 60)
+    print("Multi-Org Sync Results")
+    print("=" * 60)
+    print(f"Target Table: {result['target_table']}")
+    print(f"Sync Method: {result['sync_method']}")
+    for name, org in result['orgs'].items():
+        status = "✓" if org['success'] else "✗"
+        line = f"{status} {name} ({org['org_id']}): {org['records']:,} records"
+        if org['error']:
+            line += f" - {org['error']}"
+        print(line)
+        print(f"    Salesforce API: {sf_limits.format_usage(org['api_usage'])}")
+    print(f"Total Records: {result['actual_records']:,}")
+    print(f"Duration: {result['sync_duration_seconds']:.2f} seconds")
+    print("=" * 60)
+    
+    if not result['success']:
+        print("\n✗ Multi-org sync completed with errors")
+        return 1
+    print("\n✓ Multi-org sync completed successfully")
+    return 0
+
+
+def _sync_multi_object(session, access_info, tables: dict, schema: str, database: Optional[str],
+                       match_field: str, force_full_sync: bool, delete_job: bool,
+                       snowflake_connection: Optional[str] = None, sessions: int = 1) -> int:
+    """
+    Sync several objects from one Salesforce connection, each into its own table.
+    
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    from lht.salesforce.intelligent_sync import sync_sobjects_intelligent
+    
+    session_pool = None
+    if sessions > 1:
+        from lht.user.session_pool import SessionPool
+        session_pool = SessionPool(connection_name=snowflake_connection, size=sessions)
+        print(f"✓ Using a pool of up to {sessions} Snowflake sessions")
+    
+    print(f"\nStarting sync of {len(tables)} objects...")
+    try:
+        results = sync_sobjects_intelligent(
+            session=session,
+            access_info=access_info,
+            sobjects=list(tables),
+            schema=schema,
+            tables=tables,
+            match_field=match_field,
+            force_full_sync=force_full_sync,
+            delete_job=delete_job,
+            database=database,
+            session_pool=session_pool
+        )
+    finally:
+        if session_pool is not None:
+            session_pool.close()
+    
+    print("\n" + "=" * 60)
+    print("Sync Results")
+    print("=" * 60)
+    failed = 0
+    for name, result in results.items():
+        if result.get('sync_method') == 'failed':
+            failed += 1
+            print(f"✗ {name} -> {tables[name]}: {result.get('error', 'failed')}")
+        else:
+            print(f"✓ {name} -> {tables[name]}: {result.get('actual_records', 0):,} records "
+                  f"({result.get('sync_method', 'unknown')}, {result.get('sync_duration_seconds', 0):.2f} seconds)")
+    print(f"Salesforce API: {sf_limits.format_usage(sf_limits.usage_snapshot(access_info))}")
+    print("=" * 60)
+    
+    if failed:
+        print(f"\n✗ {failed} of {len(results)} object syncs failed")
+        return 1
+    print("\n✓ Sync completed successfully")
+    return 0
@@ -1,26 +1,53 @@
-from .sobjects import describe
-from .sobject_query import query_records
-from .sobject_create import create
-from .intelligent_sync import sync_sobject_intelligent, IntelligentSync
-from .query_bapi20 import (
-    create_batch_query,
-    query_status,
-    delete_query,
-    get_query_ids,
-    get_bulk_results,
-    get_bulk_results_direct,
-    cleanup_completed_jobs,
-    delete_specific_job
-)
-from ..util.data_writer import (
-    write_dataframe_to_table, 
-    write_batch_to_temp_table, 
-    write_batch_to_main_table,
-    validate_dataframe_types,
-    standardize_dataframe_types,
-    write_dataframe_with_type_handling
-)
-from ..util.table_creator import (
-    create_salesforce_table,
-    ensure_table_exists_for_dataframe
-)
\ No newline at end of file
+"""
+Salesforce extraction, sync and Bulk API helpers.
+
+Exports are resolved on first access (PEP 562) so that importing a light
+module such as ``lht.salesforce.jobs`` doesn't pull in pandas and Snowpark
+through the sync modules.
+"""
+
+import importlib
+
+# Exported name -> module that defines it
+_LAZY_EXPORTS = {
+    'describe': '.sobjects',
+    'query_records': '.sobject_query',
+    'create': '.sobject_create',
+    'sync_sobject_intelligent': '.intelligent_sync',
+    'sync_sobjects_intelligent': '.intelligent_sync',
+    'IntelligentSync': '.intelligent_sync',
+    'sync_sobject_multi_org': '.multi_org',
+    'ApiLimitsGovernor': '.limits',
+    'ApiLimitReserveError': '.limits',
+    'create_batch_query': '.query_bapi20',
+    'query_status': '.query_bapi20',
+    'delete_query': '.query_bapi20',
+    'get_query_ids': '.query_bapi20',
+    'get_bulk_results': '.query_bapi20',
+    'get_bulk_results_direct': '.query_bapi20',
+    'cleanup_completed_jobs': '.query_bapi20',
+    'delete_specific_job': '.query_bapi20',
+    'write_dataframe_to_table': '..util.data_writer',
+    'write_batch_to_temp_table': '..util.data_writer',
+    'write_batch_to_main_table': '..util.data_writer',
+    'validate_dataframe_types': '..util.data_writer',
+    'standardize_dataframe_types': '..util.data_writer',
+    'write_dataframe_with_type_handling': '..util.data_writer',
+    'create_salesforce_table': '..util.table_creator',
+    'ensure_table_exists_for_dataframe': '..util.table_creator',
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
@@ -0,0 +1,361 @@
+"""
+Shared HTTP client for Salesforce.
+
+One ``SalesforceClient`` is kept per Salesforce instance. It owns a pooled
+keep-alive ``requests.Session``, applies timeouts, retries transient failures
+(429/502/503/504 and connection errors) with jittered exponential backoff for
+idempotent calls, and records per-call latency. When ``access_info`` can
+refresh itself (``lht.user.salesforce_auth.SalesforceAccessInfo``), a 401 is
+answered with one token refresh and a retry of the request.
+
+Describe, query, Bulk API and ingest modules send their requests through
+``request`` so that org-wide concerns such as API limit throttling
+(``lht.salesforce.limits``) and adaptive concurrency
+(``lht.salesforce.concurrency``) are applied to every call in one place.
+"""
+
+import time
+import random
+import threading
+import logging
+from collections import deque
+from typing import Dict, Any, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import concurrency
+from . import limits
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: throttling and gateway/availability errors
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# Methods that can be repeated without side effects
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+# Path endings of calls that move bulk data (query result pages, ingest
+# uploads and result downloads); their latency follows the payload size
+TRANSFER_ENDPOINTS = ('/results', '/batches', '/successfulResults', '/failedResults', '/unprocessedrecords')
+
+# Seconds to wait for a connection to Salesforce
+CONNECT_TIMEOUT = 10.0
+
+# Defaults applied to every client; changed with configure()
+_defaults = {
+    'max_retries': 4,
+    'backoff_base': 0.5,
+    'backoff_max': 30.0,
+    'timeout': (CONNECT_TIMEOUT, 300.0),
+    'pool_maxsize': 32,
+}
+
+_clients: Dict[str, 'SalesforceClient'] = {}
+_clients_lock = threading.Lock()
+
+
+class SalesforceClient:
+    """
+    Pooled, retrying HTTP client for one Salesforce instance.
+    """
+
+    def __init__(self,
+                 instance_url: str,
+                 max_retries: int = 4,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 30.0,
+                 timeout: Union[float, Tuple[float, float]] = (10.0, 300.0),
+                 pool_maxsize: int = 32):
+        """
+        Initialize the client.
+
+        Args:
+            instance_url: Salesforce instance URL
+            max_retries: Retries for transient failures of idempotent calls
+            backoff_base: First backoff delay in seconds (doubles per attempt, with full jitter)
+            backoff_max: Upper bound for a single backoff delay
+            timeout: Requests timeout, seconds or (connect, read) tuple
+            pool_maxsize: Keep-alive connections kept open to the instance
+        """
+        self.instance_url = instance_url
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._lock = threading.Lock()
+        self.retries = 0
+        self._latency: Dict[str, Dict[str, Any]] = {}
+
+    def send(self, method: str, url: str, call_type: str = 'rest', **kwargs: Any) -> requests.Response:
+        """
+        Send a single HTTP attempt over the pooled session and record its latency.
+
+        Args:
+            method: HTTP method
+            url: Absolute request URL
+            call_type: Kind of call, used to group latency statistics
+            **kwargs: Passed through to ``requests.Session.request``
+
+        Returns:
+            requests.Response: The response
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.time()
+        try:
+            return self.session.request(method, url, **kwargs)
+        finally:
+            self._record_latency(call_type, time.time() - start)
+
+    def request(self, access_info: Dict[str, str], method: str, url: str,
+                call_type: str = 'rest', creates_job: bool = False,
+                retry: Optional[bool] = None, **kwargs: Any) -> requests.Response:
+        """
+        Send a request with limit throttling, adaptive concurrency and retries.
+
+        See the module level ``request`` for arguments.
+        """
+        method = method.upper()
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+
+        governor = limits.get_governor(access_info)
+        controller = concurrency.get_controller(access_info)
+        can_refresh = callable(getattr(access_info, 'refresh', None))
+        # Past the reserve only new work is refused; polls and downloads of running jobs go on
+        new_work = limits.starts_new_work(call_type, url, creates_job)
+
+        # File-like upload bodies are rewound so a resent request carries the whole payload
+        body = kwargs.get('data')
+        body_position = body.tell() if hasattr(body, 'seek') and hasattr(body, 'tell') else None
+
+        attempt = 0
+        refreshed = False
+        while True:
+            if can_refresh:
+                _use_current_token(access_info, kwargs)
+            if body_position is not None:
+                body.seek(body_position)
+
+            governor.before_request(access_info, call_type, creates_job, new_work=new_work)
+
+            failure = None
+            with controller.slot():
+                start = time.time()
+                try:
+                    response = self.send(method, url, call_type, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    controller.record_throttle(type(e).__name__)
+                    if not retry or attempt >= self.max_retries:
+                        raise
+                    failure = e
+                latency = time.time() - start
+
+            # Back off outside the slot so a waiting retry doesn't hold concurrency
+            if failure is not None:
+                attempt += 1
+                self._backoff(attempt, None, f"{type(failure).__name__} on {method} {call_type}")
+                continue
+
+            governor.record_response(response, call_type)
+
+            # An expired or revoked session was not processed; renew the token once and resend
+            if response.status_code == 401 and can_refresh and not refreshed:
+                refreshed = True
+                stale_token = _bearer_token(kwargs) or access_info['access_token']
+                access_info.refresh(stale_token)
+                logger.info(f"🔑 Retrying {method} {call_type} with a refreshed access token")
+                continue
+
+            reason = concurrency.throttle_reason(response)
+            if reason:
+                controller.record_throttle(reason)
+            elif response.ok:
+                # Transfers get their own baseline and never count as latency congestion:
+                # a multi-MB page is slow because it is large, not because the org is loaded
+                transfer = _is_transfer(url)
+                controller.record_success(latency, f"{call_type}_transfer" if transfer else call_type,
+                                          check_latency=not transfer)
+
+            if retry and response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                attempt += 1
+                self._backoff(attempt, response.headers.get('Retry-After'), f"HTTP {response.status_code} on {method} {call_type}")
+                continue
+
+            if creates_job and response.ok:
+                governor.record_job_created(call_type)
+            return response
+
+    def _backoff(self, attempt: int, retry_after: Optional[str], reason: str) -> None:
+        """Sleep before the next attempt: Retry-After if given, otherwise full-jitter exponential backoff."""
+        delay = None
+        if retry_after:
+            try:
+                delay = min(float(retry_after), self.backoff_max)
+            except ValueError:
+                delay = None
+        if delay is None:
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+        with self._lock:
+            self.retries += 1
+        logger.warning(f"🔁 Retrying Salesforce call ({reason}), attempt {attempt}/{self.max_retries} in {delay:.1f}s")
+        time.sleep(delay)
+
+    def _record_latency(self, call_type: str, latency: float) -> None:
+        with self._lock:
+            stats = self._latency.get(call_type)
+            if stats is None:
+                stats = {'count': 0, 'total': 0.0, 'max': 0.0, 'recent': deque(maxlen=200)}
+                self._latency[call_type] = stats
+            stats['count'] += 1
+            stats['total'] += latency
+            stats['max'] = max(stats['max'], latency)
+            stats['recent'].append(latency)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Latency statistics per call type and the retry count.
+
+        Returns:
+            dict: {'retries': int, 'latency': {call_type: {count, avg, p50, p95, max}}}
+        """
+        with self._lock:
+            latency = {}
+            for call_type, stats in self._latency.items():
+                recent = sorted(stats['recent'])
+                latency[call_type] = {
+                    'count': stats['count'],
+                    'avg': round(stats['total'] / stats['count'], 4),
+                    'p50': round(recent[len(recent) // 2], 4),
+                    'p95': round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 4),
+                    'max': round(stats['max'], 4),
+                }
+            return {'instance_url': self.instance_url, 'retries': self.retries, 'latency': latency}
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.session.close()
+
+
+def _is_transfer(url: str) -> bool:
+    """True if a URL is a bulk data transfer endpoint (see TRANSFER_ENDPOINTS)."""
+    return url.split('?', 1)[0].rstrip('/').endswith(TRANSFER_ENDPOINTS)
+
+
+def _bearer_token(kwargs: Dict[str, Any]) -> Optional[str]:
+    """Token in the Authorization header of a request, if any."""
+    auth = (kwargs.get('headers') or {}).get('Authorization', '')
+    return auth[len('Bearer '):] if auth.startswith('Bearer ') else None
+
+
+def _use_current_token(access_info: Dict[str, str], kwargs: Dict[str, Any]) -> None:
+    """
+    Replace a stale bearer token in the request headers with the current one.
+
+    Callers build their headers once and reuse them; after a refresh this
+    keeps those requests from each taking a 401 first.
+    """
+    token = _bearer_token(kwargs)
+    if token is not None and token != access_info['access_token']:
+        kwargs['headers'] = dict(kwargs['headers'], Authorization=f"Bearer {access_info['access_token']}")
+
+
+def configure(**settings) -> None:
+    """
+    Change the settings used by all clients.
+
+    Accepts any of: max_retries, backoff_base, backoff_max, timeout,
+    pool_maxsize. ``None`` values are ignored. ``pool_maxsize`` only affects
+    clients created afterwards.
+    """
+    unknown = set(settings) - set(_defaults)
+    if unknown:
+        raise ValueError(f"Unknown client settings: {', '.join(sorted(unknown))}")
+    updates = {key: value for key, value in settings.items() if value is not None}
+    with _clients_lock:
+        _defaults.update(updates)
+        for sf_client in _clients.values():
+            for key, value in updates.items():
+                if key != 'pool_maxsize':
+                    setattr(sf_client, key, value)
+
+
+def get_client(access_info: Dict[str, str]) -> SalesforceClient:
+    """
+    Return the shared client for the instance in ``access_info``.
+
+    Args:
+        access_info: Dictionary containing 'instance_url'
+
+    Returns:
+        SalesforceClient: Client shared by all calls to that instance
+    """
+    instance_url = access_info['instance_url'].rstrip('/')
+    with _clients_lock:
+        sf_client = _clients.get(instance_url)
+        if sf_client is None:
+            sf_client = SalesforceClient(instance_url, **_defaults)
+            _clients[instance_url] = sf_client
+        return sf_client
+
+
+def http_snapshot(access_info: Dict[str, str]) -> Dict[str, Any]:
+    """Convenience wrapper returning ``get_client(access_info).snapshot()``."""
+    return get_client(access_info).snapshot()
+
+
+def request(access_info: Dict[str, str], method: str, url: str,
+            call_type: str = 'rest', creates_job: bool = False,
+            retry: Optional[bool] = None, **kwargs: Any) -> requests.Response:
+    """
+    Send an HTTP request to Salesforce.
+
+    Args:
+        access_info: Dictionary containing 'access_token' and 'instance_url'
+        method: HTTP method ('GET', 'POST', 'PATCH', 'PUT', 'DELETE')
+        url: Absolute request URL
+        call_type: Kind of call for limit accounting and latency statistics
+                   ('describe', 'query', 'bulk_query', 'bulk_ingest', 'rest')
+        creates_job: True if the call creates a Bulk API job
+        retry: Retry transient failures (default: only for idempotent methods)
+        **kwargs: Passed through to ``requests`` (headers, json, data, params, timeout, ...)
+
+    Returns:
+        requests.Response: The response (status is not checked)
+
+    Raises:
+        limits.ApiLimitReserveError: If the call starts new work that would consume reserved allocation
+    """
+    return get_client(access_info).request(access_info, method, url, call_type=call_type,
+                                           creates_job=creates_job, retry=retry, **kwargs)
+
+
+def get(access_info: Dict[str, str], url: str, call_type: str = 'rest', **kwargs: Any) -> requests.Response:
+    """Send a GET request through ``request``."""
+    return request(access_info, 'GET', url, call_type=call_type, **kwargs)
+
+
+def post(access_info: Dict[str, str], url: str, call_type: str = 'rest', **kwargs: Any) -> requests.Response:
+    """Send a POST request through ``request``."""
+    return request(access_info, 'POST', url, call_type=call_type, **kwargs)
+
+
+def patch(access_info: Dict[str, str], url: str, call_type: str = 'rest', **kwargs: Any) -> requests.Response:
+    """Send a PATCH request through ``request``."""
+    return request(access_info, 'PATCH', url, call_type=call_type, **kwargs)
+
+
+def put(access_info: Dict[str, str], url: str, call_type: str = 'rest', **kwargs: Any) -> requests.Response:
+    """Send a PUT request through ``request``."""
+    return request(access_info, 'PUT', url, call_type=call_type, **kwargs)
+
+
+def delete(access_info: Dict[str, str], url: str, call_type: str = 'rest', **kwargs: Any) -> requests.Response:
+    """Send a DELETE request through ``request``."""
+    return request(access_info, 'DELETE', url, call_type=call_type, **kwargs)
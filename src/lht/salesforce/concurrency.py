@@ -0,0 +1,269 @@
+"""
+Adaptive (AIMD) concurrency control for Salesforce requests.
+
+One ``AdaptiveConcurrencyController`` is kept per Salesforce instance and
+wraps every call made through ``lht.salesforce.client``. The number of
+requests allowed in flight grows by one per window of healthy responses
+(additive increase) and is cut by ``decrease_factor`` on 429/503 responses,
+REQUEST_LIMIT_EXCEEDED / row lock errors, transport errors, or latency far
+above the observed baseline of the same kind of call (multiplicative
+decrease). Bulk data transfers (result pages, uploads) keep their own
+baseline and are not judged by latency, since it follows their size.
+"""
+
+import time
+import threading
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses that signal the org is shedding load
+THROTTLE_STATUSES = (429, 503)
+
+# Error codes in a Salesforce error body that signal contention or throttling
+THROTTLE_ERROR_CODES = (
+    'REQUEST_LIMIT_EXCEEDED',
+    'UNABLE_TO_LOCK_ROW',
+    'SERVER_UNAVAILABLE',
+    'TOO_MANY_REQUESTS',
+)
+
+# Defaults applied to every controller; changed with configure()
+_defaults = {
+    'initial_limit': 4,
+    'min_limit': 1,
+    'max_limit': 32,
+    'decrease_factor': 0.5,
+    'latency_factor': 3.0,
+    'cooldown_seconds': 2.0,
+}
+
+_controllers: Dict[str, 'AdaptiveConcurrencyController'] = {}
+_controllers_lock = threading.Lock()
+
+
+class AdaptiveConcurrencyController:
+    """
+    Limits in-flight requests to one Salesforce org using AIMD.
+
+    Callers wrap each request in ``with controller.slot():`` and report the
+    outcome with ``record_success`` / ``record_throttle``.
+    """
+
+    def __init__(self,
+                 name: str,
+                 initial_limit: int = 4,
+                 min_limit: int = 1,
+                 max_limit: int = 32,
+                 decrease_factor: float = 0.5,
+                 latency_factor: float = 3.0,
+                 cooldown_seconds: float = 2.0):
+        """
+        Initialize the controller.
+
+        Args:
+            name: Label used in logs and metrics (usually the instance URL)
+            initial_limit: Starting number of requests allowed in flight
+            min_limit: Lower bound for the limit
+            max_limit: Upper bound for the limit
+            decrease_factor: Multiplier applied to the limit on congestion
+            latency_factor: Latency above ``baseline * latency_factor`` counts as congestion
+            cooldown_seconds: Minimum time between two decreases
+        """
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(self.max_limit, max(self.min_limit, initial_limit))
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.cooldown_seconds = cooldown_seconds
+
+        self._condition = threading.Condition()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._successes_in_window = 0
+        self._last_decrease = 0.0
+
+        # Latency is tracked per call type; a results download is not comparable to a describe
+        self.baseline_latency: Dict[str, float] = {}
+        self.avg_latency: Dict[str, float] = {}
+        self.successes = 0
+        self.throttles = 0
+        self.increases = 0
+        self.decreases = 0
+        self.wait_seconds = 0.0
+        self.decisions = deque(maxlen=50)
+
+    @contextmanager
+    def slot(self):
+        """Block until a request slot is free, then hold it for the duration of the call."""
+        start = time.time()
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.wait_seconds += time.time() - start
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def record_success(self, latency: float, call_type: str = 'rest', check_latency: bool = True) -> None:
+        """
+        Record a healthy response; grows the limit by one per full window.
+
+        Args:
+            latency: Request latency in seconds
+            call_type: Kind of call, used to keep latency baselines comparable
+            check_latency: Whether latency above the baseline counts as congestion
+                (off for calls whose latency follows their payload size)
+        """
+        with self._condition:
+            self.successes += 1
+            avg = self.avg_latency.get(call_type)
+            avg = latency if avg is None else 0.8 * avg + 0.2 * latency
+            self.avg_latency[call_type] = avg
+            baseline = self.baseline_latency.get(call_type)
+            if baseline is None or latency < baseline:
+                baseline = latency
+            else:
+                # Let the baseline drift up slowly so a single fast call doesn't pin it forever
+                baseline = 0.99 * baseline + 0.01 * latency
+            self.baseline_latency[call_type] = baseline
+
+            threshold = max(baseline * self.latency_factor, 0.05)
+            if check_latency and latency > threshold and avg > threshold:
+                self._decrease(f"{call_type} latency {avg:.2f}s above baseline {baseline:.2f}s")
+                return
+
+            self._successes_in_window += 1
+            if self._successes_in_window >= self.limit and self.limit < self.max_limit:
+                self._successes_in_window = 0
+                self.limit += 1
+                self.increases += 1
+                self._decide('increase', 'healthy window')
+                self._condition.notify_all()
+
+    def record_throttle(self, reason: str) -> None:
+        """
+        Record a throttling or contention signal; cuts the limit multiplicatively.
+
+        Args:
+            reason: Short description (status code or error code)
+        """
+        with self._condition:
+            self.throttles += 1
+            self._decrease(reason)
+
+    def _decrease(self, reason: str) -> None:
+        """Apply a multiplicative decrease (caller holds the lock)."""
+        self._successes_in_window = 0
+        now = time.time()
+        if now - self._last_decrease < self.cooldown_seconds:
+            return
+        new_limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+        if new_limit == self.limit:
+            return
+        self._last_decrease = now
+        self.limit = new_limit
+        self.decreases += 1
+        self._decide('decrease', reason)
+        logger.warning(f"🐢 Reducing Salesforce concurrency to {self.limit} ({reason})")
+
+    def _decide(self, action: str, reason: str) -> None:
+        self.decisions.append({
+            'time': time.time(),
+            'action': action,
+            'limit': self.limit,
+            'reason': reason,
+        })
+        logger.debug(f"🎚️ Concurrency {action} -> {self.limit} for {self.name} ({reason})")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current limit, counters and recent decisions as a plain dictionary.
+
+        Returns:
+            dict: Controller metrics
+        """
+        with self._condition:
+            return {
+                'name': self.name,
+                'limit': self.limit,
+                'min_limit': self.min_limit,
+                'max_limit': self.max_limit,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'successes': self.successes,
+                'throttles': self.throttles,
+                'increases': self.increases,
+                'decreases': self.decreases,
+                'baseline_latency': dict(self.baseline_latency),
+                'avg_latency': dict(self.avg_latency),
+                'wait_seconds': round(self.wait_seconds, 3),
+                'decisions': list(self.decisions),
+            }
+
+
+def throttle_reason(response) -> Optional[str]:
+    """
+    Classify a response as a throttling/contention signal.
+
+    Args:
+        response: requests.Response
+
+    Returns:
+        str: Reason if the response should reduce concurrency, otherwise None
+    """
+    if response.status_code in THROTTLE_STATUSES:
+        return f"HTTP {response.status_code}"
+    if response.status_code >= 400:
+        body = response.text[:2000] if response.text else ''
+        for code in THROTTLE_ERROR_CODES:
+            if code in body:
+                return code
+    return None
+
+
+def configure(**settings) -> None:
+    """
+    Change the settings used by controllers created from now on.
+
+    Accepts any of: initial_limit, min_limit, max_limit, decrease_factor,
+    latency_factor, cooldown_seconds. ``None`` values are ignored.
+    """
+    unknown = set(settings) - set(_defaults)
+    if unknown:
+        raise ValueError(f"Unknown concurrency settings: {', '.join(sorted(unknown))}")
+    with _controllers_lock:
+        _defaults.update({key: value for key, value in settings.items() if value is not None})
+
+
+def get_controller(access_info: Dict[str, str]) -> AdaptiveConcurrencyController:
+    """
+    Return the shared controller for the instance in ``access_info``.
+
+    Args:
+        access_info: Dictionary containing 'instance_url'
+
+    Returns:
+        AdaptiveConcurrencyController: Controller shared by all calls to that instance
+    """
+    instance_url = access_info['instance_url'].rstrip('/')
+    with _controllers_lock:
+        controller = _controllers.get(instance_url)
+        if controller is None:
+            controller = AdaptiveConcurrencyController(instance_url, **_defaults)
+            _controllers[instance_url] = controller
+        return controller
+
+
+def concurrency_snapshot(access_info: Dict[str, str]) -> Dict[str, Any]:
+    """Convenience wrapper returning ``get_controller(access_info).snapshot()``."""
+    return get_controller(access_info).snapshot()
@@ -0,0 +1,316 @@
+"""
+Persistent cache for SObject describe results.
+
+Describes are stored under ``~/.solomo/cache/describe/<instance>/<version>/<SObject>.json``
+and kept in memory for the rest of the process. Within the TTL a cached
+describe is served without any HTTP call; after that it is revalidated with
+``If-Modified-Since`` and a ``304 Not Modified`` is served from disk.
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from email.utils import formatdate
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
+
+from . import client
+
+logger = logging.getLogger(__name__)
+
+DESCRIBE_API_VERSION = "v62.0"
+
+# Maximum subrequests accepted by one Composite batch request
+BATCH_SIZE = 25
+
+# Defaults; changed with configure()
+_defaults = {
+    'ttl_seconds': 3600.0,
+    'enabled': True,
+}
+
+_memory: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+_stats = {
+    'hits': 0,
+    'not_modified': 0,
+    'fetched': 0,
+    'batch_requests': 0,
+}
+
+
+def configure(**settings) -> None:
+    """
+    Change cache settings.
+
+    Accepts: ttl_seconds (seconds a describe is trusted without revalidation),
+    enabled (False bypasses the cache entirely). ``None`` values are ignored.
+    """
+    unknown = set(settings) - set(_defaults)
+    if unknown:
+        raise ValueError(f"Unknown describe cache settings: {', '.join(sorted(unknown))}")
+    _defaults.update({key: value for key, value in settings.items() if value is not None})
+
+
+def get_cache_dir() -> Path:
+    """Root directory of the describe cache (~/.solomo/cache/describe)."""
+    from lht.user.connections.manager import get_solomo_dir
+    return get_solomo_dir() / 'cache' / 'describe'
+
+
+def _instance_key(instance_url: str) -> str:
+    return (urlparse(instance_url).netloc or instance_url).replace(':', '_').lower()
+
+
+def _cache_path(instance_url: str, api_version: str, sobject: str) -> Path:
+    return get_cache_dir() / _instance_key(instance_url) / api_version / f"{sobject.lower()}.json"
+
+
+def _read_entry(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_entry(path: Path, entry: Dict[str, Any]) -> None:
+    """Write atomically so concurrent runs never read a partial file."""
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
+
+
+def store(instance_url: str, api_version: str, sobject: str, describe: Dict[str, Any],
+          last_modified: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Save a describe fetched elsewhere (e.g. by a batch describe) into the cache.
+
+    Args:
+        instance_url: Salesforce instance URL
+        api_version: API version the describe was fetched with
+        sobject: SObject name
+        describe: Describe JSON
+        last_modified: Value of the Last-Modified header, if any
+
+    Returns:
+        dict: The cache entry
+    """
+    now = time.time()
+    entry = {
+        'sobject': sobject,
+        'api_version': api_version,
+        'fetched_at': now,
+        'validated_at': now,
+        'last_modified': last_modified or formatdate(now, usegmt=True),
+        'describe': describe,
+    }
+    path = _cache_path(instance_url, api_version, sobject)
+    with _lock:
+        _memory[str(path)] = entry
+    try:
+        _write_entry(path, entry)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not write describe cache {path}: {e}")
+    return entry
+
+
+def lookup(instance_url: str, api_version: str, sobject: str) -> Optional[Dict[str, Any]]:
+    """Return the cache entry for an SObject (memory first, then disk), or None."""
+    path = _cache_path(instance_url, api_version, sobject)
+    with _lock:
+        entry = _memory.get(str(path))
+    if entry is None:
+        entry = _read_entry(path)
+        if entry is not None:
+            with _lock:
+                _memory[str(path)] = entry
+    return entry
+
+
+def mark_validated(instance_url: str, api_version: str, sobject: str, entry: Dict[str, Any]) -> None:
+    """Record that a cached describe was confirmed current (304 Not Modified)."""
+    entry['validated_at'] = time.time()
+    try:
+        _write_entry(_cache_path(instance_url, api_version, sobject), entry)
+    except OSError as e:
+        logger.debug(f"Could not update describe cache timestamp: {e}")
+
+
+def is_fresh(entry: Dict[str, Any]) -> bool:
+    """True if the entry is younger than the TTL and can be used without revalidation."""
+    return time.time() - entry.get('validated_at', 0) < _defaults['ttl_seconds']
+
+
+def get_describe(access_info: Dict[str, str], sobject: str, api_version: str = DESCRIBE_API_VERSION,
+                 force_refresh: bool = False) -> Dict[str, Any]:
+    """
+    Return the describe JSON for an SObject, using the cache where possible.
+
+    Args:
+        access_info: Dictionary containing 'access_token' and 'instance_url'
+        sobject: SObject name (e.g., 'Account')
+        api_version: Salesforce API version (default: v62.0)
+        force_refresh: Ignore the TTL and revalidate with Salesforce
+
+    Returns:
+        dict: Describe JSON
+
+    Raises:
+        requests.exceptions.HTTPError: If Salesforce returns an error
+    """
+    instance_url = access_info['instance_url']
+    entry = lookup(instance_url, api_version, sobject) if _defaults['enabled'] else None
+
+    if entry is not None and not force_refresh and is_fresh(entry):
+        _stats['hits'] += 1
+        logger.debug(f"📦 Describe cache hit for {sobject}")
+        return entry['describe']
+
+    headers = {
+        "Authorization": f"Bearer {access_info['access_token']}",
+        "Accept": "application/json"
+    }
+    if entry is not None:
+        headers['If-Modified-Since'] = entry['last_modified']
+
+    url = f"{instance_url}/services/data/{api_version}/sobjects/{sobject}/describe"
+    response = client.get(access_info, url, call_type='describe', headers=headers)
+
+    if response.status_code == 304 and entry is not None:
+        _stats['not_modified'] += 1
+        logger.debug(f"📦 Describe for {sobject} not modified, serving from cache")
+        mark_validated(instance_url, api_version, sobject, entry)
+        return entry['describe']
+
+    response.raise_for_status()
+    describe = response.json()
+    _stats['fetched'] += 1
+    if _defaults['enabled']:
+        store(instance_url, api_version, sobject, describe, response.headers.get('Last-Modified'))
+    return describe
+
+
+def get_describes(access_info: Dict[str, str], sobjects: List[str], api_version: str = DESCRIBE_API_VERSION,
+                  force_refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Return describes for several SObjects, fetching the missing ones in Composite batches.
+
+    Cached describes within the TTL are served directly; the rest are
+    requested through ``/composite/batch`` in chunks of ``BATCH_SIZE``, so a
+    60-object run costs three calls instead of 60. Every describe fetched this
+    way is stored in the cache, so later ``get_describe`` calls are hits.
+
+    Args:
+        access_info: Dictionary containing 'access_token' and 'instance_url'
+        sobjects: SObject names
+        api_version: Salesforce API version (default: v62.0)
+        force_refresh: Ignore the TTL and fetch every describe
+
+    Returns:
+        dict: SObject name -> describe JSON (SObjects that failed are left out)
+    """
+    instance_url = access_info['instance_url']
+    describes = {}
+    missing = []
+    requested = list(dict.fromkeys(sobjects))
+    for sobject in requested:
+        entry = lookup(instance_url, api_version, sobject) if _defaults['enabled'] else None
+        if entry is not None and not force_refresh and is_fresh(entry):
+            _stats['hits'] += 1
+            describes[sobject] = entry['describe']
+        else:
+            missing.append(sobject)
+
+    url = f"{instance_url}/services/data/{api_version}/composite/batch"
+    headers = {
+        "Authorization": f"Bearer {access_info['access_token']}",
+        "Content-Type": "application/json",
+        "Accept": "application/json"
+    }
+    for start in range(0, len(missing), BATCH_SIZE):
+        chunk = missing[start:start + BATCH_SIZE]
+        body = {'batchRequests': [
+            {'method': 'GET', 'url': f"{api_version}/sobjects/{sobject}/describe"} for sobject in chunk
+        ]}
+        # The batch only reads metadata, so it is safe to retry
+        response = client.post(access_info, url, call_type='describe', headers=headers, json=body, retry=True)
+        response.raise_for_status()
+        _stats['batch_requests'] += 1
+
+        for sobject, result in zip(chunk, response.json().get('results', [])):
+            if result.get('statusCode') != 200:
+                logger.warning(f"⚠️ Batch describe failed for {sobject}: {result.get('result')}")
+                continue
+            describe = result['result']
+            _stats['fetched'] += 1
+            if _defaults['enabled']:
+                store(instance_url, api_version, sobject, describe)
+            describes[sobject] = describe
+
+    logger.debug(f"📦 Described {len(describes)} of {len(requested)} SObjects "
+                 f"({len(missing)} fetched in batches of {BATCH_SIZE})")
+    return describes
+
+
+def warm(access_info: Dict[str, str], sobjects: List[str], api_version: str = DESCRIBE_API_VERSION) -> Dict[str, bool]:
+    """
+    Fetch describes for several SObjects into the cache using batch requests.
+
+    Args:
+        access_info: Dictionary containing 'access_token' and 'instance_url'
+        sobjects: SObject names
+        api_version: Salesforce API version
+
+    Returns:
+        dict: SObject name -> True if the describe is now cached
+    """
+    try:
+        describes = get_describes(access_info, sobjects, api_version, force_refresh=True)
+    except Exception as e:
+        logger.warning(f"⚠️ Batch describe failed: {e}")
+        describes = {}
+    return {sobject: sobject in describes for sobject in sobjects}
+
+
+def clear(instance_url: Optional[str] = None, sobject: Optional[str] = None) -> int:
+    """
+    Remove cached describes.
+
+    Args:
+        instance_url: Only clear this instance (default: all instances)
+        sobject: Only clear this SObject (default: all SObjects)
+
+    Returns:
+        int: Number of cache files removed
+    """
+    root = get_cache_dir()
+    if instance_url:
+        root = root / _instance_key(instance_url)
+    pattern = f"**/{sobject.lower()}.json" if sobject else "**/*.json"
+
+    removed = 0
+    if root.exists():
+        for path in root.glob(pattern):
+            try:
+                path.unlink()
+                removed += 1
+            except OSError as e:
+                logger.warning(f"⚠️ Could not remove {path}: {e}")
+
+    with _lock:
+        for key in list(_memory):
+            if key.startswith(str(root)) and (sobject is None or key.endswith(f"{os.sep}{sobject.lower()}.json")):
+                del _memory[key]
+    return removed
+
+
+def stats() -> Dict[str, int]:
+    """Cache hit/miss counters for this process."""
+    return dict(_stats)
@@ -1,9 +1,14 @@
-import requests
 import json
+import uuid
 import logging
+from . import client
 
 logger = logging.getLogger(__name__)
 
+# Largest CSV Bulk API 2.0 accepts in a multipart job creation request
+# (the limit is 20,000 characters; bytes are never fewer)
+MAX_INLINE_BYTES = 20000
+
 def job_close(access_info, job_id):
     access_token = access_info['access_token']
     logger.debug("closing job")
@@ -13,7 +18,7 @@ def job_close(access_info, job_id):
         'Content-Type': 'application/json'
     }
     close = {"state":"UploadComplete"}
-    response = requests.patch(url, headers=headers, data=json.dumps(close))
+    response = client.patch(access_info, url, call_type='bulk_ingest', retry=True, headers=headers, data=json.dumps(close))
     #response.raise_for_status()
     logger.debug(f"Response status: {response.status_code}")
 
@@ -23,7 +28,7 @@ def job_status(access_info, job_id):
     headers = {
         'Authorization': f'Bearer {access_token}'
     }
-    response = requests.get(url, headers=headers)
+    response = client.get(access_info, url, call_type='bulk_ingest', headers=headers)
     response.raise_for_status()
     return response.json()
 
@@ -35,6 +40,43 @@ def send_file(access_info, job_id, data):
         'Authorization': f'Bearer {access_token}',
         'Content-Type': 'text/csv'
     }
-    response = requests.put(url, headers=headers, data=data)
+    response = client.put(access_info, url, call_type='bulk_ingest', headers=headers, data=data)
     logger.debug(f"Response status: {response.status_code}")
 
+def create_job_with_data(access_info, job_data, data):
+    """
+    Create an ingest job and upload its CSV in one multipart request.
+
+    A job created this way starts in UploadComplete state, so neither
+    ``send_file`` nor ``job_close`` is needed. Only for CSV of at most
+    MAX_INLINE_BYTES.
+
+    Args:
+        access_info: Salesforce access details
+        job_data: Job definition (object, operation, ...)
+        data: CSV bytes, or a ``csv.CsvBody``
+
+    Returns:
+        requests.Response: The job creation response
+    """
+    access_token = access_info['access_token']
+    url = access_info['instance_url']+"/services/data/v62.0/jobs/ingest/"
+    content = data.getvalue() if hasattr(data, 'getvalue') else data
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    boundary = f"lht-{uuid.uuid4().hex}"
+    body = b''.join([
+        f'--{boundary}\r\nContent-Type: application/json\r\nContent-Disposition: form-data; name="job"\r\n\r\n'.encode('utf-8'),
+        json.dumps(job_data).encode('utf-8'),
+        f'\r\n--{boundary}\r\nContent-Type: text/csv\r\nContent-Disposition: form-data; name="content"; filename="content"\r\n\r\n'.encode('utf-8'),
+        content,
+        f'\r\n--{boundary}--\r\n'.encode('utf-8'),
+    ])
+    headers = {
+        'Authorization': f'Bearer {access_token}',
+        'Content-Type': f'multipart/form-data; boundary={boundary}',
+        'Accept': 'application/json'
+    }
+    response = client.post(access_info, url, call_type='bulk_ingest', creates_job=True, headers=headers, data=body)
+    logger.debug(f"Response status: {response.status_code}")
+    return response
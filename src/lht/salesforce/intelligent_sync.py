@@ -1,11 +1,16 @@
 import pandas as pd
 import time
-import requests
 import numpy as np
 import logging
 from typing import Optional, Dict, Any, Tuple, List
+from . import client
+from . import concurrency
+from . import describe_cache
+from . import job_reuse
+from . import limits
 from . import sobjects
-from lht.util import merge, data_writer
+from . import sync_plan
+from lht.util import merge, data_writer, catalog, sql_batch
 
 logger = logging.getLogger(__name__)
 
@@ -50,7 +55,8 @@ class IntelligentSync:
                     force_bulk_api: bool = False,
                     existing_job_id: Optional[str] = None,
                     delete_job: bool = True,
-                    where_clause: Optional[str] = None) -> Dict[str, Any]:
+                    where_clause: Optional[str] = None,
+                    database: Optional[str] = None) -> Dict[str, Any]:
         """
         Intelligently sync a Salesforce SObject to Snowflake.
         
@@ -66,17 +72,27 @@ class IntelligentSync:
             existing_job_id: Optional existing Bulk API job ID to use instead of creating a new query
             delete_job: Whether to delete the Bulk API job after completion (default: True)
             where_clause: Optional SOQL WHERE clause to filter records (e.g., "IsPersonAccount = False")
+            database: Snowflake database name (defaults to the session's current database)
             
         Returns:
             Dictionary containing sync results and metadata
         """
         logger.debug(f"🔄 Starting intelligent sync for {sobject} -> {schema}.{table}")
+        # Batching counters are process-wide; report only this sync's share
+        sql_batch_start = sql_batch.stats()
+        
+        # Resolve the database once; every statement below is fully qualified
+        # so the sync never depends on (or changes) the session's USE context
+        if database is None:
+            database = catalog.get_catalog(self.session).current_database()
+        self.database = database
         
         # Store force_full_sync, existing_job_id, delete_job, and where_clause as instance attributes for use in other methods
         self.force_full_sync = force_full_sync
         self.existing_job_id = existing_job_id
         self.delete_job = delete_job
         self.where_clause = where_clause
+        self.plan = None
         logger.debug(f"🔧 Force full sync: {self.force_full_sync}")
 
         if existing_job_id:
@@ -139,48 +155,25 @@ class IntelligentSync:
             'last_modified_date': last_modified_date,
             'sync_timestamp': pd.Timestamp.now(),
             'success': result.get('success', False),
-            'error': result.get('error', None)
+            'error': result.get('error', None),
+            'api_usage': limits.usage_snapshot(self.access_info),
+            'concurrency': concurrency.concurrency_snapshot(self.access_info),
+            'http': client.http_snapshot(self.access_info),
+            'sql_batching': sql_batch.stats_since(sql_batch_start)
         }
         
+        logger.debug(f"📦 SQL batching: {sync_result['sql_batching']['round_trips_saved']} round trips saved")
         logger.info(f"✅ Sync completed: {sync_result['actual_records']} records in {sync_result['sync_duration_seconds']:.2f}s")
         return sync_result
     
     def _table_exists(self, schema: str, table: str) -> bool:
         """Check if the target table exists in Snowflake."""
         try:
-            # First check if schema exists
-            schema_query = f"SHOW SCHEMAS LIKE '{schema}'"
-            #logger.debug(f"🔍 Checking if schema exists: {schema_query}")
-            #print(f"🔍 Checking if schema exists: {schema_query}")
-            schema_result = sql_execution(self.session, schema_query, "schema_check")
-            #print(f"📋 Schema result: {schema_result}")
-            if not schema_result or len(schema_result) == 0:
-                #logger.debug(f"📋 Schema {schema} does not exist")
-                #print(f"📋 Schema {schema} does not exist")
+            # Served from the session catalog; one SHOW per schema per session
+            session_catalog = catalog.get_catalog(self.session)
+            if not session_catalog.schema_exists(self.database, schema):
                 return False
-            
-            # Then check if table exists in schema - use more specific query
-            current_db = self.session.sql('SELECT CURRENT_DATABASE()').collect()[0][0]
-            query = f"SELECT COUNT(*) as table_count FROM information_schema.tables WHERE table_schema = '{schema}' AND table_name = '{table}' AND table_type = 'BASE TABLE'"
-            #logger.debug(f"🔍 Executing table existence check: {query}")
-            #print(f"🔍 Executing table existence check: {query}")
-            result = sql_execution(self.session, query, "table_check")
-            #print(f"📋 Table result: {result}")
-            
-            # More robust result checking
-            if result is not None and len(result) > 0:
-                # Check if result has the expected structure
-                if 'table_count' in result[0]:
-                    exists = result[0]['table_count'] > 0
-                else:
-                    # Fallback: check if any result was returned
-                    exists = len(result) > 0
-            else:
-                exists = False
-                
-            #logger.debug(f"📋 Table {schema}.{table} exists: {exists}")
-            #print(f"📋 Table {schema}.{table} exists: {exists}")
-            return exists
+            return session_catalog.table_exists(self.database, schema, table)
         except Exception as e:
             logger.error(f"❌ Error checking table existence: {e}")
             return False
@@ -188,20 +181,12 @@ class IntelligentSync:
     def _ensure_schema_exists(self, schema: str) -> bool:
         """Ensure the schema exists in Snowflake, create it if it doesn't."""
         try:
-            schema_query = f"SHOW SCHEMAS LIKE '{schema}'"
-            logger.debug(f"🔍 Checking if schema exists: {schema_query}")
-            schema_result = sql_execution(self.session, schema_query, "schema_exists_check")
-            
-            if not schema_result or len(schema_result) == 0:
-                #logger.debug(f"📋 Schema {schema} does not exist, creating it...")
-                create_schema_query = f"CREATE SCHEMA IF NOT EXISTS {schema}"
-                #logger.debug(f"🔍 Creating schema: {create_schema_query}")
+            session_catalog = catalog.get_catalog(self.session)
+            if not session_catalog.schema_exists(self.database, schema):
+                create_schema_query = f"CREATE SCHEMA IF NOT EXISTS {self.database}.{schema}"
                 sql_execution(self.session, create_schema_query, "create_schema")
-                #logger.debug(f"✅ Schema {schema} created successfully")
-                return True
-            else:
-                #logger.debug(f"📋 Schema {schema} already exists")
-                return True
+                session_catalog.schema_created(self.database, schema)
+            return True
         except Exception as e:
             logger.error(f"❌ Error ensuring schema exists: {e}")
             return False
@@ -260,8 +245,8 @@ class IntelligentSync:
                 #print(f"🔍 DEBUG: Table {schema}.{table} exists, proceeding with query")
                 pass
             
-            # Get current database for fully qualified table name
-            current_db = self.session.sql('SELECT CURRENT_DATABASE()').collect()[0][0]
+            # Use the resolved database for fully qualified table name
+            current_db = self.database
             
             # Try a more robust approach to get the last modified date
             try:
@@ -413,7 +398,7 @@ class IntelligentSync:
             url = f"{self.access_info['instance_url']}/services/data/v58.0/query?q={query}"
             
             logger.debug(f"🌐 Making API request to: {url}")
-            response = requests.get(url, headers=headers)
+            response = client.get(self.access_info, url, call_type='query', headers=headers)
             response.raise_for_status()
             
             result = response.json()
@@ -574,10 +559,14 @@ class IntelligentSync:
         
         logger.debug(f"🔍 Getting field descriptions for {sobject}")
         try:
-            query_string, df_fields, snowflake_fields = sobjects.describe(self.access_info, sobject, lmd_sf if last_modified_date else None)
+            # Field list, DDL and cast SELECT come from the saved sync plan;
+            # it is recompiled only when the describe or the table changed
+            self.plan = sync_plan.get_plan(self.session, self.access_info, sobject, self.database, schema, table)
+            df_fields = {field: self.plan['fields'][field] for field in self.plan['query_fields']}
+            snowflake_fields = self.plan['snowflake_fields']
             logger.debug(f"📋 Snowflake field types: {snowflake_fields}")
             
-            if not query_string or not df_fields:
+            if not df_fields:
                 error_msg = f"Failed to get field descriptions for {sobject}"
                 logger.error(f"❌ {error_msg}")
                 raise Exception(error_msg)
@@ -604,19 +593,14 @@ class IntelligentSync:
                 logger.debug(f"🔄 Trying with {len(current_fields)} fields...")
                 
                 # Build query string with current fields
-                query_string = f"SELECT {', '.join(current_fields.keys())} FROM {sobject}"
-                
-                # Build WHERE clause conditions
-                where_conditions = []
-                if last_modified_date:
-                    lmd_sf = str(last_modified_date)[:10] + 'T' + str(last_modified_date)[11:19] + '.000Z'
-                    where_conditions.append(f"LastModifiedDate > {lmd_sf}")
+                query_string = self._build_query(sobject, current_fields, last_modified_date)
                 
-                if self.where_clause:
-                    where_conditions.append(self.where_clause)
-                
-                if where_conditions:
-                    query_string += " WHERE " + " AND ".join(where_conditions)
+                # A recent completed job with the same query (e.g. from a run that
+                # failed while loading) is loaded instead of extracting again
+                reusable_job_id = job_reuse.find_reusable_job(self.access_info, sobject, query_string)
+                if reusable_job_id:
+                    logger.info(f"♻️ Reusing completed Bulk API job {reusable_job_id} with the same query")
+                    return self._execute_bulk_api_job(sobject, schema, table, current_fields, snowflake_fields, last_modified_date, strategy, job_id=reusable_job_id)
                 
                 # Try to create the Bulk API job
                 from . import query_bapi20
@@ -644,6 +628,9 @@ class IntelligentSync:
                                 del current_fields[field]
                                 removed_fields.append(field)
                                 logger.debug(f"🗑️ Removed field: {field}")
+                        # Remembered in the plan, whose SOQL is then the one retried
+                        if self.plan:
+                            sync_plan.exclude_fields(self.plan, problematic_fields)
                         
                         if not current_fields:
                             raise Exception("No fields remaining after removing problematic fields")
@@ -670,8 +657,11 @@ class IntelligentSync:
                 if removed_fields:
                     logger.info(f"🗑️ Removed {len(removed_fields)} problematic fields: {removed_fields}")
                 
-                # Now proceed with the actual sync using the working field set
-                result = self._execute_bulk_api_job(sobject, schema, table, current_fields, snowflake_fields, last_modified_date, strategy)
+                # Now proceed with the actual sync using the working field set and the job just created
+                job_id = job_response['id'] if isinstance(job_response, dict) else None
+                if job_id:
+                    job_reuse.record_job(self.access_info, job_id, sobject, query_string)
+                result = self._execute_bulk_api_job(sobject, schema, table, current_fields, snowflake_fields, last_modified_date, strategy, job_id=job_id)
                 
                 # If we get here, the job was successful
                 return result
@@ -695,6 +685,31 @@ class IntelligentSync:
         # If we get here, we've exhausted all fields
         raise Exception("Failed to sync - no fields remaining")
     
+    def _build_query(self, sobject: str, fields: Dict[str, str], last_modified_date: Optional[pd.Timestamp]) -> str:
+        """
+        Build the SOQL for the queried fields with the incremental and user WHERE conditions.
+        
+        While the fields are the sync plan's query fields the plan's compiled
+        SOQL is used, so the sync runs the query that ``lht plan show`` prints.
+        """
+        if self.plan and list(fields) == self.plan['query_fields']:
+            query_string = self.plan['soql']
+        else:
+            query_string = f"SELECT {', '.join(fields)} FROM {sobject}"
+        
+        # Build WHERE clause conditions
+        where_conditions = []
+        if last_modified_date:
+            lmd_sf = str(last_modified_date)[:10] + 'T' + str(last_modified_date)[11:19] + '.000Z'
+            where_conditions.append(f"LastModifiedDate > {lmd_sf}")
+        
+        if self.where_clause:
+            where_conditions.append(self.where_clause)
+        
+        if where_conditions:
+            query_string += " WHERE " + " AND ".join(where_conditions)
+        return query_string
+    
     def _extract_problematic_fields(self, error_message: str) -> List[str]:
         """Extract field names from Salesforce error messages."""
         problematic_fields = []
@@ -806,6 +821,7 @@ class IntelligentSync:
             result = query_bapi20.get_bulk_results(
                 self.session, self.access_info, job_id, sobject, schema, table,
                 snowflake_fields=snowflake_fields, use_stage=use_stage, stage_name=stage_name,
+                database=self.database,
                 force_full_sync=self.force_full_sync  # Pass the force_full_sync parameter
             )
             logger.info(f"✅ Bulk API results retrieved successfully")
@@ -839,31 +855,27 @@ class IntelligentSync:
     def _execute_bulk_api_job(self, sobject: str, schema: str, table: str, 
                              df_fields: Dict[str, str], snowflake_fields: Dict[str, str], 
                              last_modified_date: Optional[pd.Timestamp], 
-                             strategy: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute the actual Bulk API job after field filtering."""
+                             strategy: Dict[str, Any],
+                             job_id: Optional[str] = None) -> Dict[str, Any]:
+        """Execute the actual Bulk API job after field filtering.
+        
+        If job_id is given (a job created for this query, or a reusable one),
+        no new job is created.
+        """
         
         # SECOND INSTANCE - _execute_bulk_api_job method
         
         # Build the final query string with the working field set
-        query_string = f"SELECT {', '.join(df_fields.keys())} FROM {sobject}"
-        
-        # Build WHERE clause conditions
-        where_conditions = []
-        if last_modified_date:
-            lmd_sf = str(last_modified_date)[:10] + 'T' + str(last_modified_date)[11:19] + '.000Z'
-            where_conditions.append(f"LastModifiedDate > {lmd_sf}")
-        
-        if self.where_clause:
-            where_conditions.append(self.where_clause)
-        
-        if where_conditions:
-            query_string += " WHERE " + " AND ".join(where_conditions)
+        query_string = self._build_query(sobject, df_fields, last_modified_date)
         
         
         # Create bulk query job
         logger.debug("📋 Creating Bulk API job...")
         from . import query_bapi20
-        job_response = query_bapi20.create_batch_query(self.access_info, query_string)
+        if job_id:
+            job_response = {'id': job_id}
+        else:
+            job_response = query_bapi20.create_batch_query(self.access_info, query_string)
         
         # Check if job_response indicates an error
         if isinstance(job_response, list) and len(job_response) > 0:
@@ -898,10 +910,11 @@ class IntelligentSync:
                 'records_processed': 0
             }
         
-        job_id = job_response['id']
-        
-        logger.debug(f"📋 Created Bulk API job: {job_id}")
-        logger.info(f"📋 Created Bulk API job: {job_id}")
+        if job_id is None:
+            job_id = job_response['id']
+            job_reuse.record_job(self.access_info, job_id, sobject, query_string)
+            logger.debug(f"📋 Created Bulk API job: {job_id}")
+            logger.info(f"📋 Created Bulk API job: {job_id}")
         
         # Monitor job status
         logger.debug("📊 Monitoring job status...")
@@ -936,7 +949,9 @@ class IntelligentSync:
             result = query_bapi20.get_bulk_results(
                 self.session, self.access_info, job_id, sobject, schema, table,
                 snowflake_fields=snowflake_fields, use_stage=use_stage, stage_name=stage_name,
-                force_full_sync=self.force_full_sync  # Pass the force_full_sync parameter
+                database=self.database,
+                force_full_sync=self.force_full_sync,  # Pass the force_full_sync parameter
+                plan=self.plan
             )
             logger.info(f"✅ Bulk API results retrieved successfully")
         except Exception as e:
@@ -945,20 +960,26 @@ class IntelligentSync:
             result = None
         
         # Clean up job - SECOND INSTANCE (_execute_bulk_api_job method)
-        if self.delete_job:
-            try:
-                logger.debug(f"🧹 Cleaning up job: {job_id}")
-                cleanup_result = query_bapi20.delete_specific_job(self.access_info, job_id)
-                if cleanup_result.get('success'):
-                    logger.info(f"🧹 Cleaned up job: {job_id}")
-                else:
-                    logger.warning(f"⚠️ Warning: Could not clean up job {job_id}: {cleanup_result.get('error', 'Unknown error')}")
-                    logger.warning(f"⚠️ Warning: Could not clean up job {job_id}: {cleanup_result.get('error', 'Unknown error')}")
-            except Exception as e:
-                logger.warning(f"⚠️ Warning: Could not clean up job {job_id}: {e}")
-                logger.warning(f"⚠️ Warning: Could not clean up job {job_id}: {e}")
+        if result is None:
+            # Keep the job so the next attempt reuses it instead of extracting again
+            logger.info(f"♻️ Keeping job {job_id} for reuse by the next run")
         else:
-            logger.info(f"🧹 Skipping job cleanup (delete_job=False) - job {job_id} will remain in Salesforce")
+            # Loaded: later runs must not load the same results again
+            job_reuse.forget_job(self.access_info, job_id)
+            if self.delete_job:
+                try:
+                    logger.debug(f"🧹 Cleaning up job: {job_id}")
+                    cleanup_result = query_bapi20.delete_specific_job(self.access_info, job_id)
+                    if cleanup_result.get('success'):
+                        logger.info(f"🧹 Cleaned up job: {job_id}")
+                    else:
+                        logger.warning(f"⚠️ Warning: Could not clean up job {job_id}: {cleanup_result.get('error', 'Unknown error')}")
+                        logger.warning(f"⚠️ Warning: Could not clean up job {job_id}: {cleanup_result.get('error', 'Unknown error')}")
+                except Exception as e:
+                    logger.warning(f"⚠️ Warning: Could not clean up job {job_id}: {e}")
+                    logger.warning(f"⚠️ Warning: Could not clean up job {job_id}: {e}")
+            else:
+                logger.info(f"🧹 Skipping job cleanup (delete_job=False) - job {job_id} will remain in Salesforce")
         
         return {
             'success': True,
@@ -1008,7 +1029,8 @@ def sync_sobject_intelligent(session,
                            force_bulk_api: bool = False,
                            existing_job_id: Optional[str] = None,
                            delete_job: bool = True,
-                           where_clause: Optional[str] = None) -> Dict[str, Any]:
+                           where_clause: Optional[str] = None,
+                           database: Optional[str] = None) -> Dict[str, Any]:
     """
     Convenience function for intelligent SObject synchronization.
     
@@ -1026,12 +1048,97 @@ def sync_sobject_intelligent(session,
         existing_job_id: Optional existing Bulk API job ID to use instead of creating a new query
         delete_job: Whether to delete the Bulk API job after completion (default: True)
         where_clause: Optional SOQL WHERE clause to filter records (e.g., "IsPersonAccount = False")
+        database: Snowflake database name (defaults to the session's current database)
         
     Returns:
         Dictionary containing sync results and metadata
     """
     sync_system = IntelligentSync(session, access_info)
     return sync_system.sync_sobject(
-        sobject, schema, table, match_field, use_stage, stage_name, force_full_sync, force_bulk_api, existing_job_id, delete_job, where_clause
+        sobject, schema, table, match_field, use_stage, stage_name, force_full_sync, force_bulk_api, existing_job_id, delete_job, where_clause, database
     )
 
+
+
+def sync_sobjects_intelligent(session,
+                              access_info: Dict[str, str],
+                              sobjects: List[str],
+                              schema: str,
+                              tables: Optional[Dict[str, str]] = None,
+                              match_field: str = 'ID',
+                              force_full_sync: bool = False,
+                              delete_job: bool = True,
+                              where_clauses: Optional[Dict[str, str]] = None,
+                              database: Optional[str] = None,
+                              session_pool=None) -> Dict[str, Dict[str, Any]]:
+    """
+    Synchronize several SObjects into one schema.
+    
+    All describes are fetched up front with batch describe requests (25 objects
+    per call) and cached, so the per-object syncs never describe individually.
+    A failure in one object is recorded in its result and does not stop the run.
+    
+    With ``session_pool`` the objects are synced in parallel, up to the pool's
+    size at once; each object's sync runs entirely on one pooled session.
+    
+    Args:
+        session: Snowflake Snowpark session
+        access_info: Dictionary containing Salesforce access details
+        sobjects: Salesforce SObject names
+        schema: Snowflake schema name
+        tables: Optional SObject -> table name mapping (default: SObject name in upper case)
+        match_field: Field to use for matching records (default: 'ID')
+        force_full_sync: Force a full sync regardless of previous sync status
+        delete_job: Whether to delete the Bulk API jobs after completion (default: True)
+        where_clauses: Optional SObject -> SOQL WHERE clause mapping
+        database: Snowflake database name (defaults to the session's current database)
+        session_pool: Optional ``lht.user.session_pool.SessionPool`` for parallel object syncs
+        
+    Returns:
+        Dictionary of sync results keyed by SObject name
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    tables = tables or {}
+    where_clauses = where_clauses or {}
+    
+    describes = describe_cache.get_describes(access_info, sobjects)
+    logger.info(f"📦 Described {len(describes)} of {len(sobjects)} SObjects before syncing")
+    
+    if database is None:
+        database = catalog.get_catalog(session).current_database()
+    
+    def _sync(sync_session, sobject):
+        return IntelligentSync(sync_session, access_info).sync_sobject(
+            sobject, schema, tables.get(sobject, sobject.upper()), match_field,
+            force_full_sync=force_full_sync,
+            delete_job=delete_job,
+            where_clause=where_clauses.get(sobject),
+            database=database
+        )
+    
+    def _sync_pooled(sync_session, sobject):
+        with session_pool.session() as pooled_session:
+            return _sync(pooled_session, sobject)
+    
+    def _sync_or_record(run, sobject):
+        try:
+            return run(session, sobject)
+        except Exception as e:
+            logger.error(f"❌ Sync failed for {sobject}: {e}")
+            return {
+                'sobject': sobject,
+                'target_table': f"{schema}.{tables.get(sobject, sobject.upper())}",
+                'sync_method': 'failed',
+                'sync_timestamp': pd.Timestamp.now(),
+                'success': False,
+                'error': str(e)
+            }
+    
+    if session_pool is None:
+        return {sobject: _sync_or_record(_sync, sobject) for sobject in sobjects}
+    
+    logger.info(f"🔀 Syncing {len(sobjects)} SObjects in parallel on up to {session_pool.size} pooled sessions")
+    with ThreadPoolExecutor(max_workers=session_pool.size, thread_name_prefix='lht-sync') as executor:
+        synced = executor.map(lambda sobject: _sync_or_record(_sync_pooled, sobject), sobjects)
+        return dict(zip(sobjects, synced))
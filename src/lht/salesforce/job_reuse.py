@@ -0,0 +1,172 @@
+"""
+Automatic reuse of recent identical Bulk API 2.0 query jobs.
+
+Salesforce doesn't return a query job's SOQL, so every query job created by
+a sync is recorded in a local journal (``~/.solomo/jobs/<instance>.json``)
+with a hash of its query. Before a sync creates a job it looks for a journal
+entry with the same SObject and query hash, no older than ``max_age_seconds``;
+if ``jobs.list_bulk_api_jobs`` still shows that job as a JobComplete
+queryAll job, its results are loaded instead of running the extraction again.
+
+A sync that fails while loading keeps its job (even with delete_job=True) so
+the next attempt can reuse it.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Defaults; changed with configure()
+_defaults = {
+    'max_age_seconds': 3600.0,
+    'enabled': True,
+}
+
+# Journal entries older than this are dropped when the journal is written
+JOURNAL_RETENTION_SECONDS = 7 * 24 * 3600
+
+_lock = threading.Lock()
+
+
+def configure(**settings) -> None:
+    """
+    Change job reuse settings.
+
+    Accepts: max_age_seconds (oldest job that may be reused), enabled (False
+    always creates a new job). ``None`` values are ignored.
+    """
+    unknown = set(settings) - set(_defaults)
+    if unknown:
+        raise ValueError(f"Unknown job reuse settings: {', '.join(sorted(unknown))}")
+    _defaults.update({key: value for key, value in settings.items() if value is not None})
+
+
+def query_hash(query: str) -> str:
+    """Hash of a SOQL query with whitespace normalized."""
+    normalized = re.sub(r'\s+', ' ', query.replace('+', ' ')).strip()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def _journal_path(instance_url: str) -> Path:
+    from lht.user.connections.manager import get_solomo_dir
+    from .describe_cache import _instance_key
+    return get_solomo_dir() / 'jobs' / f"{_instance_key(instance_url)}.json"
+
+
+def _read_journal(path: Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_journal(path: Path, journal: Dict[str, Dict[str, Any]]) -> None:
+    """Write atomically, dropping entries past the retention period."""
+    cutoff = time.time() - JOURNAL_RETENTION_SECONDS
+    journal = {job_id: entry for job_id, entry in journal.items() if entry.get('created_at', 0) >= cutoff}
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(journal, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not write job journal {path}: {e}")
+
+
+def record_job(access_info: Dict[str, str], job_id: str, sobject: str, query: str) -> None:
+    """Record a query job created by this process so later runs can reuse it."""
+    path = _journal_path(access_info['instance_url'])
+    with _lock:
+        journal = _read_journal(path)
+        journal[job_id] = {
+            'sobject': sobject.lower(),
+            'query_hash': query_hash(query),
+            'created_at': time.time(),
+        }
+        _write_journal(path, journal)
+
+
+def forget_job(access_info: Dict[str, str], job_id: str) -> None:
+    """Remove a job from the journal (e.g. after deleting it)."""
+    path = _journal_path(access_info['instance_url'])
+    with _lock:
+        journal = _read_journal(path)
+        if journal.pop(job_id, None) is not None:
+            _write_journal(path, journal)
+
+
+def _created_at(job: Dict[str, Any]) -> Optional[float]:
+    """Parse a job's createdDate (e.g. 2024-01-15T10:30:00.000+0000) to epoch seconds."""
+    try:
+        return datetime.strptime(job['createdDate'], '%Y-%m-%dT%H:%M:%S.%f%z').timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def find_reusable_job(access_info: Dict[str, str], sobject: str, query: str,
+                      max_age_seconds: Optional[float] = None) -> Optional[str]:
+    """
+    Find a recent completed query job that ran the same SOQL.
+
+    Jobs are listed from Salesforce only when the journal has a candidate, so
+    a sync with nothing to reuse makes no extra API calls.
+
+    Args:
+        access_info: Salesforce access details
+        sobject: SObject name
+        query: SOQL the sync is about to run
+        max_age_seconds: Oldest job to reuse (defaults to the configured value)
+
+    Returns:
+        str: Job ID of the newest matching JobComplete job, or None
+    """
+    if not _defaults['enabled']:
+        return None
+    if max_age_seconds is None:
+        max_age_seconds = _defaults['max_age_seconds']
+    cutoff = time.time() - max_age_seconds
+
+    path = _journal_path(access_info['instance_url'])
+    with _lock:
+        journal = _read_journal(path)
+    wanted = query_hash(query)
+    candidates = {
+        job_id for job_id, entry in journal.items()
+        if entry.get('sobject') == sobject.lower()
+        and entry.get('query_hash') == wanted
+        and entry.get('created_at', 0) >= cutoff
+    }
+    if not candidates:
+        return None
+
+    from . import jobs
+    try:
+        listed = jobs.list_bulk_api_jobs(access_info)
+    except Exception as e:
+        logger.debug(f"Could not list Bulk API jobs for reuse: {e}")
+        return None
+
+    matches = []
+    for job in listed:
+        if job.get('id') not in candidates:
+            continue
+        created = _created_at(job)
+        if (job.get('state') == 'JobComplete'
+                and job.get('operation') == 'queryAll'
+                and (job.get('object') or '').lower() == sobject.lower()
+                and created is not None and created >= cutoff):
+            matches.append((created, job['id']))
+    if not matches:
+        return None
+    return max(matches)[1]
@@ -6,14 +6,16 @@ import requests
 import logging
 from typing import Dict, Any, List, Optional
 
+from . import client
+
 logger = logging.getLogger(__name__)
 
 
-def _fetch_jobs_from_endpoint(headers: Dict[str, str], url: str, instance_url: str) -> List[Dict[str, Any]]:
+def _fetch_jobs_from_endpoint(access_info: Dict[str, str], headers: Dict[str, str], url: str, instance_url: str) -> List[Dict[str, Any]]:
     """Fetch all jobs from a paginated Bulk API 2.0 endpoint."""
     jobs = []
     while url:
-        response = requests.get(url, headers=headers)
+        response = client.get(access_info, url, headers=headers)
         response.raise_for_status()
         result = response.json()
         jobs.extend(result.get('records', []))
@@ -61,14 +63,14 @@ def list_bulk_api_jobs(access_info: Dict[str, str], api_version: str = "v58.0")
     base_url = f"{access_info['instance_url']}/services/data/{api_version}"
 
     try:
-        query_jobs = _fetch_jobs_from_endpoint(headers, f"{base_url}/jobs/query", access_info['instance_url'])
+        query_jobs = _fetch_jobs_from_endpoint(access_info, headers, f"{base_url}/jobs/query", access_info['instance_url'])
         logger.debug(f"Retrieved {len(query_jobs)} query jobs")
     except requests.exceptions.RequestException as e:
         logger.error(f"Error listing query jobs: {e}")
         raise
 
     try:
-        ingest_jobs = _fetch_jobs_from_endpoint(headers, f"{base_url}/jobs/ingest", access_info['instance_url'])
+        ingest_jobs = _fetch_jobs_from_endpoint(access_info, headers, f"{base_url}/jobs/ingest", access_info['instance_url'])
         logger.debug(f"Retrieved {len(ingest_jobs)} ingest jobs")
     except requests.exceptions.RequestException as e:
         logger.error(f"Error listing ingest jobs: {e}")
@@ -125,7 +127,7 @@ def get_bulk_api_job(access_info: Dict[str, str], job_id: str, api_version: str
     for job_type in ('query', 'ingest'):
         url = f"{base_url}/jobs/{job_type}/{job_id}"
         try:
-            response = requests.get(url, headers=headers)
+            response = client.get(access_info, url, headers=headers)
             if response.status_code == 404:
                 continue
             response.raise_for_status()
@@ -182,7 +184,7 @@ def delete_bulk_api_job(access_info: Dict[str, str], job_id: str, api_version: s
     # Determine correct endpoint (query vs ingest) by probing
     url = None
     for job_type in ('query', 'ingest'):
-        probe = requests.get(f"{base_url}/jobs/{job_type}/{job_id}", headers=headers)
+        probe = client.get(access_info, f"{base_url}/jobs/{job_type}/{job_id}", headers=headers)
         if probe.status_code != 404:
             url = f"{base_url}/jobs/{job_type}/{job_id}"
             break
@@ -191,7 +193,7 @@ def delete_bulk_api_job(access_info: Dict[str, str], job_id: str, api_version: s
         return {'success': False, 'job_id': job_id, 'error': f'Job not found: {job_id}'}
 
     try:
-        response = requests.delete(url, headers=headers)
+        response = client.delete(access_info, url, headers=headers)
         
         if response.status_code == 204:
             logger.info(f"Successfully deleted Bulk API 2.0 job: {job_id}")
@@ -252,7 +254,7 @@ def get_ingest_job_results(access_info: Dict[str, str], job_id: str, api_version
 
     for key, url in endpoints.items():
         try:
-            response = requests.get(url, headers=headers)
+            response = client.get(access_info, url, headers=headers)
             response.raise_for_status()
             results[key] = response.text
             logger.debug(f"Fetched {key} for job {job_id}: {len(response.text)} bytes")
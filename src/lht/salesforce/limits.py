@@ -0,0 +1,341 @@
+"""
+Salesforce API limit tracking and throttling.
+
+One ``ApiLimitsGovernor`` is kept per Salesforce instance and shared by every
+describe, query, Bulk API and ingest call made through ``lht.salesforce.client``.
+It reads the ``Sforce-Limit-Info`` header returned on REST responses and,
+when Bulk jobs are created, the ``/limits`` resource, so long backfills leave
+a configurable reserve of the daily allocations for other integrations.
+"""
+
+import re
+import time
+import threading
+import logging
+from typing import Dict, Any, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+LIMITS_API_VERSION = "v58.0"
+
+# Call types that create Bulk API jobs and the /limits entry they consume
+BULK_JOB_LIMITS = {
+    'bulk_query': 'DailyBulkV2QueryJobs',
+    'bulk_ingest': 'DailyBulkApiBatches',
+}
+
+# Call types that always start new work; queries only when they carry a SOQL string
+NEW_WORK_CALL_TYPES = ('describe',)
+
+_LIMIT_INFO_RE = re.compile(r'api-usage=(\d+)/(\d+)')
+_NEW_QUERY_RE = re.compile(r'[?&]q=')
+
+# Defaults applied to every governor; changed with configure()
+_defaults = {
+    'api_reserve_pct': 10.0,
+    'bulk_reserve_pct': 10.0,
+    'slowdown_pct': 20.0,
+    'max_delay_seconds': 30.0,
+    'refresh_interval_seconds': 300.0,
+}
+
+_governors: Dict[str, 'ApiLimitsGovernor'] = {}
+_governors_lock = threading.Lock()
+
+
+class ApiLimitReserveError(RuntimeError):
+    """Raised when a call would dip into the reserved part of a daily allocation."""
+
+
+class ApiLimitsGovernor:
+    """
+    Tracks remaining daily API and Bulk allocations for one Salesforce org.
+
+    Calls slow down once the remaining share of an allocation drops below
+    ``slowdown_pct``. At ``*_reserve_pct`` new work (see ``starts_new_work``)
+    stops with ``ApiLimitReserveError``, while polls and downloads of jobs and
+    queries already under way continue at the slowest pace, so a started load
+    is read to the end.
+    """
+
+    def __init__(self,
+                 instance_url: str,
+                 api_reserve_pct: float = 10.0,
+                 bulk_reserve_pct: float = 10.0,
+                 slowdown_pct: float = 20.0,
+                 max_delay_seconds: float = 30.0,
+                 refresh_interval_seconds: float = 300.0):
+        """
+        Initialize the governor.
+
+        Args:
+            instance_url: Salesforce instance URL this governor tracks
+            api_reserve_pct: Percent of daily API requests to leave untouched
+            bulk_reserve_pct: Percent of daily Bulk allocations to leave untouched
+            slowdown_pct: Remaining percent below which new calls are delayed
+            max_delay_seconds: Delay applied right above the reserve threshold
+            refresh_interval_seconds: Minimum age before /limits is fetched again
+        """
+        self.instance_url = instance_url
+        self.api_reserve_pct = api_reserve_pct
+        self.bulk_reserve_pct = bulk_reserve_pct
+        self.slowdown_pct = slowdown_pct
+        self.max_delay_seconds = max_delay_seconds
+        self.refresh_interval_seconds = refresh_interval_seconds
+
+        self._lock = threading.Lock()
+        self.api_used: Optional[int] = None
+        self.api_max: Optional[int] = None
+        self.limits: Dict[str, Dict[str, int]] = {}
+        self.limits_fetched_at: Optional[float] = None
+        self.calls_by_type: Dict[str, int] = {}
+        self.jobs_created: Dict[str, int] = {}
+        self.throttled_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # Observations
+    # ------------------------------------------------------------------
+    def record_response(self, response: requests.Response, call_type: str = 'rest') -> None:
+        """Record a completed call and the API usage reported in its headers."""
+        with self._lock:
+            self.calls_by_type[call_type] = self.calls_by_type.get(call_type, 0) + 1
+            header = response.headers.get('Sforce-Limit-Info') if response is not None else None
+            if header:
+                match = _LIMIT_INFO_RE.search(header)
+                if match:
+                    self.api_used = int(match.group(1))
+                    self.api_max = int(match.group(2))
+
+    def record_job_created(self, call_type: str) -> None:
+        """Count a Bulk job against the locally tracked allocation until the next refresh."""
+        limit_name = BULK_JOB_LIMITS.get(call_type)
+        with self._lock:
+            self.jobs_created[call_type] = self.jobs_created.get(call_type, 0) + 1
+            if limit_name and limit_name in self.limits:
+                entry = self.limits[limit_name]
+                entry['Remaining'] = max(0, entry.get('Remaining', 0) - 1)
+
+    def refresh_limits(self, access_info: Dict[str, str], force: bool = False) -> Dict[str, Dict[str, int]]:
+        """
+        Fetch the org's ``/limits`` resource.
+
+        Args:
+            access_info: Dictionary containing 'access_token' and 'instance_url'
+            force: Fetch even if the cached values are younger than the refresh interval
+
+        Returns:
+            dict: Limits keyed by name, each with 'Max' and 'Remaining'
+        """
+        if not force and self.limits_fetched_at is not None:
+            if time.time() - self.limits_fetched_at < self.refresh_interval_seconds:
+                return self.limits
+
+        url = f"{access_info['instance_url']}/services/data/{LIMITS_API_VERSION}/limits"
+        headers = {
+            "Authorization": f"Bearer {access_info['access_token']}",
+            "Accept": "application/json"
+        }
+        # Sent over the pooled client directly: going through client.request
+        # would call back into this governor
+        from .client import get_client
+        try:
+            response = get_client(access_info).send('GET', url, call_type='limits', headers=headers)
+            self.record_response(response, 'limits')
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"⚠️ Could not fetch Salesforce limits: {e}")
+            return self.limits
+
+        data = response.json()
+        with self._lock:
+            self.limits = {
+                name: {'Max': values.get('Max', 0), 'Remaining': values.get('Remaining', 0)}
+                for name, values in data.items()
+                if isinstance(values, dict) and 'Max' in values
+            }
+            self.limits_fetched_at = time.time()
+            api = self.limits.get('DailyApiRequests')
+            if api and api.get('Max'):
+                self.api_max = api['Max']
+                self.api_used = api['Max'] - api['Remaining']
+        logger.debug(f"📊 Refreshed Salesforce limits for {self.instance_url}")
+        return self.limits
+
+    # ------------------------------------------------------------------
+    # Decisions
+    # ------------------------------------------------------------------
+    def before_request(self, access_info: Dict[str, str], call_type: str = 'rest', creates_job: bool = False,
+                       new_work: Optional[bool] = None) -> None:
+        """
+        Apply the reserve thresholds before a call is made.
+
+        Args:
+            access_info: Dictionary containing 'access_token' and 'instance_url'
+            call_type: Kind of call ('describe', 'query', 'bulk_query', 'bulk_ingest', 'rest')
+            creates_job: True if the call creates a Bulk job
+            new_work: True if the call starts new work (default: ``creates_job`` or a describe)
+
+        Raises:
+            ApiLimitReserveError: If new work would consume reserved allocation
+        """
+        if new_work is None:
+            new_work = creates_job or call_type in NEW_WORK_CALL_TYPES
+        if self.api_used is None and creates_job:
+            self.refresh_limits(access_info)
+
+        delay = self._check(self.api_remaining_pct(), self.api_reserve_pct, 'daily API requests', stop=new_work)
+
+        if creates_job and call_type in BULK_JOB_LIMITS:
+            self.refresh_limits(access_info)
+            limit_name = BULK_JOB_LIMITS[call_type]
+            delay = max(delay, self._check(self._remaining_pct(limit_name), self.bulk_reserve_pct, limit_name))
+
+        if delay > 0:
+            logger.warning(f"⏳ Salesforce allocation running low - delaying {call_type} call by {delay:.1f}s")
+            with self._lock:
+                self.throttled_seconds += delay
+            time.sleep(delay)
+
+    def _check(self, remaining_pct: Optional[float], reserve_pct: float, label: str, stop: bool = True) -> float:
+        """Return the delay to apply; once the reserve is reached, raise if ``stop`` else delay the most."""
+        if remaining_pct is None:
+            return 0.0
+        if remaining_pct <= reserve_pct:
+            if not stop:
+                return self.max_delay_seconds
+            raise ApiLimitReserveError(
+                f"Salesforce {label} at {remaining_pct:.1f}% remaining for {self.instance_url}; "
+                f"stopping to keep the configured {reserve_pct:.1f}% reserve"
+            )
+        if remaining_pct < self.slowdown_pct and self.slowdown_pct > reserve_pct:
+            pressure = (self.slowdown_pct - remaining_pct) / (self.slowdown_pct - reserve_pct)
+            return round(self.max_delay_seconds * pressure, 2)
+        return 0.0
+
+    def api_remaining_pct(self) -> Optional[float]:
+        """Remaining share of daily API requests in percent, if known."""
+        if self.api_used is None or not self.api_max:
+            return None
+        return max(0.0, 100.0 * (self.api_max - self.api_used) / self.api_max)
+
+    def _remaining_pct(self, limit_name: str) -> Optional[float]:
+        entry = self.limits.get(limit_name)
+        if not entry or not entry.get('Max'):
+            return None
+        return max(0.0, 100.0 * entry.get('Remaining', 0) / entry['Max'])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current usage as a plain dictionary (for sync results and the CLI).
+
+        Returns:
+            dict: API usage, Bulk allocations, call counts and throttling totals
+        """
+        with self._lock:
+            bulk = {
+                name: dict(self.limits[name])
+                for name in BULK_JOB_LIMITS.values()
+                if name in self.limits
+            }
+            return {
+                'instance_url': self.instance_url,
+                'api_used': self.api_used,
+                'api_max': self.api_max,
+                'api_remaining_pct': self.api_remaining_pct(),
+                'bulk_limits': bulk,
+                'calls_by_type': dict(self.calls_by_type),
+                'jobs_created': dict(self.jobs_created),
+                'throttled_seconds': round(self.throttled_seconds, 2),
+                'api_reserve_pct': self.api_reserve_pct,
+                'bulk_reserve_pct': self.bulk_reserve_pct,
+            }
+
+
+def starts_new_work(call_type: str, url: str = '', creates_job: bool = False) -> bool:
+    """
+    Tell whether a call starts new work rather than continuing work under way.
+
+    Creating a Bulk job, fetching a describe and running a new SOQL query are
+    new work. Job status polls, result downloads, uploads to an open job and
+    ``nextRecordsUrl`` pages of a running query are not.
+
+    Args:
+        call_type: Kind of call ('describe', 'query', 'bulk_query', 'bulk_ingest', 'rest')
+        url: Request URL
+        creates_job: True if the call creates a Bulk job
+
+    Returns:
+        bool: True for new work
+    """
+    if creates_job or call_type in NEW_WORK_CALL_TYPES:
+        return True
+    return call_type == 'query' and bool(_NEW_QUERY_RE.search(url))
+
+
+def configure(**settings) -> None:
+    """
+    Change the reserve thresholds used by all governors.
+
+    Accepts any of: api_reserve_pct, bulk_reserve_pct, slowdown_pct,
+    max_delay_seconds, refresh_interval_seconds. ``None`` values are ignored.
+    """
+    unknown = set(settings) - set(_defaults)
+    if unknown:
+        raise ValueError(f"Unknown limit settings: {', '.join(sorted(unknown))}")
+    updates = {key: value for key, value in settings.items() if value is not None}
+    with _governors_lock:
+        _defaults.update(updates)
+        for governor in _governors.values():
+            for key, value in updates.items():
+                setattr(governor, key, value)
+
+
+def get_governor(access_info: Dict[str, str]) -> ApiLimitsGovernor:
+    """
+    Return the shared governor for the instance in ``access_info``.
+
+    Args:
+        access_info: Dictionary containing 'instance_url'
+
+    Returns:
+        ApiLimitsGovernor: Governor shared by all calls to that instance
+    """
+    instance_url = access_info['instance_url'].rstrip('/')
+    with _governors_lock:
+        governor = _governors.get(instance_url)
+        if governor is None:
+            governor = ApiLimitsGovernor(instance_url, **_defaults)
+            _governors[instance_url] = governor
+        return governor
+
+
+def usage_snapshot(access_info: Dict[str, str]) -> Dict[str, Any]:
+    """Convenience wrapper returning ``get_governor(access_info).snapshot()``."""
+    return get_governor(access_info).snapshot()
+
+
+def format_usage(snapshot: Dict[str, Any]) -> str:
+    """
+    Render a usage snapshot as a short human readable line.
+
+    Args:
+        snapshot: Result of ``ApiLimitsGovernor.snapshot()``
+
+    Returns:
+        str: e.g. ``API 1,234/15,000 (91.8% left) | DailyBulkV2QueryJobs 9,990/10,000``
+    """
+    parts = []
+    if snapshot.get('api_used') is not None and snapshot.get('api_max'):
+        parts.append(
+            f"API {snapshot['api_used']:,}/{snapshot['api_max']:,} "
+            f"({snapshot['api_remaining_pct']:.1f}% left)"
+        )
+    for name, entry in snapshot.get('bulk_limits', {}).items():
+        parts.append(f"{name} {entry.get('Remaining', 0):,}/{entry.get('Max', 0):,} left")
+    calls = sum(snapshot.get('calls_by_type', {}).values())
+    parts.append(f"{calls:,} call(s) this run")
+    if snapshot.get('throttled_seconds'):
+        parts.append(f"throttled {snapshot['throttled_seconds']:.1f}s")
+    return ' | '.join(parts)
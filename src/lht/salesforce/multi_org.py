@@ -0,0 +1,403 @@
+"""
+Multi-org fan-in sync.
+
+Syncs the same SObject from several Salesforce orgs into one Snowflake table
+keyed on (ORG_ID, ID). Describes and Bulk API extracts run concurrently per
+org; the target DDL is issued once from the union of the orgs' describes and
+all orgs are loaded with a single MERGE over a UNION ALL of per-org staging
+tables.
+"""
+
+import io
+import re
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+
+from . import client
+from . import limits
+from . import query_bapi20
+from . import sobjects
+from lht.util import catalog
+from lht.util import merge
+from lht.util import sql_batch
+from lht.util import staging
+from lht.util import table_creator
+
+logger = logging.getLogger(__name__)
+
+ORG_ID_COLUMN = 'ORG_ID'
+ORG_ID_TYPE = 'VARCHAR(18)'
+API_VERSION = 'v58.0'
+
+# Used when the same field has different types in different orgs
+FALLBACK_TYPE = 'VARCHAR(16777216)'
+
+# "No such column 'Field__c' on entity 'Account'" - field visible in describe but not queryable
+_NO_SUCH_COLUMN_RE = re.compile(r"No such column '([^']+)' on entity")
+
+
+def get_org_id(access_info: Dict[str, str]) -> str:
+    """
+    Look up the 18 character Organization Id of an org.
+
+    Args:
+        access_info: Dictionary containing 'access_token' and 'instance_url'
+
+    Returns:
+        str: Organization Id
+    """
+    headers = {
+        "Authorization": f"Bearer {access_info['access_token']}",
+        "Accept": "application/json"
+    }
+    url = f"{access_info['instance_url']}/services/data/{API_VERSION}/query"
+    response = client.get(access_info, url, call_type='query', headers=headers,
+                          params={'q': 'SELECT Id FROM Organization'})
+    response.raise_for_status()
+    return response.json()['records'][0]['Id']
+
+
+def union_describes(describes: Dict[str, Tuple[str, Dict[str, str], Dict[str, str]]]) -> Dict[str, str]:
+    """
+    Merge the Snowflake field types of several orgs into one target schema.
+
+    Fields present in any org are kept. A field whose type differs between
+    orgs falls back to VARCHAR.
+
+    Args:
+        describes: Result of ``sobjects.describe`` keyed by connection name
+
+    Returns:
+        dict: Field name -> Snowflake type, in first-seen order
+    """
+    union: Dict[str, str] = {}
+    for _, (_, _, snowflake_fields) in describes.items():
+        for field, field_type in snowflake_fields.items():
+            if field not in union:
+                union[field] = field_type
+            elif union[field] != field_type:
+                logger.warning(f"⚠️ Field {field} has different types across orgs ({union[field]} / {field_type}), using VARCHAR")
+                union[field] = FALLBACK_TYPE
+    return union
+
+
+def sync_sobject_multi_org(session,
+                           access_infos: Dict[str, Dict[str, str]],
+                           sobject: str,
+                           schema: str,
+                           table: str,
+                           database: Optional[str] = None,
+                           force_full_sync: bool = False,
+                           where_clause: Optional[str] = None,
+                           delete_job: bool = True,
+                           max_workers: Optional[int] = None,
+                           poll_interval: float = 10.0,
+                           session_pool=None) -> Dict[str, Any]:
+    """
+    Sync one SObject from several Salesforce orgs into a single Snowflake table.
+
+    Args:
+        session: Snowflake Snowpark session
+        access_infos: Salesforce access details keyed by connection name
+        sobject: Salesforce SObject name (e.g., 'Account')
+        schema: Snowflake schema name
+        table: Snowflake table name
+        database: Snowflake database name (defaults to the session's current database)
+        force_full_sync: Recreate the target table and extract all records
+        where_clause: Optional SOQL WHERE clause applied in every org
+        delete_job: Whether to delete the Bulk API jobs after completion (default: True)
+        max_workers: Number of orgs processed concurrently (default: one per org)
+        poll_interval: Seconds between Bulk API job status checks
+        session_pool: Optional ``lht.user.session_pool.SessionPool`` so orgs load
+                      their pages in parallel instead of through one session
+
+    Returns:
+        Dictionary with per-org results ('orgs') and overall totals
+    """
+    if not access_infos:
+        raise ValueError("At least one Salesforce connection is required")
+
+    start_time = time.time()
+    if database is None:
+        database = catalog.get_catalog(session).current_database()
+    target_table = staging.qualify(database, schema, table)
+    workers = max_workers or len(access_infos)
+
+    logger.info(f"🌐 Multi-org sync of {sobject} from {len(access_infos)} org(s) into {target_table}")
+
+    # 1. Org ids and describes, concurrently
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            name: executor.submit(_org_metadata, access_info, sobject)
+            for name, access_info in access_infos.items()
+        }
+        metadata = {name: future.result() for name, future in futures.items()}
+
+    org_ids = {name: meta[0] for name, meta in metadata.items()}
+    describes = {name: meta[1] for name, meta in metadata.items()}
+    if len(set(org_ids.values())) != len(org_ids):
+        raise ValueError(f"Connections point at the same org: {org_ids}")
+
+    # 2. One DDL pass for the union of all describes
+    union_fields = union_describes(describes)
+    target_fields = {ORG_ID_COLUMN: ORG_ID_TYPE}
+    target_fields.update(union_fields)
+
+    session_catalog = catalog.get_catalog(session)
+    if not session_catalog.schema_exists(database, schema):
+        session.sql(f"CREATE SCHEMA IF NOT EXISTS {database}.{schema}").collect()
+        session_catalog.schema_created(database, schema)
+    table_existed = session_catalog.table_exists(database, schema, table)
+    if force_full_sync or not table_existed:
+        table_creator.create_salesforce_table(session, schema, table, target_fields,
+                                              force_full_sync=force_full_sync, database=database)
+    else:
+        _add_missing_columns(session, database, schema, table, target_fields)
+
+    incremental = table_existed and not force_full_sync and 'LastModifiedDate' in union_fields
+    last_modified = _last_modified_by_org(session, target_table) if incremental else {}
+
+    # 3. Extract every org concurrently into its own staging table
+    run_id = staging.new_run_id()
+    staging_tables = {
+        name: staging.staging_table_name(table, f"{run_id}_{index}")
+        for index, name in enumerate(access_infos)
+    }
+    write_lock = threading.Lock()
+    staged: Dict[str, Dict[str, Any]] = {}
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                name: executor.submit(
+                    _extract_org, session, write_lock, session_pool, access_infos[name], org_ids[name],
+                    sobject, describes[name][1], database, schema,
+                    staging_tables[name],
+                    last_modified.get(org_ids[name]), where_clause, delete_job, poll_interval
+                )
+                for name in access_infos
+            }
+            for name, future in futures.items():
+                try:
+                    staged[name] = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Extract failed for {name}: {e}")
+                    staged[name] = {'org_id': org_ids[name], 'records': 0, 'staging_table': None, 'error': str(e)}
+
+        # 4. One MERGE keyed on (ORG_ID, ID) for all orgs
+        loaded = [entry['staging_table'] for entry in staged.values() if entry.get('staging_table') and entry['records'] > 0]
+        if loaded:
+            with staging.table_lock(database, schema, table):
+                _merge_orgs(session, loaded, target_table)
+        else:
+            logger.info("ℹ️ No new records in any org")
+    finally:
+        # Drop every staging table, including ones left by a failed extract,
+        # in one round trip
+        drops = [f"DROP TABLE IF EXISTS {staging.qualify(database, schema, staging_table)}" for staging_table in staging_tables.values()]
+        try:
+            sql_batch.execute_batch(session, drops, label="drop staging tables")
+        except Exception as e:
+            logger.debug(f"Could not drop staging tables: {e}")
+
+    orgs = {}
+    for name, entry in staged.items():
+        orgs[name] = {
+            'org_id': entry['org_id'],
+            'records': entry['records'],
+            'job_id': entry.get('job_id'),
+            'last_modified_date': last_modified.get(entry['org_id']),
+            'success': entry.get('error') is None,
+            'error': entry.get('error'),
+            'api_usage': limits.usage_snapshot(access_infos[name]),
+        }
+
+    result = {
+        'sobject': sobject,
+        'target_table': target_table,
+        'sync_method': 'multi_org_incremental' if incremental else 'multi_org_full',
+        'orgs': orgs,
+        'actual_records': sum(org['records'] for org in orgs.values()),
+        'sync_duration_seconds': time.time() - start_time,
+        'sync_timestamp': pd.Timestamp.now(),
+        'success': all(org['success'] for org in orgs.values()),
+    }
+    logger.info(f"✅ Multi-org sync completed: {result['actual_records']} records from {len(orgs)} org(s) in {result['sync_duration_seconds']:.2f}s")
+    return result
+
+
+def _org_metadata(access_info: Dict[str, str], sobject: str):
+    """Fetch the org id and SObject describe for one org."""
+    org_id = get_org_id(access_info)
+    describe = sobjects.describe(access_info, sobject)
+    if not describe:
+        raise ValueError(f"{sobject} is not retrievable in org {org_id}")
+    return org_id, describe
+
+
+def _add_missing_columns(session, database: str, schema: str, table: str, target_fields: Dict[str, str]) -> None:
+    """Add columns that exist in the union describe but not yet in the target table."""
+    session_catalog = catalog.get_catalog(session)
+    existing = {column.upper() for column in session_catalog.columns(database, schema, table)}
+    statements = []
+    for field, field_type in target_fields.items():
+        if field.upper() not in existing:
+            logger.info(f"➕ Adding column {field.upper()} to {database}.{schema}.{table}")
+            statements.append(f'ALTER TABLE {database}.{schema}.{table} ADD COLUMN "{field.upper()}" {field_type}')
+    if statements:
+        # All ALTERs in one round trip
+        try:
+            sql_batch.execute_batch(session, statements, label=f"add columns to {database}.{schema}.{table}")
+        finally:
+            session_catalog.columns_changed(database, schema, table)
+
+
+def _last_modified_by_org(session, target_table: str) -> Dict[str, pd.Timestamp]:
+    """Most recent LastModifiedDate per org already loaded in the target table."""
+    rows = session.sql(
+        f"SELECT {ORG_ID_COLUMN}, MAX(LASTMODIFIEDDATE) AS LAST_MODIFIED FROM {target_table} GROUP BY {ORG_ID_COLUMN}"
+    ).collect()
+    return {row[ORG_ID_COLUMN]: row['LAST_MODIFIED'] for row in rows if row['LAST_MODIFIED'] is not None}
+
+
+def _build_query(sobject: str, fields: List[str], last_modified_date, where_clause: Optional[str]) -> str:
+    query_string = f"SELECT {', '.join(fields)} FROM {sobject}"
+    where_conditions = []
+    if last_modified_date is not None:
+        lmd_sf = str(last_modified_date)[:10] + 'T' + str(last_modified_date)[11:19] + '.000Z'
+        where_conditions.append(f"LastModifiedDate > {lmd_sf}")
+    if where_clause:
+        where_conditions.append(where_clause)
+    if where_conditions:
+        query_string += " WHERE " + " AND ".join(where_conditions)
+    return query_string
+
+
+def _create_job(access_info: Dict[str, str], sobject: str, df_fields: Dict[str, str],
+                last_modified_date, where_clause: Optional[str]) -> str:
+    """Create the Bulk API query job, dropping fields the org refuses to query."""
+    fields = list(df_fields.keys())
+    while fields:
+        job_response = query_bapi20.create_batch_query(
+            access_info, _build_query(sobject, fields, last_modified_date, where_clause)
+        )
+        if isinstance(job_response, dict) and 'id' in job_response:
+            return job_response['id']
+
+        error_message = job_response[0].get('message', '') if isinstance(job_response, list) and job_response else str(job_response)
+        problematic = [field for field in _NO_SUCH_COLUMN_RE.findall(error_message) if field in fields]
+        if not problematic:
+            raise Exception(f"Bulk API job creation failed: {error_message}")
+        logger.warning(f"⚠️ Removing fields not queryable in this org: {problematic}")
+        fields = [field for field in fields if field not in problematic]
+
+    raise Exception("No fields remaining after removing problematic fields")
+
+
+def _wait_for_job(access_info: Dict[str, str], job_id: str, poll_interval: float) -> None:
+    while True:
+        status_response = query_bapi20.query_status(access_info, 'QueryAll', job_id)
+        job_status = status_response[0] if isinstance(status_response, list) and status_response else status_response
+        state = job_status['state']
+        if state == 'JobComplete':
+            return
+        if state in ['Failed', 'Aborted']:
+            raise Exception(f"Bulk API job {job_id} failed with state: {state}")
+        time.sleep(poll_interval)
+
+
+def _extract_org(session, write_lock: threading.Lock, session_pool, access_info: Dict[str, str], org_id: str,
+                 sobject: str, df_fields: Dict[str, str], database: str, schema: str,
+                 staging_table: str, last_modified_date, where_clause: Optional[str],
+                 delete_job: bool, poll_interval: float) -> Dict[str, Any]:
+    """
+    Run one org's Bulk API query and land its pages in a staging table.
+
+    HTTP work runs concurrently across orgs. Without a session pool, writes
+    to Snowflake share one session and are serialized with ``write_lock``;
+    with a pool each page is written through a pooled session into a
+    TRANSIENT staging table (temporary tables are invisible across sessions).
+    """
+    staging_fq = staging.qualify(database, schema, staging_table)
+    job_id = _create_job(access_info, sobject, df_fields, last_modified_date, where_clause)
+    logger.info(f"📋 Created Bulk API job {job_id} for org {org_id}")
+
+    records = 0
+    created = False
+    try:
+        _wait_for_job(access_info, job_id, poll_interval)
+
+        headers = {
+            "Authorization": f"Bearer {access_info['access_token']}",
+            "Accept": "text/csv"
+        }
+        url = f"{access_info['instance_url']}/services/data/{API_VERSION}/jobs/query/{job_id}/results"
+        while url:
+            response = client.get(access_info, url, call_type='bulk_query', headers=headers)
+            response.raise_for_status()
+
+            if response.text.strip():
+                df = pd.read_csv(io.StringIO(response.text), dtype=str)
+                if not df.empty:
+                    df.insert(0, ORG_ID_COLUMN, org_id)
+                    write_options = dict(database=database, schema=schema, table_name=staging_table,
+                                         auto_create_table=not created, overwrite=False,
+                                         quote_identifiers=False)
+                    if session_pool is not None:
+                        with session_pool.session() as pooled_session:
+                            pooled_session.write_pandas(df, table_type="transient", **write_options)
+                    else:
+                        with write_lock:
+                            session.write_pandas(df, table_type="temporary", **write_options)
+                    created = True
+                    records += len(df)
+
+            locator = response.headers.get('Sforce-Locator')
+            url = (f"{access_info['instance_url']}/services/data/{API_VERSION}/jobs/query/{job_id}/results?locator={locator}"
+                   if locator and locator != 'null' else None)
+    finally:
+        if delete_job:
+            query_bapi20.delete_specific_job(access_info, job_id)
+
+    logger.info(f"📥 Staged {records} {sobject} record(s) from org {org_id}")
+    return {
+        'org_id': org_id,
+        'job_id': job_id,
+        'records': records,
+        'staging_table': staging_fq if created else None,
+        'error': None,
+    }
+
+
+def _merge_orgs(session, staging_tables: List[str], target_table: str) -> None:
+    """MERGE the UNION ALL of all staging tables into the target on (ORG_ID, ID)."""
+    database, schema, table = staging.resolve_table_name(session, target_table)
+    target_columns = [column.upper() for column in catalog.get_catalog(session).columns(database, schema, table)]
+
+    selects = []
+    for staging_table in staging_tables:
+        # transform_and_match_datatypes emits every target column in target order
+        select_list = merge.transform_and_match_datatypes(session, staging_table, target_table).rstrip().rstrip(',')
+        selects.append(f"SELECT {select_list} FROM {staging_table}")
+
+    key_columns = (ORG_ID_COLUMN, 'ID')
+    on_clause = " AND ".join(f'tgt."{column}" = src."{column}"' for column in key_columns)
+    update_set = ", ".join(f'tgt."{column}" = src."{column}"' for column in target_columns if column not in key_columns)
+    insert_columns = ", ".join(f'"{column}"' for column in target_columns)
+    insert_values = ", ".join(f'src."{column}"' for column in target_columns)
+
+    merge_sql = f"""
+        MERGE INTO {target_table} tgt
+        USING ({' UNION ALL '.join(selects)}) src
+        ON {on_clause}
+        WHEN MATCHED THEN UPDATE SET {update_set}
+        WHEN NOT MATCHED THEN INSERT ({insert_columns}) VALUES ({insert_values})
+    """
+    logger.info(f"🔀 Merging {len(staging_tables)} org staging table(s) into {target_table}")
+    logger.debug(merge_sql)
+    session.sql(merge_sql).collect()
@@ -1,13 +1,17 @@
-import requests
 import json
 import pandas as pd
 import numpy as np
 import io
 import logging
+from . import client
 from . import sobjects
+from . import sync_plan
 from lht.util import field_types
 from lht.util import stage
 from lht.util import table_creator
+from lht.util import staging
+from lht.util import catalog
+from lht.util import sql_batch
 import os
 from lht.util import merge
 
@@ -38,7 +42,7 @@ def create_batch_query(access_info, query):
 			"query": query
 			}
 	url = access_info['instance_url']+"/services/data/v58.0/jobs/query"
-	results = requests.post(url, headers=headers, data=json.dumps(body))
+	results = client.post(access_info, url, call_type='bulk_query', creates_job=True, headers=headers, data=json.dumps(body))
 	
 	return results.json()
 
@@ -75,7 +79,7 @@ def query_status(access_info, job_type, job_id):
 	query_statuses = []
 
 	while True:
-		results = requests.get(url, headers=headers)
+		results = client.get(access_info, url, call_type='bulk_query', headers=headers)
 		if isinstance(results.json(), dict):
 			query_statuses.append(results.json())
 			break
@@ -112,7 +116,7 @@ def delete_query(access_info, job_id):
 			"Content-Type": "application/json"
 	}
 	url = access_info['instance_url']+"/services/data/v58.0/jobs/query/{}".format(job_id)
-	results = requests.delete(url, headers=headers)
+	results = client.delete(access_info, url, call_type='bulk_query', headers=headers)
 
 	return results
 
@@ -137,7 +141,7 @@ def get_query_ids(access_info):
 	}
 	url = access_info['instance_url']+"/services/data/v58.0/jobs/query/"
 	while True:
-		results = requests.get(url, headers=headers)
+		results = client.get(access_info, url, call_type='bulk_query', headers=headers)
 		jobs = []
 		job = {}
 		for result in results.json()['records']:
@@ -158,12 +162,12 @@ def get_query_ids(access_info):
 
 	return jobs
 
-def get_bulk_results_direct(session, access_info, job_id, sobject, schema, table, snowflake_fields=None, database=None, force_full_sync=False):
+def get_bulk_results_direct(session, access_info, job_id, sobject, schema, table, snowflake_fields=None, database=None, force_full_sync=False, plan=None):
 	logger.debug(f"🔍 get_bulk_results_direct called with force_full_sync={force_full_sync}")
 	
 	# Auto-detect database if not provided
 	if database is None:
-		database = session.sql('SELECT CURRENT_DATABASE()').collect()[0][0]
+		database = catalog.get_catalog(session).current_database()
 	"""Fetches and processes bulk query results from Salesforce, loading them directly into a Snowflake table.
 
 	Args:
@@ -175,6 +179,8 @@ def get_bulk_results_direct(session, access_info, job_id, sobject, schema, table
 		schema (str): Snowflake schema name (e.g., 'RAW').
 		table (str): Snowflake table name to load results into.
 		database (str, optional): Snowflake database name. If not provided, uses current database.
+		plan (dict, optional): Sync plan from ``sync_plan.get_plan``; its field types, DDL and
+			cast SELECT are used instead of describing the SObject and the tables again.
 
 	Returns:
 		requests.Response: HTTP response object from the last API request, or None if the job is not ready.
@@ -190,13 +196,16 @@ def get_bulk_results_direct(session, access_info, job_id, sobject, schema, table
 	}
 	
 	url = access_info['instance_url']+"/services/data/v58.0/jobs/query/{}/results".format(job_id)
-	results = requests.get(url, headers=headers)
+	results = client.get(access_info, url, call_type='bulk_query', headers=headers)
 	if results.status_code != 200:
 		logger.warning('The job is not ready.  Retry in a few minutes')
 		return None
 	
 	# Always get both field types from describe to ensure we have the correct information
-	query_string, df_fields, snowflake_fields = sobjects.describe(access_info, sobject)
+	if plan is not None:
+		df_fields, snowflake_fields = plan['fields'], plan['snowflake_fields']
+	else:
+		query_string, df_fields, snowflake_fields = sobjects.describe(access_info, sobject)
 	
 	# Process first batch
 	csv_content = results.text
@@ -207,68 +216,101 @@ def get_bulk_results_direct(session, access_info, job_id, sobject, schema, table
 	# This prevents "20" from becoming 20.0 and then "20.0"
 	df = pd.read_csv(io.StringIO(csv_content), dtype=str)
 	
-	# Set the current database and schema context
-	session.sql(f"USE DATABASE {database}").collect()
-	session.sql(f"USE SCHEMA {schema}").collect()
-	
-	# Use centralized table creation utility
-	try:
-		logger.info(f"🚀 Creating table {schema}.{table}...")
-		table_creator.ensure_table_exists_for_dataframe(
-			session=session,
-			schema=schema,
-			table=table,
-			df_fields=df_fields,
-			snowflake_fields=snowflake_fields,
-			force_full_sync=force_full_sync,
-			database=database
-		)
-		logger.info(f"✅ Table creation completed successfully")
-				
-		df_str = df.astype(str)
-		df = None
-		logger.debug(f"📊 Processing first batch of data")
-		session.write_pandas(df_str, schema=schema, table_name="tmp_"+table, auto_create_table=True, overwrite=True, quote_identifiers=False, table_type="temporary")
-		df_str = None
-		transformed_data = merge.transform_and_match_datatypes(session, "tmp_"+table, table)
-		session.sql(f"Insert into {table} select {transformed_data} from tmp_{table}").collect()
-		logger.info(f"✅ First batch loaded successfully")
-	except Exception as e:
-		logger.error(f"❌ Failed to create table or load data: {e}")
-		raise Exception(f"Failed to load data into table {schema}.{table}: {e}")
+	# Fully qualified names keep this load independent of the session's
+	# current database/schema and of any other sync sharing the session
+	target_table = staging.qualify(database, schema, table)
+	tmp_table = staging.staging_table_name(table)
+	tmp_table_fq = staging.qualify(database, schema, tmp_table)
+	tmp_dropped = False
 	
-	# Process remaining batches
+	with staging.table_lock(database, schema, table):
+		try:
+			# Use centralized table creation utility
+			try:
+				logger.info(f"🚀 Creating table {schema}.{table}...")
+				table_creator.ensure_table_exists_for_dataframe(
+					session=session,
+					schema=schema,
+					table=table,
+					df_fields=df_fields,
+					snowflake_fields=snowflake_fields,
+					force_full_sync=force_full_sync,
+					database=database,
+					create_table_sql=plan['create_table_sql'] if plan else None
+				)
+				logger.info(f"✅ Table creation completed successfully")
+				if plan is not None:
+					# The table may have just been created or replaced; cast to its current columns
+					sync_plan.bind_table(plan, catalog.get_catalog(session).column_types(database, schema, table))
+						
+				cast_select = sync_plan.cast_select_for(plan, list(df.columns))
+				df_str = df.astype(str)
+				df = None
+				logger.debug(f"📊 Processing first batch of data")
+				session.write_pandas(df_str, database=database, schema=schema, table_name=tmp_table, auto_create_table=True, overwrite=True, quote_identifiers=False, table_type="temporary")
+				df_str = None
+				transformed_data = cast_select or merge.transform_and_match_datatypes(session, tmp_table_fq, target_table)
+				tmp_dropped = _insert_from_staging(session, target_table, tmp_table_fq, transformed_data, last=not _has_more_results(results))
+				logger.info(f"✅ First batch loaded successfully")
+			except Exception as e:
+				logger.error(f"❌ Failed to create table or load data: {e}")
+				raise Exception(f"Failed to load data into table {schema}.{table}: {e}")
+			
+			# Process remaining batches
 
-	counter = 2
-	while True:
-		if 'Sforce-Locator' not in results.headers:			
-			break
-		elif results.headers['Sforce-Locator'] == 'null':
-			break
+			counter = 2
+			while True:
+				if not _has_more_results(results):
+					break
 
-		url = access_info['instance_url']+"/services/data/v58.0/jobs/query/{}/results?locator={}".format(job_id, results.headers['Sforce-Locator'])
-		results = requests.get(url, headers=headers)
-		csv_content = results.text
-		logger.info(f"PROCESSING BATCH {counter}")
-		
-		# CRITICAL: Force string reading to prevent pandas from converting numeric strings to floats
-		# This prevents "20" from becoming 20.0 and then "20.0"
-		df = pd.read_csv(io.StringIO(csv_content), dtype=str)
-		
+				url = access_info['instance_url']+"/services/data/v58.0/jobs/query/{}/results?locator={}".format(job_id, results.headers['Sforce-Locator'])
+				results = client.get(access_info, url, call_type='bulk_query', headers=headers)
+				csv_content = results.text
+				logger.info(f"PROCESSING BATCH {counter}")
+				
+				# CRITICAL: Force string reading to prevent pandas from converting numeric strings to floats
+				# This prevents "20" from becoming 20.0 and then "20.0"
+				df = pd.read_csv(io.StringIO(csv_content), dtype=str)
+				
 
-		df_str = df.astype(str)
-		df = None
-		logger.debug(f"📊 Processing batch {counter}")
-		session.write_pandas(df_str, schema=schema, table_name="tmp_"+table, auto_create_table=True, overwrite=True, quote_identifiers=False, table_type="temporary")
-		transformed_data = merge.transform_and_match_datatypes(session, "tmp_"+table, table)
-		session.sql(f"Insert into {table} select {transformed_data} from tmp_{table}").collect()
-		logger.info(f"✅ Batch {counter} loaded successfully using save_as_table")
-		df_str = None
-		counter += 1
+				cast_select = sync_plan.cast_select_for(plan, list(df.columns))
+				df_str = df.astype(str)
+				df = None
+				logger.debug(f"📊 Processing batch {counter}")
+				session.write_pandas(df_str, database=database, schema=schema, table_name=tmp_table, auto_create_table=True, overwrite=True, quote_identifiers=False, table_type="temporary")
+				transformed_data = cast_select or merge.transform_and_match_datatypes(session, tmp_table_fq, target_table)
+				tmp_dropped = _insert_from_staging(session, target_table, tmp_table_fq, transformed_data, last=not _has_more_results(results))
+				logger.info(f"✅ Batch {counter} loaded successfully using save_as_table")
+				df_str = None
+				counter += 1
+		finally:
+			# Normally dropped together with the last INSERT
+			if not tmp_dropped:
+				try:
+					session.sql(f"DROP TABLE IF EXISTS {tmp_table_fq}").collect()
+				except Exception as e:
+					logger.debug(f"Could not drop staging table {tmp_table_fq}: {e}")
 	
 	return results
 
-def get_bulk_results(session, access_info, job_id, sobject, schema, table, snowflake_fields=None, use_stage=False, stage_name=None, database=None, force_full_sync=False):
+def _has_more_results(results):
+	"""True if a Bulk API 2.0 results response has another page (a non-null Sforce-Locator)."""
+	locator = results.headers.get('Sforce-Locator')
+	return bool(locator) and locator != 'null'
+
+def _insert_from_staging(session, target_table, tmp_table_fq, transformed_data, last=False):
+	"""INSERT a staged batch into the target table; on the last batch the staging table is dropped in the same round trip.
+
+	Returns:
+		bool: True if the staging table was dropped.
+	"""
+	statements = [f"Insert into {target_table} select {transformed_data} from {tmp_table_fq}"]
+	if last:
+		statements.append(f"DROP TABLE IF EXISTS {tmp_table_fq}")
+	sql_batch.execute_batch(session, statements, label=f"load {target_table}")
+	return last
+
+def get_bulk_results(session, access_info, job_id, sobject, schema, table, snowflake_fields=None, use_stage=False, stage_name=None, database=None, force_full_sync=False, plan=None):
 	"""Fetches and processes bulk query results from Salesforce, loading them into a Snowflake table.
 	
 	This function now uses direct DataFrame-to-table loading for optimal performance.
@@ -284,6 +326,7 @@ def get_bulk_results(session, access_info, job_id, sobject, schema, table, snowf
 		use_stage (bool, optional): Deprecated - kept for backward compatibility. Default False.
 		stage_name (str, optional): Deprecated - kept for backward compatibility.
 		database (str, optional): Snowflake database name. If not provided, uses current database.
+		plan (dict, optional): Sync plan from ``sync_plan.get_plan``.
 
 	Returns:
 		requests.Response: HTTP response object from the last API request, or None if the job is not ready.
@@ -294,7 +337,7 @@ def get_bulk_results(session, access_info, job_id, sobject, schema, table, snowf
 		snowflake.snowpark.exceptions.SnowparkSQLException: If Snowflake write operation fails.
 	"""
 	logger.debug(f"🔍 get_bulk_results called with force_full_sync={force_full_sync}")
-	return get_bulk_results_direct(session, access_info, job_id, sobject, schema, table, snowflake_fields, database, force_full_sync)
+	return get_bulk_results_direct(session, access_info, job_id, sobject, schema, table, snowflake_fields, database, force_full_sync, plan)
 
 def delete_query(access_info, job_id):
 	"""Deletes a Salesforce query job by ID using the Bulk Query API.
@@ -318,7 +361,7 @@ def delete_query(access_info, job_id):
 			"Content-Type": "application/json"
 	}
 	url = access_info['instance_url']+"/services/data/v58.0/jobs/query/{}".format(job_id)
-	results = requests.delete(url, headers=headers)
+	results = client.delete(access_info, url, call_type='bulk_query', headers=headers)
 
 	return results
 
@@ -347,7 +390,7 @@ def get_query_ids(access_info):
 	}
 	url = access_info['instance_url']+"/services/data/v58.0/jobs/query/"
 	while True:
-		results = requests.get(url, headers=headers)
+		results = client.get(access_info, url, call_type='bulk_query', headers=headers)
 		jobs = []
 		job = {}
 		for result in results.json()['records']:
@@ -372,11 +415,10 @@ def test_snowflake_permissions(session, schema, table, database=None):
 	"""Test Snowflake permissions and context for debugging."""
 	# Auto-detect database if not provided
 	if database is None:
-		database = session.sql('SELECT CURRENT_DATABASE()').collect()[0][0]
+		database = catalog.get_catalog(session).current_database()
 	
-	# Set the current database and schema context
-	session.sql(f"USE DATABASE {database}").collect()
-	session.sql(f"USE SCHEMA {schema}").collect()
+	# Check access with a qualified lookup instead of switching session context
+	session.sql(f"SHOW TABLES LIKE '{table}' IN SCHEMA {database}.{schema}").collect()
 
 def cleanup_completed_jobs(access_info, max_age_hours=24):
 	"""Deletes completed Salesforce Bulk API 2.0 jobs that are older than the specified age.
@@ -407,7 +449,7 @@ def cleanup_completed_jobs(access_info, max_age_hours=24):
 	
 	try:
 		while True:
-			results = requests.get(url, headers=headers)
+			results = client.get(access_info, url, call_type='bulk_query', headers=headers)
 			results.raise_for_status()
 			
 			for job in results.json()['records']:
@@ -440,7 +482,7 @@ def cleanup_completed_jobs(access_info, max_age_hours=24):
 		for job in completed_jobs:
 			try:
 				delete_url = access_info['instance_url'] + f"/services/data/v58.0/jobs/query/{job['id']}"
-				delete_response = requests.delete(delete_url, headers=headers)
+				delete_response = client.delete(access_info, delete_url, call_type='bulk_query', headers=headers)
 				
 				if delete_response.status_code == 204:  # Success
 					deleted_count += 1
@@ -499,7 +541,7 @@ def delete_specific_job(access_info, job_id):
 	
 	try:
 		delete_url = access_info['instance_url'] + f"/services/data/v58.0/jobs/query/{job_id}"
-		delete_response = requests.delete(delete_url, headers=headers)
+		delete_response = client.delete(access_info, delete_url, call_type='bulk_query', headers=headers)
 		
 		if delete_response.status_code == 204:
 			logger.info(f"🗑️ Successfully deleted job {job_id}")
@@ -5,6 +5,8 @@ import io
 import logging
 from snowflake.snowpark import Session
 from snowflake.snowpark.exceptions import SnowparkSQLException
+from . import client
+from . import concurrency
 
 logger = logging.getLogger(__name__)
 
@@ -100,7 +102,7 @@ def get_job_info(access_info: dict, job_id: str) -> dict:
     }
     
     try:
-        response = requests.get(url, headers=headers)
+        response = client.get(access_info, url, call_type='bulk_ingest', headers=headers)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -124,7 +126,7 @@ def get_successful_results(access_info: dict, job_id: str) -> list:
     }
     
     try:
-        response = requests.get(url, headers=headers)
+        response = client.get(access_info, url, call_type='bulk_ingest', headers=headers)
         response.raise_for_status()
         
         # Parse CSV response
@@ -166,7 +168,7 @@ def get_failed_results(access_info: dict, job_id: str) -> list:
     }
     
     try:
-        response = requests.get(url, headers=headers)
+        response = client.get(access_info, url, call_type='bulk_ingest', headers=headers)
         response.raise_for_status()
         
         # Parse CSV response
@@ -184,6 +186,10 @@ def get_failed_results(access_info: dict, job_id: str) -> list:
             
             logger.info(f"✅ Successfully parsed {len(results)} failed records from CSV")
             
+            # Row lock contention in an ingest job is a signal to back off like a 503
+            if any('UNABLE_TO_LOCK_ROW' in (row.get('sf__Error') or '') for row in results):
+                concurrency.get_controller(access_info).record_throttle('UNABLE_TO_LOCK_ROW')
+            
             # 🔍 DEBUG: Show sample of failed results structure
             if results:
                 logger.debug(f"📋 Failed results: {len(results)} records")
@@ -380,7 +386,7 @@ def insert_failure_records(session: Session, job_id: str, failure_data: list):
         logger.error(f"📋 Last processed record index: {i if 'i' in locals() else 'N/A'}")
         raise
 
-def process_bulk_api_results(session: Session, access_info: dict, job_id: str):
+def process_bulk_api_results(session: Session, access_info: dict, job_id: str, failures: list = None):
     """
     Main function to process Bulk API 2.0 job results and store them in the database.
     
@@ -388,6 +394,8 @@ def process_bulk_api_results(session: Session, access_info: dict, job_id: str):
         session: Snowflake session object
         access_info: Salesforce access credentials dictionary
         job_id: The Bulk API 2.0 job ID to process
+        failures: Failed rows (sf__Id, sf__Error, ...) to store instead of the job's
+            failedResults, e.g. the rows still failing after retry jobs re-drove them
     """
     logger.info(f"🚀 Processing Bulk API 2.0 results for job: {job_id}")
     
@@ -414,7 +422,7 @@ def process_bulk_api_results(session: Session, access_info: dict, job_id: str):
         
         # Step 5: Retrieve and store failed results
         logger.info("📉 Retrieving failed results...")
-        failure_results = get_failed_results(access_info, job_id)
+        failure_results = get_failed_results(access_info, job_id) if failures is None else failures
         logger.debug(f"📋 Failure results: {len(failure_results) if failure_results else 0} records")
         
         insert_failure_records(session, job_id, failure_results)
@@ -445,6 +453,48 @@ def process_bulk_api_results(session: Session, access_info: dict, job_id: str):
             'error': str(e)
         }
 
+def process_collections_results(session: Session, run_id: str, successful: list, failed: list):
+    """
+    Store the results of an sObject Collections push in the LOGS tables.
+
+    The rows have the same shape as Bulk API 2.0 results, so they go into
+    LOGS.SUCCESS and LOGS.FAILURE like a job's results, under the push's
+    run ID in place of a job ID.
+
+    Args:
+        session: Snowflake session object
+        run_id: Run ID of the push ('id' of the sobject_collections.push result)
+        successful: Successful result rows (sf__Id, sf__Created, ...)
+        failed: Failed result rows (sf__Id, sf__Error, ...)
+    """
+    logger.info(f"🚀 Processing sObject Collections results for run: {run_id}")
+
+    try:
+        create_logs_schema_if_not_exists(session)
+        create_success_table(session)
+        create_failure_table(session)
+        insert_success_records(session, run_id, successful)
+        insert_failure_records(session, run_id, failed)
+
+        return {
+            'job_id': run_id,
+            'success_count': len(successful),
+            'failure_count': len(failed),
+            'job_state': 'JobComplete',
+            'success': True
+        }
+
+    except Exception as e:
+        logger.error(f"❌ ERROR processing sObject Collections results: {e}")
+        return {
+            'job_id': run_id,
+            'success_count': 0,
+            'failure_count': 0,
+            'job_state': 'Error',
+            'success': False,
+            'error': str(e)
+        }
+
 # Legacy function for backward compatibility
 def successful_results(access_info, job_id):
     """Legacy function - now redirects to the new comprehensive processing."""
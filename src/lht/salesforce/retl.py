@@ -1,52 +1,147 @@
 
-import requests
 import json
 import logging
 from lht.util import csv
 from lht.sflake import query as q
+from . import client
 from . import ingest_bapi20 as ingest
+from . import retl_state
+from . import retl_partition
+from . import retl_retry
+from . import sobject_collections
+from . import concurrency
+import io
+import csv as csv_module
+import pandas as pd
 import time
+import itertools
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 logger = logging.getLogger(__name__)
 
-def upsert(session, access_info, sobject, query, field, batch_size=25000):
+# Rows read per streamed batch from the source query
+SOURCE_BATCH_ROWS = 100000
+
+# Largest CSV upload per ingest job. Bulk API 2.0 accepts 150 MB of base64
+# encoded data per job, which Salesforce recommends keeping to 100 MB of CSV.
+MAX_UPLOAD_BYTES = 100 * 1024 * 1024
+
+def _peek_small(frames, limit):
+    """
+    Read streamed source batches until more than ``limit`` rows have arrived.
+
+    Returns:
+        tuple: (DataFrame of all rows if there are at most ``limit`` of them,
+        otherwise None; iterator over all batches, including those already read)
+    """
+    if limit <= 0:
+        return None, frames
+    frames = iter(frames)
+    peeked = []
+    rows = 0
+    for frame in frames:
+        peeked.append(frame)
+        rows += len(frame)
+        if rows > limit:
+            return None, itertools.chain(peeked, frames)
+    return (pd.concat(peeked, ignore_index=True) if peeked else pd.DataFrame()), iter(peeked)
+
+def _small_source(session, query):
+    """
+    Run the source query once and check whether it is small enough for sObject Collections.
+
+    Returns:
+        tuple: (DataFrame if the query returned at most ``sobject_collections.max_rows()``
+        rows, otherwise None; iterator over the streamed batches)
+    """
+    return _peek_small(q.stream_batches(session, query, SOURCE_BATCH_ROWS), sobject_collections.max_rows())
+
+def upsert(session, access_info, sobject, query, field, batch_size=None, max_in_flight=1, max_bytes=MAX_UPLOAD_BYTES,
+           delta=False, state_table=retl_state.STATE_TABLE, by_column=False, parent_field=None):
     """
     Upsert records to Salesforce using data from a SQL query executed against Snowflake.
     Processes records in batches to handle large datasets efficiently.
     
+    Batches are sized by their CSV: a new batch starts when the next rows
+    would take the upload over ``max_bytes`` (or ``batch_size`` rows, if set).
+    Each batch is its own Bulk API ingest job. With ``max_in_flight`` > 1 up to
+    that many jobs are uploaded and processed by Salesforce at the same time,
+    while the next batch is read from Snowflake and converted to CSV. Batches
+    are then not applied in order, so rows for the same external ID should
+    not be spread over several batches.
+    
+    With ``delta`` only rows whose hash differs from the one last pushed
+    (kept in ``state_table``, see ``retl_state``) are sent, and the state is
+    updated for the records Salesforce reports as successful. ``by_column``
+    (implies ``delta``) also narrows each job to the columns that changed:
+    rows are grouped by their set of changed columns and every group is sent
+    as its own jobs with only the external ID and those columns.
+    
+    With ``parent_field`` (a lookup such as AccountId) rows are ordered by
+    the parent and all rows of a parent go into the same job, so parallel
+    jobs don't compete for parent record locks (see ``retl_partition``).
+    A parent with more rows than ``batch_size`` (or ``max_bytes``) is split
+    across jobs and reported as shared. Each batch result carries a
+    'contention' estimate. ``parent_field`` can't be combined with
+    ``by_column``: every changed-column group would get its own jobs, so a
+    parent's rows would be spread over jobs running at the same time.
+    
+    Records that fail for a transient reason (e.g. UNABLE_TO_LOCK_ROW) are
+    re-driven in follow-up jobs; see ``retl_retry`` for the retry budget.
+    Remaining failures are listed per batch under 'failures'.
+    
+    When the rows to send are no more than ``sobject_collections.max_rows()``,
+    they are sent through the REST sObject Collections resource instead of
+    Bulk API jobs, which avoids the job create/upload/close/poll round trips.
+    The result then has 'engine' set to 'collections' and each batch result
+    (one per changed-column group) carries the Bulk-style
+    'successful_results' and 'failed_results' rows.
+    
     Args:
         session: Snowflake session object
         access_info: Salesforce access credentials dictionary
         sobject: Salesforce object name (e.g., 'Account', 'Contact')
         query: SQL query string to execute against Snowflake
         field: External ID field name for upsert operation
-        batch_size: Number of records to process per batch (default: 25000)
+        batch_size: Maximum records per batch (default: None, limited by size only)
+        max_in_flight: Number of ingest jobs allowed in flight at once (default: 1)
+        max_bytes: Maximum CSV bytes per batch (default: MAX_UPLOAD_BYTES)
+        delta: Send only new or changed rows (default: False)
+        state_table: Row hash state table for delta mode (default: LOGS.RETL_STATE)
+        by_column: Send only the changed columns, one group of jobs per column set (default: False)
+        parent_field: Parent lookup column whose rows are kept in one job (default: None)
+
+    Raises:
+        ValueError: If both ``parent_field`` and ``by_column`` are given
     """
-    logger.info("🚀 STARTING SALESFORCE UPSERT WITH BATCH PROCESSING")
-    logger.info(f"📋 Parameters: SObject={sobject}, Field={field}, Batch Size={batch_size:,}")
+    return _push_batches(session, access_info, sobject, query, field, 'upsert', batch_size=batch_size,
+                         max_in_flight=max_in_flight, max_bytes=max_bytes, delta=delta, state_table=state_table,
+                         by_column=by_column, parent_field=parent_field)
+
+def _push_batches(session, access_info, sobject, query, field, operation, batch_size=None, max_in_flight=1,
+                  max_bytes=MAX_UPLOAD_BYTES, delta=False, state_table=retl_state.STATE_TABLE, by_column=False,
+                  parent_field=None):
+    """
+    Send a query's rows in batched ingest jobs: the body of ``upsert`` and of delta ``update``.
+
+    ``operation`` is 'upsert' (``field`` is the external ID field) or
+    'update' (``field`` is 'Id'). See ``upsert`` for the other arguments
+    and the result.
+    """
+    if parent_field and by_column:
+        raise ValueError("parent_field can't be combined with by_column: changed-column groups would "
+                         "spread a parent's rows over several jobs")
+    logger.info(f"🚀 STARTING SALESFORCE {operation.upper()} WITH BATCH PROCESSING")
+    batch_limit = f"{max_bytes / (1024 * 1024):,.1f} MB" + (f" / {batch_size:,} rows" if batch_size else "")
+    logger.info(f"📋 Parameters: SObject={sobject}, Field={field}, Batch Limit={batch_limit}, Jobs in flight={max_in_flight}")
     
     try:
         access_token = access_info['access_token']
         
-        # Wrap the user query in a subquery so we can safely add LIMIT/OFFSET
-        # This handles cases where the user's query already has LIMIT
-        base_query = f"SELECT * FROM ({query}) AS _retl_source"
-        
-        logger.debug("🔍 STEP 1: Getting total record count...")
-        # First, get the total count of records to determine number of batches
-        count_query = f"SELECT COUNT(*) as total_count FROM ({query})"
-        count_result = session.sql(count_query).collect()
-        total_records = count_result[0][0] if count_result else 0
-        
-        logger.info(f"📊 Total records to process: {total_records:,}")
-        
-        if total_records == 0:
-            logger.warning("⚠️ No records found to process")
-            return None
-        
-        # Calculate number of batches needed
-        num_batches = (total_records + batch_size - 1) // batch_size
-        logger.info(f"📦 Will process {total_records:,} records in {num_batches} batch(es) of up to {batch_size:,} records each")
+        # The query runs once; its result is streamed and encoded into batches
+        # of at most max_bytes (no COUNT(*) and no LIMIT/OFFSET re-runs, so
+        # batches are consistent even without an ORDER BY)
+        logger.debug("🔍 STEP 1: Streaming source query results...")
         
         bulk_api_url = access_info['instance_url']+ f"/services/data/v62.0/jobs/ingest"
         logger.debug(f"🔗 Bulk API URL: {bulk_api_url}")
@@ -54,369 +149,524 @@ def upsert(session, access_info, sobject, query, field, batch_size=25000):
         # Job data template
         job_data_template = {
             "object": f"{sobject}",  # Specify the Salesforce object
-            "operation": "upsert",  # Use upsert operation
-            "externalIdFieldName": f"{field}",  # Field to use for upsert
+            "operation": operation,  # Use upsert or update operation
             "lineEnding" : "CRLF"
         }
+        if operation == 'upsert':
+            job_data_template["externalIdFieldName"] = f"{field}"  # Field to use for upsert
 
         headers = {'Authorization': f'Bearer {access_token}', 'Content-Type': 'application/json'}
+
+        delta = delta or by_column
+        pending_hashes = {}
+        succeeded_ids = []
+        columns = None
+        parent_column = None
+        parent_name = None
+        if delta or parent_field:
+            columns = retl_state.source_columns(session, query)
+        if parent_field:
+            parent_column = retl_state.resolve_column(columns, parent_field)
+            parent_name = parent_column.strip('"')
+            logger.info(f"🔒 Partitioning by {parent_field}: all rows of a parent go into the same job")
+        if delta:
+            id_column = retl_state.resolve_column(columns, field)
+            retl_state.ensure_state_table(session, state_table)
+            delta_query = retl_state.delta_query(query, sobject, field, columns, id_column, state_table, by_column=by_column,
+                                                 order_by=[parent_column] if parent_column else None)
+            logger.info(f"🧮 Delta mode: sending only {'columns' if by_column else 'rows'} changed since the last push ({state_table})")
+            frames = retl_state.split_hashes(q.stream_batches(session, delta_query, SOURCE_BATCH_ROWS), id_column, pending_hashes)
+        else:
+            source_query = f"SELECT * FROM ({query}) ORDER BY {parent_column}" if parent_column else query
+            frames = q.stream_batches(session, source_query, SOURCE_BATCH_ROWS)
+        small, frames = _peek_small(frames, sobject_collections.max_rows())
+        use_collections = small is not None and not small.empty
+        id_name = id_column.strip('"') if delta else None
+
+        def _encode(group_frames):
+            if parent_name:
+                group_frames = retl_partition.align_groups(group_frames, parent_name, max_rows=batch_size, max_bytes=max_bytes)
+            return csv.csv_payloads(group_frames, max_bytes, max_rows=batch_size, group_by=parent_name)
+
+        def _payloads():
+            if not by_column:
+                yield from _encode(frames)
+                return
+            for changed_columns, group_frames in retl_state.group_changed_columns(frames, id_column):
+                if not changed_columns:
+                    # Row hash changed without any column changing; nothing to send
+                    for frame in group_frames:
+                        succeeded_ids.extend(frame[id_name].astype(str))
+                    continue
+                logger.debug(f"🧮 Sending rows with changed columns: {', '.join(changed_columns)}")
+                yield from _encode(group_frames)
         
+        contention_reports = {}
+        seen_parents = set()
+
         all_job_info = []
-        successful_batches = 0
-        failed_batches = 0
-        total_processed = 0
-
-        # Process records in batches - query each batch separately
-        for batch_num in range(num_batches):
-            offset = batch_num * batch_size
-            limit = batch_size
-            
-            logger.debug(f"🔍 STEP 2.{batch_num + 1}: Processing batch {batch_num + 1}/{num_batches}")
-            logger.debug(f"📊 Batch range: records {offset + 1:,} to {min(offset + batch_size, total_records):,}")
-            
-            try:
-                # Query only the records for this batch using LIMIT and OFFSET on the wrapped query
-                batch_query = f"{base_query} LIMIT {limit} OFFSET {offset}"
-                logger.debug(f"🔍 Executing batch query: {batch_query[:100]}...")
-                
-                results = session.sql(batch_query).collect()
-                
-                # Convert results to the expected format
-                batch_records = []
-                for result in results:
-                    record = {}
-                    for key, value in result.asDict().items():
-                        if value is None:
-                            record[key] = ''
-                        else:
-                            record[key] = value
-                    batch_records.append(record)
-                
-                actual_batch_size = len(batch_records)
-                total_processed += actual_batch_size
-                logger.debug(f"📊 Retrieved {actual_batch_size:,} records for this batch (Total processed: {total_processed:,}/{total_records:,})")
-                
-                if actual_batch_size == 0:
-                    logger.warning("⚠️ No records in this batch, skipping...")
-                    continue
-                
-                logger.debug("🔍 Converting batch records to CSV format...")
-                batch_data = csv.json_to_csv(batch_records)
-                logger.debug(f"📄 Batch CSV data length: {len(batch_data):,} characters")
-
-                # Create a new job for this batch
-                logger.debug("🔍 Creating Salesforce Bulk API job for this batch...")
-                response = requests.post(bulk_api_url, headers=headers, data=json.dumps(job_data_template))
-                
-                if response.status_code != 200:
-                    logger.error(f"❌ Job creation failed with status {response.status_code}")
-                    logger.error(f"❌ Response: {response.text}")
-                    response.raise_for_status()
-                    
-                job_info = response.json()
-                logger.info(f"✅ Job created successfully: {job_info}")
-                job_id = job_info['id']
-                logger.debug(f"🆔 Job ID: {job_id}")
-
-                #########################################################
-                ###  SEND BATCH FILE
-                #########################################################
-                logger.debug("🔍 Sending batch CSV data to Salesforce...")
-                ingest.send_file(access_info, job_id, batch_data)
-                logger.info("✅ Batch file sent successfully")
-                
-                #########################################################
-                ###  CLOSE JOB
-                #########################################################
-                logger.debug("🔍 Closing job to start processing...")
-                close_results = ingest.job_close(access_info, job_id)
-                logger.info(f"✅ Job closed: {close_results}")
-
-                #########################################################
-                ###  CHECK STATUS
-                #########################################################
-                logger.debug("🔍 Monitoring batch job status...")
-                status_check_count = 0
-                batch_success = False
-                
-                while True:
-                    status_check_count += 1
-                    close_results = ingest.job_status(access_info, job_id)
-                    logger.debug(f"📊 Status check #{status_check_count} - ID: {close_results['id']}, Status: {close_results['state']}")
-                    
-                    if close_results['state'] == 'JobComplete':
-                        logger.info("✅ Batch job completed successfully!")
-                        batch_success = True
-                        successful_batches += 1
-                        break
-                    elif close_results['state'] in ['Failed', 'Aborted']:
-                        logger.error(f"❌ Batch job failed with status: {close_results['state']}")
-                        logger.error(f"❌ Full job details: {close_results}")
-                        failed_batches += 1
-                        break
-                    
-                    logger.debug("⏳ Waiting 10 seconds before next status check...")
-                    time.sleep(10)
-                
-                # Store job info for this batch
-                batch_job_info = {
-                    'batch_number': batch_num + 1,
-                    'job_id': job_id,
-                    'records_processed': actual_batch_size,
-                    'success': batch_success,
-                    'job_info': job_info
-                }
+        total_records = 0
+        num_batches = 0
+
+        def _collect(finished):
+            for future in finished:
+                batch_job_info = future.result()
+                succeeded_ids.extend(batch_job_info.pop('successful_ids', ()))
                 all_job_info.append(batch_job_info)
-                
-                logger.info(f"✅ Batch {batch_num + 1} processing completed")
-                
-                # Clear batch_records from memory to free up space
-                del batch_records
-                del batch_data
-                
-            except Exception as batch_error:
-                logger.error(f"❌ Error processing batch {batch_num + 1}: {batch_error}")
-                failed_batches += 1
-                batch_job_info = {
-                    'batch_number': batch_num + 1,
+                logger.info(f"✅ Batch {batch_job_info['batch_number']} processing completed")
+
+        def _push_collections():
+            if by_column:
+                groups = [(changed_columns, pd.concat(list(group_frames), ignore_index=True))
+                          for changed_columns, group_frames in retl_state.group_changed_columns([small], id_column)]
+            else:
+                groups = [(None, small)]
+            for changed_columns, group in groups:
+                if changed_columns == []:
+                    # Row hash changed without any column changing; nothing to send
+                    succeeded_ids.extend(group[id_name].astype(str))
+                    continue
+                # Parallel calls would compete for the parents' locks
+                push_result = sobject_collections.push(access_info, sobject, operation, group, field,
+                                                       max_workers=1 if parent_name else None)
+                failures = [{'error': row['sf__Error'], 'record': {key: value for key, value in row.items() if not key.startswith('sf__')}}
+                            for row in push_result['failed_results']]
+                if delta:
+                    succeeded_ids.extend(row[id_name] for row in push_result['successful_results'] if id_name in row)
+                all_job_info.append({
+                    'batch_number': len(all_job_info) + 1,
                     'job_id': None,
-                    'records_processed': 0,
-                    'success': False,
-                    'error': str(batch_error)
-                }
-                all_job_info.append(batch_job_info)
-                continue
+                    'run_id': push_result['id'],
+                    'engine': 'collections',
+                    'records_processed': len(group),
+                    'success': True,
+                    'calls': push_result['calls'],
+                    'records_retried': push_result['records_retried'],
+                    'records_recovered': push_result['records_recovered'],
+                    'failures': failures,
+                    'successful_results': push_result['successful_results'],
+                    'failed_results': push_result['failed_results'],
+                })
+            return len(all_job_info), sum(len(group) for changed_columns, group in groups if changed_columns != [])
+
+        if use_collections:
+            logger.info(f"⚡ {len(small):,} rows to send: using sObject Collections instead of Bulk API jobs")
+            num_batches, total_records = _push_collections()
+        else:
+            # Batches are read from Snowflake and converted here while up to
+            # max_in_flight jobs upload and run in the pool
+            with ThreadPoolExecutor(max_workers=max(1, max_in_flight), thread_name_prefix='lht-ingest') as executor:
+                in_flight = set()
+                for batch_num, (batch_data, actual_batch_size) in enumerate(_payloads()):
+                    num_batches = batch_num + 1
+                    total_records += actual_batch_size
+                    logger.debug(f"🔍 STEP 2.{batch_num + 1}: Encoded {actual_batch_size:,} records ({len(batch_data):,} bytes) for batch {batch_num + 1} (Total: {total_records:,})")
+                    if parent_name:
+                        report = retl_partition.contention(batch_data.groups, seen_parents, concurrent=max_in_flight > 1)
+                        contention_reports[batch_num + 1] = report
+                        logger.info(f"🔒 Batch {batch_num + 1}: {report['parents']:,} parents (largest {report['largest_parent_rows']:,} rows), "
+                                    f"{report['shared_parents']} shared with earlier batches, {report['straddling_parents']} straddling "
+                                    f"{retl_partition.INTERNAL_BATCH_ROWS:,}-record chunks; estimated contention: {report['risk']}")
+
+                    # Wait for a free slot so at most max_in_flight CSVs are held
+                    while len(in_flight) >= max(1, max_in_flight):
+                        finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        _collect(finished)
+                    in_flight.add(executor.submit(
+                        _run_upsert_batch, access_info, bulk_api_url, headers, job_data_template,
+                        batch_num + 1, batch_data, actual_batch_size, field if delta else None
+                    ))
+                    del batch_data
+
+                _collect(wait(in_flight).done)
+
+        records_recorded = 0
+        if delta:
+            pushed = dict(pending_hashes[external_id] for external_id in succeeded_ids if external_id in pending_hashes)
+            records_recorded = retl_state.record_pushed(session, sobject, field, pushed, state_table)
+
+        if total_records == 0:
+            if delta:
+                logger.info("✅ No new or changed records to send")
+            else:
+                logger.warning("⚠️ No records found to process")
+            return None
 
-        logger.info("✅ BATCH UPSERT PROCESSING COMPLETED")
+        all_job_info.sort(key=lambda info: info['batch_number'])
+        for info in all_job_info:
+            if info['batch_number'] in contention_reports:
+                info['contention'] = contention_reports[info['batch_number']]
+        successful_batches = sum(1 for info in all_job_info if info['success'])
+        failed_batches = len(all_job_info) - successful_batches
+        total_processed = sum(info['records_processed'] for info in all_job_info)
+        failures = [failure for info in all_job_info for failure in info.get('failures', ())]
+        records_recovered = sum(info.get('records_recovered', 0) for info in all_job_info)
+        if failures or records_recovered:
+            logger.info(f"🔁 Failed records: {len(failures):,} ({records_recovered:,} recovered by retries)")
+
+        logger.info(f"✅ BATCH {operation.upper()} PROCESSING COMPLETED")
         logger.info(f"📊 Summary: {total_records:,} total records, {total_processed:,} processed, {successful_batches}/{num_batches} successful batches")
         
         return {
+            'engine': 'collections' if use_collections else 'bulk',
             'total_records': total_records,
             'records_processed': total_processed,
             'total_batches': num_batches,
             'successful_batches': successful_batches,
             'failed_batches': failed_batches,
-            'batch_results': all_job_info
+            'batch_results': all_job_info,
+            'delta': delta,
+            'records_recorded': records_recorded,
+            'contention': retl_partition.summarize([contention_reports[number] for number in sorted(contention_reports)]),
+            'records_failed': len(failures),
+            'records_recovered': records_recovered,
+            'failure_codes': retl_retry.failure_codes(failures)
         }
         
     except Exception as e:
-        logger.error("❌ UPSERT FAILED")
+        logger.error(f"❌ {operation.upper()} FAILED")
         logger.error(f"Error: {e}")
         logger.error(f"Error type: {type(e).__name__}")
         raise
 
-def update(session, access_info, sobject, query):
-    access_token = access_info['access_token']
-
-    logger.info("🚀 STARTING SALESFORCE UPDATE")
-    logger.info(f"📋 Parameters: SObject={sobject}")
-
-    #records = q.get_records(session, query)
-    results = session.sql(query).collect()
-    # Convert results to the expected format
-    records = []
-    for result in results:
-        record = {}
-        for key, value in result.asDict().items():
-            if value is None:
-                record[key] = ''
-            else:
-                record[key] = value
-        records.append(record)
-
-    logger.info(f"📊 Records to update: {len(records):,}")
-
-    data = csv.json_to_csv(records)
-
-    bulk_api_url = access_info['instance_url']+ f"/services/data/v62.0/jobs/ingest"
-
-    # Create a new job
-    job_data = {
-        "object": f"{sobject}",  # Specify the Salesforce object
-        "operation": "update",  # Use update operation
-        "lineEnding" : "CRLF"
-    }
+def _create_job(access_info, bulk_api_url, headers, job_data, data, label):
+    """
+    Create an ingest job with its CSV and hand it to Salesforce for processing.
 
-    headers = {'Authorization': f'Bearer {access_token}', 'Content-Type': 'application/json'}
+    CSV of at most ``ingest.MAX_INLINE_BYTES`` goes inline in a multipart
+    job creation request, which leaves the job in UploadComplete state. Larger
+    CSV is uploaded after the job is created, and the job is then closed.
 
-    # Create the job
-    logger.debug("creating job")
-    response = requests.post(bulk_api_url, headers=headers, data=json.dumps(job_data))
+    Returns:
+        dict: Job info from creation
+    """
+    inline = len(data) <= ingest.MAX_INLINE_BYTES
+    logger.debug(f"🔍 Creating Salesforce Bulk API job for {label}{' with inline data' if inline else ''}...")
+    if inline:
+        response = ingest.create_job_with_data(access_info, job_data, data)
+    else:
+        response = client.post(access_info, bulk_api_url, call_type='bulk_ingest', creates_job=True, headers=headers, data=json.dumps(job_data))
+    
+    if response.status_code != 200:
+        logger.error(f"❌ Job creation failed with status {response.status_code}")
+        logger.error(f"❌ Response: {response.text}")
+        response.raise_for_status()
+        
     job_info = response.json()
-    #log_retl.job(session, job_info)
-
+    logger.info(f"✅ Job created successfully: {job_info}")
     job_id = job_info['id']
-    logger.info(f"✅ Job created: {job_id}")
+    logger.debug(f"🆔 Job ID: {job_id}")
+    if inline:
+        logger.info(f"✅ {label} data sent with the job ({len(data):,} bytes)")
+        return job_info
 
     #########################################################
     ###  SEND BATCH FILE
     #########################################################
-    #def add_batch(instance_url, access_token, job_id, data):
-    logger.debug("sending file")
+    logger.debug("🔍 Sending batch CSV data to Salesforce...")
     ingest.send_file(access_info, job_id, data)
-    logger.info("✅ Data sent to Salesforce")
+    logger.info(f"✅ {label} file sent successfully")
     
     #########################################################
     ###  CLOSE JOB
     #########################################################
-    logger.debug("closing job")
+    logger.debug("🔍 Closing job to start processing...")
     close_results = ingest.job_close(access_info, job_id)
+    logger.info(f"✅ Job closed: {close_results}")
+    return job_info
+
+def _run_ingest_job(access_info, bulk_api_url, headers, job_data_template, data, label):
+    """
+    Create, upload, close and monitor one ingest job.
 
+    Returns:
+        tuple: (job info from creation, final job status)
+    """
+    job_info = _create_job(access_info, bulk_api_url, headers, job_data_template, data, label)
+    job_id = job_info['id']
 
     #########################################################
     ###  CHECK STATUS
-    #########################################################    
+    #########################################################
+    logger.debug("🔍 Monitoring batch job status...")
+    status_check_count = 0
+    
     while True:
+        status_check_count += 1
         close_results = ingest.job_status(access_info, job_id)
-        logger.debug(f"ID: {close_results['id']}, Status: {close_results['state']}")
+        logger.debug(f"📊 Status check #{status_check_count} - ID: {close_results['id']}, Status: {close_results['state']}")
+        
         if close_results['state'] == 'JobComplete':
-            logger.info("✅ Update completed successfully!")
+            logger.info(f"✅ {label} job completed successfully!")
             break
         elif close_results['state'] in ['Failed', 'Aborted']:
-            logger.error(f"❌ Update job failed with status: {close_results['state']}")
-            logger.error(f"❌ Job details: {close_results}")
-            raise RuntimeError(f"Salesforce update job failed: {close_results['state']}")
+            logger.error(f"❌ {label} job failed with status: {close_results['state']}")
+            logger.error(f"❌ Full job details: {close_results}")
+            break
+        
+        logger.debug("⏳ Waiting 10 seconds before next status check...")
         time.sleep(10)
 
-    return job_info
+    return job_info, close_results
 
-def insert(session, access_info, sobject, query):
-    access_token = access_info['access_token']
-
-    logger.info("🚀 STARTING SALESFORCE INSERT")
-    logger.info(f"📋 Parameters: SObject={sobject}")
+def _run_jobs(access_info, job_data, frames, label):
+    """
+    Push streamed source batches through as many ingest jobs as their CSV needs.
 
-    records = q.get_records(session, query)
-    logger.info(f"📊 Records to insert: {len(records):,}")
+    The CSV is split at MAX_UPLOAD_BYTES (see ``csv.csv_payloads``) and each
+    part is created, uploaded, closed and monitored as its own job, one after
+    the other.
 
-    data = csv.json_to_csv(records)
+    Returns:
+        dict: Job info of the first job, with 'job_ids' listing every job and
+        'records_processed' the rows sent, or None if the query returned no rows
 
-    bulk_api_url = access_info['instance_url']+ f"/services/data/v62.0/jobs/ingest"
+    Raises:
+        RuntimeError: If a job failed; the jobs before it have been applied
+    """
+    bulk_api_url = access_info['instance_url'] + "/services/data/v62.0/jobs/ingest"
+    headers = {'Authorization': f"Bearer {access_info['access_token']}", 'Content-Type': 'application/json'}
+
+    first_job_info = None
+    job_ids = []
+    total_records = 0
+    for job_number, (data, record_count) in enumerate(csv.csv_payloads(frames, MAX_UPLOAD_BYTES), start=1):
+        logger.info(f"📊 {label} job {job_number}: {record_count:,} records ({len(data):,} bytes)")
+        job_info, status = _run_ingest_job(access_info, bulk_api_url, headers, job_data, data, f"{label} job {job_number}")
+        del data
+        job_ids.append(job_info['id'])
+        total_records += record_count
+        first_job_info = first_job_info or job_info
+        if status['state'] != 'JobComplete':
+            raise RuntimeError(f"Salesforce {job_data['operation']} job failed: {status['state']}"
+                               + (f" (completed jobs: {', '.join(job_ids[:-1])})" if len(job_ids) > 1 else ""))
+
+    if first_job_info is None:
+        logger.warning("no data to process")
+        return None
+    logger.info(f"✅ {label} completed: {total_records:,} records in {len(job_ids)} job(s)")
+    first_job_info['job_ids'] = job_ids
+    first_job_info['records_processed'] = total_records
+    return first_job_info
+
+def _run_upsert_batch(access_info, bulk_api_url, headers, job_data_template, batch_number, batch_data, record_count,
+                      external_id_field=None):
+    """
+    Create, upload, close and monitor the ingest job for one upsert (or delta update) batch.
 
-    # Create a new job
-    job_data = {
-        "object": f"{sobject}",  
-        "contentType" : "CSV",
-        "operation": "insert",  
-        "lineEnding" : "CRLF"
-    }
+    Retryable failed records are re-driven in follow-up jobs (see
+    ``retl_retry``). With ``external_id_field`` the external IDs of the
+    successful records of all these jobs are returned under 'successful_ids'.
 
-    headers = {'Authorization': f'Bearer {access_token}', 'Content-Type': 'application/json'}
+    Returns:
+        dict: Batch result (batch_number, job_id, records_processed, success, job_info or error,
+        and retry_job_ids, records_retried, records_recovered and failures if records failed)
+    """
+    try:
+        job_info, status = _run_ingest_job(access_info, bulk_api_url, headers, job_data_template, batch_data, f"Batch {batch_number}")
+        job_id = job_info['id']
+        batch_success = status['state'] == 'JobComplete'
+        
+        batch_result = {
+            'batch_number': batch_number,
+            'job_id': job_id,
+            'records_processed': record_count,
+            'success': batch_success,
+            'job_info': job_info
+        }
+        if batch_success and int(status.get('numberRecordsFailed') or 0):
+            batch_result.update(_redrive_failures(access_info, bulk_api_url, headers, job_data_template, job_id, batch_number))
 
-    # Create the job
-    logger.debug("creating job")
-    response = requests.post(bulk_api_url, headers=headers, data=json.dumps(job_data))
-    job_info = response.json()
-    #log_retl.job(session, job_info)
+        if external_id_field and batch_success:
+            try:
+                successful_ids = []
+                for succeeded_job_id in [job_id] + batch_result.get('retry_job_ids', []):
+                    successful_ids.extend(_successful_external_ids(access_info, succeeded_job_id, external_id_field))
+                batch_result['successful_ids'] = successful_ids
+            except Exception as results_error:
+                # The rows aren't recorded as pushed and are sent again next run
+                logger.warning(f"⚠️ Could not read successful results of job {job_id}: {results_error}")
+        return batch_result
+        
+    except Exception as batch_error:
+        logger.error(f"❌ Error processing batch {batch_number}: {batch_error}")
+        return {
+            'batch_number': batch_number,
+            'job_id': None,
+            'records_processed': 0,
+            'success': False,
+            'error': str(batch_error)
+        }
 
-    job_id = job_info['id']
-    logger.info(f"✅ Job created: {job_id}")
+def _redrive_failures(access_info, bulk_api_url, headers, job_data_template, job_id, batch_number):
+    """
+    Send a job's retryable failed records again, with backoff, up to the retry budget.
 
-    #########################################################
-    ###  SEND BATCH FILE
-    #########################################################
-    #def add_batch(instance_url, access_token, job_id, data):
-    logger.debug("sending file")
-    ingest.send_file(access_info, job_id, data)
-    logger.info("✅ Data sent to Salesforce")
-    
-    #########################################################
-    ###  CLOSE JOB
-    #########################################################
-    logger.debug("closing job")
-    close_results = ingest.job_close(access_info, job_id)
+    Returns:
+        dict: retry_job_ids, records_retried, records_recovered and failures
+        (permanent failures plus records still failing when the budget ran out)
+    """
+    settings = retl_retry.settings()
+    retry_rows, failures = retl_retry.split_failures(_failed_results_csv(access_info, job_id))
+    initial_failures = len(failures) + (len(retry_rows) if retry_rows is not None else 0)
+    logger.warning(f"⚠️ Batch {batch_number}: {initial_failures:,} records failed, "
+                   f"{len(retry_rows) if retry_rows is not None else 0:,} retryable")
+
+    retry_job_ids = []
+    records_retried = 0
+    attempt = 0
+    max_rows = settings['max_rows_per_job'] if settings['max_rows_per_job'] and settings['max_rows_per_job'] > 0 else None
+    while retry_rows is not None and attempt < settings['max_attempts']:
+        attempt += 1
+        delay = settings['backoff_seconds'] * (2 ** (attempt - 1))
+        logger.info(f"🔁 Batch {batch_number}: re-driving {len(retry_rows):,} records in {delay:.0f}s "
+                    f"(attempt {attempt}/{settings['max_attempts']})")
+        time.sleep(delay)
+        records_retried += len(retry_rows)
+
+        still_failing = []
+        offset = 0
+        payloads = csv.csv_payloads([retry_rows.drop(columns=['sf__Error'])], MAX_UPLOAD_BYTES, max_rows=max_rows)
+        for retry_data, rows in payloads:
+            part = retry_rows.iloc[offset:offset + rows]
+            offset += rows
+            try:
+                with retl_retry.retry_slot():
+                    retry_info, retry_status = _run_ingest_job(access_info, bulk_api_url, headers, job_data_template, retry_data,
+                                                               f"Batch {batch_number} retry {attempt}")
+            except Exception as retry_error:
+                logger.warning(f"⚠️ Batch {batch_number} retry {attempt} job failed: {retry_error}")
+                still_failing.append(part)
+                continue
+            retry_job_ids.append(retry_info['id'])
+            if retry_status['state'] != 'JobComplete':
+                still_failing.append(part)
+            elif int(retry_status.get('numberRecordsFailed') or 0):
+                retryable, permanent = retl_retry.split_failures(_failed_results_csv(access_info, retry_info['id']))
+                failures.extend(permanent)
+                if retryable is not None:
+                    still_failing.append(retryable)
+        retry_rows = pd.concat(still_failing, ignore_index=True) if still_failing else None
+
+    if retry_rows is not None:
+        logger.warning(f"⚠️ Batch {batch_number}: {len(retry_rows):,} records still failing after {attempt} retry round(s)")
+        failures.extend(retl_retry.to_failures(retry_rows))
+    records_recovered = initial_failures - len(failures)
+    if failures:
+        logger.warning(f"⚠️ Batch {batch_number}: {len(failures):,} records failed "
+                       f"({', '.join(f'{code}: {count:,}' for code, count in retl_retry.failure_codes(failures).items())})")
+    return {
+        'retry_job_ids': retry_job_ids,
+        'records_retried': records_retried,
+        'records_recovered': records_recovered,
+        'failures': failures,
+    }
 
+def _failed_results_csv(access_info, job_id):
+    """The failedResults CSV of an ingest job."""
+    url = access_info['instance_url'] + f"/services/data/v62.0/jobs/ingest/{job_id}/failedResults/"
+    headers = {'Authorization': f"Bearer {access_info['access_token']}", 'Accept': 'text/csv'}
+    response = client.get(access_info, url, call_type='bulk_ingest', headers=headers)
+    response.raise_for_status()
+    # Row lock contention in an ingest job is a signal to back off like a 503
+    if 'UNABLE_TO_LOCK_ROW' in response.text:
+        concurrency.get_controller(access_info).record_throttle('UNABLE_TO_LOCK_ROW')
+    return response.text
+
+def _successful_external_ids(access_info, job_id, field):
+    """External ID values of an ingest job's successful records, as they were uploaded."""
+    url = access_info['instance_url'] + f"/services/data/v62.0/jobs/ingest/{job_id}/successfulResults/"
+    headers = {'Authorization': f"Bearer {access_info['access_token']}", 'Accept': 'text/csv'}
+    response = client.get(access_info, url, call_type='bulk_ingest', headers=headers)
+    response.raise_for_status()
+
+    reader = csv_module.reader(io.StringIO(response.text))
+    header = next(reader, None)
+    if not header:
+        return []
+    lowered = [name.lower() for name in header]
+    if field.lower() not in lowered:
+        logger.warning(f"⚠️ Successful results of job {job_id} have no {field} column")
+        return []
+    index = lowered.index(field.lower())
+    return [row[index] for row in reader if len(row) > index]
+
+def update(session, access_info, sobject, query, delta=False, state_table=retl_state.STATE_TABLE, by_column=False):
+    """
+    Update records by Id using data from a SQL query executed against Snowflake.
+
+    With ``delta`` or ``by_column`` the rows go through the same batched
+    change-only path as ``upsert`` with ``Id`` as the key (rows or columns
+    changed since the last push, hashes kept in ``state_table``), and the
+    result is an upsert-style summary with 'batch_results'. Otherwise the
+    result is the job info of the first ingest job, with 'job_ids' listing
+    every job, or the sObject Collections result for a small source.
+    """
+    if delta or by_column:
+        return _push_batches(session, access_info, sobject, query, 'Id', 'update', delta=delta,
+                             state_table=state_table, by_column=by_column)
 
-    #########################################################
-    ###  CHECK STATUS
-    #########################################################    
-    while True:
-        close_results = ingest.job_status(access_info, job_id)
-        logger.debug(f"ID: {close_results['id']}, Status: {close_results['state']}")
-        if close_results['state'] == 'JobComplete':
-            logger.info("✅ Insert completed successfully!")
-            break
-        elif close_results['state'] in ['Failed', 'Aborted']:
-            logger.error(f"❌ Insert job failed with status: {close_results['state']}")
-            logger.error(f"❌ Job details: {close_results}")
-            raise RuntimeError(f"Salesforce insert job failed: {close_results['state']}")
-        time.sleep(10)
+    logger.info("🚀 STARTING SALESFORCE UPDATE")
+    logger.info(f"📋 Parameters: SObject={sobject}")
 
-    return job_info
+    small, frames = _small_source(session, query)
+    if small is not None:
+        if small.empty:
+            logger.warning("no data to process")
+            return None
+        logger.info(f"📊 Records to update: {len(small):,} (sObject Collections)")
+        return sobject_collections.push(access_info, sobject, 'update', small)
 
-def delete(session, access_info, sobject, query, field):
+    # Create a new job
+    job_data = {
+        "object": f"{sobject}",  # Specify the Salesforce object
+        "operation": "update",  # Use update operation
+        "lineEnding" : "CRLF"
+    }
 
-    access_token = access_info['access_token']
+    return _run_jobs(access_info, job_data, frames, "Update")
 
-    logger.info("🚀 STARTING SALESFORCE DELETE")
+def insert(session, access_info, sobject, query):
+    logger.info("🚀 STARTING SALESFORCE INSERT")
     logger.info(f"📋 Parameters: SObject={sobject}")
 
-    results = session.sql(query).collect()
-    # Convert results to the expected format
-    records = []
-    for result in results:
-        record = {}
-        for key, value in result.asDict().items():
-            if value is None:
-                record[key] = ''
-            else:
-                record[key] = value
-        records.append(record)
-
-    logger.info(f"📊 Records to delete: {len(records):,}")
-
-    data = csv.json_to_csv(records)
-
-    bulk_api_url = access_info['instance_url']+ f"/services/data/v62.0/jobs/ingest"
+    small, frames = _small_source(session, query)
+    if small is not None:
+        if small.empty:
+            logger.warning("no data to process")
+            return None
+        logger.info(f"📊 Records to insert: {len(small):,} (sObject Collections)")
+        return sobject_collections.push(access_info, sobject, 'insert', small)
 
     # Create a new job
     job_data = {
         "object": f"{sobject}",  
         "contentType" : "CSV",
-        "operation": "delete", 
+        "operation": "insert",  
         "lineEnding" : "CRLF"
     }
 
-    headers = {'Authorization': f'Bearer {access_token}', 'Content-Type': 'application/json'}
+    return _run_jobs(access_info, job_data, frames, "Insert")
 
-    # Create the job
-    logger.debug("creating job")
-    response = requests.post(bulk_api_url, headers=headers, data=json.dumps(job_data))
-    job_info = response.json()
-    logger.debug(f"JOB: {job_info}")
-    #log_retl.job(session, job_info)
+def delete(session, access_info, sobject, query, field):
 
-    job_id = job_info['id']
-    logger.info(f"✅ Job created: {job_id}")
+    logger.info("🚀 STARTING SALESFORCE DELETE")
+    logger.info(f"📋 Parameters: SObject={sobject}")
 
-    #########################################################
-    ###  SEND BATCH FILE
-    #########################################################
-    #def add_batch(instance_url, access_token, job_id, data):
-    logger.debug("sending file")
-    ingest.send_file(access_info, job_id, data)
-    logger.info("✅ Data sent to Salesforce")
-    
-    #########################################################
-    ###  CLOSE JOB
-    #########################################################
-    logger.debug("closing job")
-    close_results = ingest.job_close(access_info, job_id)
+    small, frames = _small_source(session, query)
+    if small is not None:
+        if small.empty:
+            logger.warning("no data to process")
+            return None
+        logger.info(f"📊 Records to delete: {len(small):,} (sObject Collections)")
+        return sobject_collections.push(access_info, sobject, 'delete', small)
 
+    # Create a new job
+    job_data = {
+        "object": f"{sobject}",  
+        "contentType" : "CSV",
+        "operation": "delete", 
+        "lineEnding" : "CRLF"
+    }
 
-    #########################################################
-    ###  CHECK STATUS
-    #########################################################    
-    while True:
-        close_results = ingest.job_status(access_info, job_id)
-        logger.debug(f"ID: {close_results['id']}, Status: {close_results['state']}")
-        if close_results['state'] == 'JobComplete':
-            logger.info("✅ Delete completed successfully!")
-            break
-        elif close_results['state'] in ['Failed', 'Aborted']:
-            logger.error(f"❌ Delete job failed with status: {close_results['state']}")
-            logger.error(f"❌ Job details: {close_results}")
-            raise RuntimeError(f"Salesforce delete job failed: {close_results['state']}")
-        time.sleep(10)
-    
-    return job_info
\ No newline at end of file
+    return _run_jobs(access_info, job_data, frames, "Delete")
@@ -0,0 +1,118 @@
+"""
+Parent-aware partitioning for parallel rETL upserts.
+
+Salesforce locks a parent record (e.g. the Account) while it saves child
+records that look it up, so child rows for one parent that are processed at
+the same time by different jobs fail with UNABLE_TO_LOCK_ROW. With a parent
+column, the source rows are ordered by it and every parent's rows are kept
+in one job, so concurrent jobs don't share a parent. A parent is only split
+when its rows don't fit in one job. Changed-column grouping is not combined
+with a parent column, because each column group is sent as its own jobs.
+
+Inside a job Salesforce processes records in chunks of INTERNAL_BATCH_ROWS,
+possibly in parallel; rows are sorted by parent so that a parent's rows
+straddle at most one chunk boundary. ``contention`` estimates what remains
+for each job.
+"""
+
+import logging
+from typing import Dict, Any, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Records per internal chunk Salesforce splits a Bulk API 2.0 ingest job into
+INTERNAL_BATCH_ROWS = 10000
+
+
+def align_groups(frames, column: str, max_rows: Optional[int] = None, max_bytes: Optional[int] = None):
+    """
+    Re-cut ordered DataFrames so no run of equal ``column`` values spans two of them.
+
+    The rows of the last value in each DataFrame are held back and prepended
+    to the next one. A group that grows past ``max_rows`` rows or
+    ``max_bytes`` of CSV doesn't fit in one job and is split anyway, so it
+    is passed on instead of being held back further; this keeps the rows
+    held in memory to about one job plus one DataFrame.
+
+    Yields:
+        pandas.DataFrame: Batches that end on a group boundary, except for
+        parts of a group too large for one job
+    """
+    import pandas as pd
+    from lht.util import csv
+
+    carry = None
+    for frame in frames:
+        if frame.empty:
+            continue
+        if carry is not None:
+            frame = pd.concat([carry, frame], ignore_index=True)
+        tail = int(csv._group_starts(frame[column])[-1])
+        carry = frame.iloc[tail:]
+        if tail:
+            yield frame.iloc[:tail]
+        elif ((max_rows and len(carry) >= max_rows)
+              or (max_bytes and len(csv._encode_rows(carry)) >= max_bytes)):
+            yield carry
+            carry = None
+    if carry is not None:
+        yield carry
+
+
+def contention(groups: List[list], seen_parents: Set[Any], concurrent: bool = False) -> Dict[str, Any]:
+    """
+    Estimate lock contention for one job.
+
+    Args:
+        groups: ``[parent, rows]`` for the job's rows in order (``CsvBody.groups``)
+        seen_parents: Parents of earlier jobs; this job's parents are added
+        concurrent: Whether jobs run in parallel
+
+    Returns:
+        dict: parents, largest_parent_rows, shared_parents (parents that
+        also have rows in an earlier job), straddling_parents (parents
+        crossing an internal chunk boundary) and risk ('none', 'low' or 'high')
+    """
+    straddling = 0
+    shared = 0
+    position = 0
+    parents = []
+    for parent, rows in groups:
+        # Rows without a parent lock nothing
+        if parent is not None and parent == parent:
+            parents.append((parent, rows))
+            if position // INTERNAL_BATCH_ROWS != (position + rows - 1) // INTERNAL_BATCH_ROWS:
+                straddling += 1
+            if parent in seen_parents:
+                shared += 1
+        position += rows
+    seen_parents.update(parent for parent, _ in parents)
+
+    if shared and concurrent:
+        risk = 'high'
+    elif straddling:
+        risk = 'low'
+    else:
+        risk = 'none'
+    return {
+        'parents': len(parents),
+        'largest_parent_rows': max((rows for _, rows in parents), default=0),
+        'shared_parents': shared,
+        'straddling_parents': straddling,
+        'risk': risk,
+    }
+
+
+def summarize(reports: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Totals over the per-job contention reports, or None if there are none."""
+    if not reports:
+        return None
+    order = ['none', 'low', 'high']
+    return {
+        'jobs': len(reports),
+        'parents': sum(report['parents'] for report in reports),
+        'largest_parent_rows': max(report['largest_parent_rows'] for report in reports),
+        'shared_parents': sum(report['shared_parents'] for report in reports),
+        'straddling_parents': sum(report['straddling_parents'] for report in reports),
+        'risk': max((report['risk'] for report in reports), key=order.index),
+    }
@@ -0,0 +1,132 @@
+"""
+Re-drive of retryable rETL ingest failures.
+
+After an upsert job completes with failed records, its ``failedResults`` are
+read and each ``sf__Error`` is classified by its status code (the text
+before the first ':'). Rows that failed for a transient reason, such as
+UNABLE_TO_LOCK_ROW, are sent again in follow-up jobs with exponential
+backoff, up to ``max_attempts`` rounds. All other failures are permanent
+and are reported without being retried, together with rows still failing
+when the retry budget runs out.
+
+Only lock, timeout and server-unavailable codes are retried by default.
+UNKNOWN_EXCEPTION is often raised by a trigger or validation fault that
+fails the same way every time, so it is retried only when added with
+``configure(extra_errors=...)``.
+"""
+
+import io
+import threading
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Status codes of failures that may succeed when the row is sent again
+RETRYABLE_ERRORS = frozenset({
+    'UNABLE_TO_LOCK_ROW',
+    'REQUEST_RUNNING_TOO_LONG',
+    'SERVER_UNAVAILABLE',
+    'QUERY_TIMEOUT',
+})
+
+# Defaults; changed with configure()
+_defaults = {
+    'max_attempts': 3,
+    'backoff_seconds': 15.0,
+    'max_rows_per_job': 10000,
+    'serial': True,
+    'extra_errors': (),
+}
+
+# Held while a retry job runs when retries are serial
+_serial_lock = threading.Lock()
+
+
+def configure(**settings) -> None:
+    """
+    Change retry settings.
+
+    Accepts: max_attempts (retry rounds per batch, 0 disables retries),
+    backoff_seconds (delay before the first round, doubled for each later
+    one), max_rows_per_job (rows per retry job, 0 or less for no limit),
+    serial (run at most one retry job at a time across batches),
+    extra_errors (status codes retried on top of RETRYABLE_ERRORS, e.g.
+    UNKNOWN_EXCEPTION). ``None`` values are ignored.
+    """
+    unknown = set(settings) - set(_defaults)
+    if unknown:
+        raise ValueError(f"Unknown rETL retry settings: {', '.join(sorted(unknown))}")
+    updates = {key: value for key, value in settings.items() if value is not None}
+    if 'extra_errors' in updates:
+        updates['extra_errors'] = tuple(code.strip().upper() for code in updates['extra_errors'] if code.strip())
+    _defaults.update(updates)
+
+
+def settings() -> Dict[str, Any]:
+    """Current retry settings."""
+    return dict(_defaults)
+
+
+def error_code(error: str) -> str:
+    """Status code of an ``sf__Error`` message, e.g. 'UNABLE_TO_LOCK_ROW'."""
+    return (error or '').split(':', 1)[0].strip() or 'UNKNOWN'
+
+
+def retryable_errors() -> frozenset:
+    """Status codes retried with the current settings."""
+    return RETRYABLE_ERRORS | frozenset(_defaults['extra_errors'])
+
+
+def is_retryable(error: str) -> bool:
+    return error_code(error) in retryable_errors()
+
+
+def split_failures(failed_csv: str) -> Tuple[Optional[Any], List[Dict[str, Any]]]:
+    """
+    Split a job's ``failedResults`` CSV into retryable rows and permanent failures.
+
+    Args:
+        failed_csv: failedResults CSV (sf__Id, sf__Error, then the uploaded columns)
+
+    Returns:
+        tuple: (DataFrame of retryable rows with their uploaded columns plus
+        sf__Error, or None if there are none; permanent failures as
+        ``{'error': ..., 'record': {...}}``)
+    """
+    import pandas as pd
+
+    if not failed_csv or not failed_csv.strip():
+        return None, []
+    failed = pd.read_csv(io.StringIO(failed_csv), dtype=str, keep_default_na=False)
+    if failed.empty or 'sf__Error' not in failed.columns:
+        return None, []
+    failed = failed.drop(columns=[column for column in ('sf__Id',) if column in failed.columns])
+
+    retryable = failed['sf__Error'].str.split(':', n=1).str[0].str.strip().isin(retryable_errors())
+    return (failed[retryable].reset_index(drop=True) if retryable.any() else None), to_failures(failed[~retryable])
+
+
+def to_failures(rows) -> List[Dict[str, Any]]:
+    """Failure entries (``{'error': ..., 'record': {...}}``) for rows with an sf__Error column."""
+    if rows is None or rows.empty:
+        return []
+    records = rows.drop(columns=['sf__Error']).to_dict('records')
+    return [{'error': error, 'record': record} for error, record in zip(rows['sf__Error'], records)]
+
+
+def failure_codes(failures: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Number of failures per status code."""
+    return dict(Counter(error_code(failure['error']) for failure in failures))
+
+
+@contextmanager
+def retry_slot():
+    """Context for running one retry job; serializes retry jobs when ``serial`` is set."""
+    if _defaults['serial']:
+        with _serial_lock:
+            yield
+    else:
+        yield
@@ -0,0 +1,226 @@
+"""
+Row hash state for change-only (delta) rETL upserts.
+
+A delta upsert hashes every source row in Snowflake
+(``MD5(TO_JSON(OBJECT_CONSTRUCT_KEEP_NULL(*)))``) and compares it with the
+hash last pushed for the same SObject, external ID field and external ID,
+kept in a state table (``LOGS.RETL_STATE`` by default). Only new or changed
+rows are read and sent to Salesforce. Once the jobs finish, the state is
+updated for the records Salesforce reported as successful, so failed rows
+are sent again on the next run.
+
+The state also keeps a hash per column. With ``by_column`` the delta query
+lists the columns that changed on each row and orders rows by that list, so
+each group of rows with the same changed columns can be sent as its own
+narrow job (external ID plus the changed columns only).
+"""
+
+import logging
+from itertools import groupby
+from typing import Dict, List, Optional, Tuple
+
+from lht.util import sql_batch
+from lht.util import staging
+
+logger = logging.getLogger(__name__)
+
+# Default state table
+STATE_TABLE = 'LOGS.RETL_STATE'
+
+# Helper columns added by the delta query; never sent to Salesforce
+HASH_COLUMN = 'LHT_ROW_HASH'
+ID_COLUMN = 'LHT_EXTERNAL_ID'
+COLUMN_HASHES_COLUMN = 'LHT_COLUMN_HASHES'
+CHANGED_COLUMN = 'LHT_CHANGED_COLUMNS'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def ensure_state_table(session, state_table: str = STATE_TABLE) -> None:
+    """Create the state table (and its schema, if qualified) if it doesn't exist."""
+    statements = []
+    if '.' in state_table:
+        statements.append(f"CREATE SCHEMA IF NOT EXISTS {state_table.rsplit('.', 1)[0]}")
+    statements.append(f"""CREATE TABLE IF NOT EXISTS {state_table} (
+        SOBJECT VARCHAR(255) NOT NULL,
+        EXTERNAL_ID_FIELD VARCHAR(255) NOT NULL,
+        EXTERNAL_ID VARCHAR(16777216) NOT NULL,
+        ROW_HASH VARCHAR(32) NOT NULL,
+        COLUMN_HASHES OBJECT,
+        PUSHED_AT TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP()
+    )""")
+    # State tables created before per-column hashes were kept
+    statements.append(f"ALTER TABLE {state_table} ADD COLUMN IF NOT EXISTS COLUMN_HASHES OBJECT")
+    sql_batch.execute_batch(session, statements, label=f"create {state_table}")
+
+
+def source_columns(session, query: str) -> List[str]:
+    """
+    Column identifiers of a source query, as Snowpark reports them (quoted if case-sensitive).
+
+    Only the query's schema is described; the query isn't run.
+    """
+    return list(session.sql(query).columns)
+
+
+def resolve_column(columns: List[str], field: str) -> str:
+    """
+    Find the source query's column for an external ID field.
+
+    Returns:
+        str: Column identifier from ``columns``
+
+    Raises:
+        ValueError: If there is no column matching ``field``
+    """
+    for column in columns:
+        if column.strip('"').upper() == field.upper():
+            return column
+    raise ValueError(f"Source query has no column for external ID field {field}")
+
+
+def _column_hash(column: str) -> str:
+    return f"MD5(TO_JSON(OBJECT_CONSTRUCT_KEEP_NULL('v', {column})))"
+
+
+def delta_query(query: str, sobject: str, field: str, columns: List[str], id_column: str,
+                state_table: str = STATE_TABLE, by_column: bool = False, order_by: Optional[List[str]] = None) -> str:
+    """
+    Wrap a source query so it returns only rows whose hash differs from the state.
+
+    The result has the source columns plus HASH_COLUMN, COLUMN_HASHES_COLUMN
+    and ID_COLUMN. With ``by_column`` it also has CHANGED_COLUMN (comma
+    separated names of the changed columns; all of them for rows without
+    column hashes in the state) and is ordered by it, then by ``order_by``.
+    """
+    names = {column: _literal(column.strip('"')) for column in columns}
+    column_hashes = ', '.join(f"{names[column]}, {_column_hash(column)}" for column in columns)
+    select = f"src.*, TO_VARCHAR(src.{id_column}) AS {ID_COLUMN}"
+    order = list(order_by or [])
+    if by_column:
+        changed = ', '.join(
+            f"IFF(st.COLUMN_HASHES IS NULL OR st.COLUMN_HASHES[{names[column]}]::VARCHAR "
+            f"IS DISTINCT FROM src.{COLUMN_HASHES_COLUMN}[{names[column]}]::VARCHAR, {names[column]}, NULL)"
+            for column in columns if column != id_column
+        )
+        select += f",\n    ARRAY_TO_STRING(ARRAY_CONSTRUCT_COMPACT({changed}), ',') AS {CHANGED_COLUMN}"
+        order.insert(0, CHANGED_COLUMN)
+    order_clause = f"\nORDER BY {', '.join(order)}" if order else ''
+    return f"""WITH LHT_SOURCE AS (
+    SELECT *,
+        MD5(TO_JSON(OBJECT_CONSTRUCT_KEEP_NULL(*))) AS {HASH_COLUMN},
+        OBJECT_CONSTRUCT({column_hashes}) AS {COLUMN_HASHES_COLUMN}
+    FROM ({query})
+)
+SELECT {select}
+FROM LHT_SOURCE src
+LEFT JOIN {state_table} st
+    ON st.SOBJECT = {_literal(sobject.lower())}
+    AND st.EXTERNAL_ID_FIELD = {_literal(field.lower())}
+    AND st.EXTERNAL_ID = TO_VARCHAR(src.{id_column})
+WHERE st.ROW_HASH IS DISTINCT FROM src.{HASH_COLUMN}{order_clause}"""
+
+
+def record_pushed(session, sobject: str, field: str, hashes: Dict[str, Tuple[str, str]],
+                  state_table: str = STATE_TABLE) -> int:
+    """
+    Save the hashes of records Salesforce accepted.
+
+    Args:
+        session: Snowflake Snowpark session
+        sobject: SObject name
+        field: External ID field name
+        hashes: External ID -> (row hash, column hashes as JSON)
+        state_table: State table name
+
+    Returns:
+        int: Number of records saved
+    """
+    if not hashes:
+        return 0
+    import pandas as pd
+
+    rows = pd.DataFrame([(external_id, row_hash, column_hashes) for external_id, (row_hash, column_hashes) in hashes.items()],
+                        columns=['EXTERNAL_ID', 'ROW_HASH', 'COLUMN_HASHES'])
+    # The temporary table lives next to the state table; both are fully qualified
+    database, schema, table = staging.resolve_table_name(session, state_table)
+    state_table_fq = staging.qualify(database, schema, table)
+    temp_table = staging.staging_table_name('RETL_STATE')
+    temp_table_fq = staging.qualify(database, schema, temp_table)
+    session.write_pandas(rows, temp_table, database=database, schema=schema, auto_create_table=True,
+                         table_type='temporary', quote_identifiers=False, overwrite=True)
+    sql_batch.execute_batch(session, [
+        f"""MERGE INTO {state_table_fq} t
+        USING {temp_table_fq} s
+        ON t.SOBJECT = {_literal(sobject.lower())}
+            AND t.EXTERNAL_ID_FIELD = {_literal(field.lower())}
+            AND t.EXTERNAL_ID = s.EXTERNAL_ID
+        WHEN MATCHED THEN UPDATE SET ROW_HASH = s.ROW_HASH, COLUMN_HASHES = PARSE_JSON(s.COLUMN_HASHES),
+            PUSHED_AT = CURRENT_TIMESTAMP()
+        WHEN NOT MATCHED THEN INSERT (SOBJECT, EXTERNAL_ID_FIELD, EXTERNAL_ID, ROW_HASH, COLUMN_HASHES, PUSHED_AT)
+            VALUES ({_literal(sobject.lower())}, {_literal(field.lower())}, s.EXTERNAL_ID, s.ROW_HASH,
+                    PARSE_JSON(s.COLUMN_HASHES), CURRENT_TIMESTAMP())""",
+        f"DROP TABLE IF EXISTS {temp_table_fq}",
+    ], label=f"update {state_table}")
+    logger.info(f"🧮 Recorded {len(hashes):,} pushed row hashes for {sobject}.{field}")
+    return len(hashes)
+
+
+def split_hashes(frames, id_column: str, pending: Dict[str, Tuple[str, Tuple[str, str]]]):
+    """
+    Remove the hash helper columns from streamed delta batches.
+
+    Each row's external ID and hashes are stored in ``pending`` under the
+    external ID as it is written to the CSV, which is how Salesforce echoes
+    it back in the job's successful results.
+
+    Args:
+        frames: Batches of the delta query
+        id_column: External ID column identifier (from ``resolve_column``)
+        pending: Dictionary to fill
+
+    Yields:
+        pandas.DataFrame: The batch without HASH_COLUMN, COLUMN_HASHES_COLUMN and ID_COLUMN
+    """
+    from lht.util import csv
+
+    name = id_column.strip('"')
+    for frame in frames:
+        frame = csv._whole_number_floats_to_int(frame)
+        csv_ids = frame[name].astype(str)
+        hashes = zip(frame[HASH_COLUMN], frame[COLUMN_HASHES_COLUMN])
+        pending.update(zip(csv_ids, zip(frame[ID_COLUMN], hashes)))
+        yield frame.drop(columns=[HASH_COLUMN, COLUMN_HASHES_COLUMN, ID_COLUMN])
+
+
+def group_changed_columns(frames, id_column: str, keep_columns: Optional[List[str]] = None):
+    """
+    Split batches of a ``by_column`` delta query into runs with the same changed columns.
+
+    Rows arrive ordered by CHANGED_COLUMN, so each group is contiguous. A
+    group with no changed columns (the row hash changed but no column hash
+    did) yields an empty column list.
+
+    Args:
+        frames: Batches from ``split_hashes``
+        id_column: External ID column identifier
+        keep_columns: Column names sent with every group (e.g. a parent lookup)
+
+    Yields:
+        tuple: (changed column names, iterator of DataFrames holding the
+        external ID column, ``keep_columns`` and those columns)
+    """
+    def _pieces():
+        for frame in frames:
+            changed = frame[CHANGED_COLUMN]
+            starts = list((changed != changed.shift()).to_numpy().nonzero()[0])
+            for start, end in zip(starts, starts[1:] + [len(frame)]):
+                yield changed.iat[start], frame.iloc[start:end]
+
+    leading = [id_column.strip('"')] + [column for column in keep_columns or [] if column != id_column.strip('"')]
+    for signature, pieces in groupby(_pieces(), key=lambda piece: piece[0]):
+        columns = [column for column in signature.split(',') if column]
+        selected = leading + [column for column in columns if column not in leading]
+        yield columns, (piece[selected] for _, piece in pieces)
@@ -1,24 +1,21 @@
-import requests
 import logging
+from . import describe_cache
 from . import sobjects as sobj
 from lht.util import field_types
+from lht.util import catalog
+from lht.util import staging
 
 logger = logging.getLogger(__name__)
 
 def create(session, access_info, sobject, local_table):
-	headers = {
-		"Authorization":"Bearer {}".format(access_info['access_token']),
-		"Accept": "application/json"
-	}
 	fields = ''
 	try:
-		url = access_info['instance_url'] + "/services/data/v58.0/sobjects/{}/describe".format(sobject)
+		sobject_data = describe_cache.get_describe(access_info, sobject)
 	except Exception as e:
 		logger.error(e)
 		return None
-	sobject_data = requests.get(url, headers=headers)
 
-	for field_data in sobject_data.json()['fields']:
+	for field_data in sobject_data['fields']:
 		if field_data['type'] == 'complexvalue':
 			continue
 		# if field_data['type'] == 'address':
@@ -31,4 +28,5 @@ def create(session, access_info, sobject, local_table):
 	logger.debug(f"Query: {query}")
 
 	results = session.sql(query).collect()
+	catalog.get_catalog(session).table_created(*staging.resolve_table_name(session, local_table))
 	return results[0]['status']
\ No newline at end of file
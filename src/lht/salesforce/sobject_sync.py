@@ -1,7 +1,7 @@
 import pandas as pd
 import logging
 from . import sobjects as sobj, sobject_query as sobj_query
-from lht.util import merge, data_writer as dw
+from lht.util import merge, staging, sql_batch, data_writer as dw
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +18,10 @@ def new_changed_records(session, access_info, sobject, local_table, match_field,
         lmd_sf = str(pd.to_datetime(lmd))[:10]+'T'+str(pd.to_datetime(lmd))[11:19]+'.000z'
     else:
         lmd_sf = None
-    tmp_table = 'TMP_{}'.format(local_table)
+    # Resolve the target once and give this run its own fully qualified staging table
+    database, schema, table = staging.resolve_table_name(session, local_table)
+    target_table = staging.qualify(database, schema, table)
+    tmp_table = staging.qualify(database, schema, staging.staging_table_name(table))
     # Temporary table will be created by data_writer.write_batch_to_temp_table()
 
  
@@ -29,47 +32,67 @@ def new_changed_records(session, access_info, sobject, local_table, match_field,
     
     data_list = list(sobject_data)  # Convert generator to list of DataFrames
     logger.info(f"Processing {len(data_list)} batches")
-    for i, batch_df in enumerate(data_list):
-        logger.debug(f"📊 Processing batch {i+1} of data")
+    with staging.table_lock(database, schema, table):
+        _merge_batches(session, data_list, tmp_table, target_table, match_field, df_fields, snowflake_fields)
+
+    #merge.format_filter_condition(session, tmp_table, local_table,match_field, match_field)
+    return query
+
+
+def _merge_batches(session, data_list, tmp_table, target_table, match_field, df_fields, snowflake_fields):
+    """Stage each batch in the run's temp table and MERGE it into the target table."""
+    tmp_dropped = False
+    try:
+        for i, batch_df in enumerate(data_list):
+            logger.debug(f"📊 Processing batch {i+1} of data")
         
-        # DEBUG: Check the DataFrame structure before writing
-        logger.debug(f"🔍 DEBUG: batch_df type: {type(batch_df)}, shape: {batch_df.shape if isinstance(batch_df, pd.DataFrame) else 'N/A'}")
+            # DEBUG: Check the DataFrame structure before writing
+            logger.debug(f"🔍 DEBUG: batch_df type: {type(batch_df)}, shape: {batch_df.shape if isinstance(batch_df, pd.DataFrame) else 'N/A'}")
         
-        if not isinstance(batch_df, pd.DataFrame):
-            logger.error(f"❌ batch_df is not a DataFrame! Type: {type(batch_df)}")
-            continue
+            if not isinstance(batch_df, pd.DataFrame):
+                logger.error(f"❌ batch_df is not a DataFrame! Type: {type(batch_df)}")
+                continue
         
-        # Write to temp table using data_writer (handles null values properly)
-        # Let the session handle schema context - don't override it
-        sd = batch_df.head(1).to_dict()
-        logger.error(f"   here is the batch_df data: {str(sd)[:500]}")
-        dw.write_batch_to_temp_table(
-            session=session,
-            df=batch_df,  # Use original DataFrame, not string version
-            schema=None,  # Let session use current schema context
-            temp_table=tmp_table,  # Use the tmp_table variable (TMP_ prefix)
-            df_fields=df_fields,
-            validate_types=True,
-            main_table=local_table,
-            snowflake_fields=snowflake_fields  # Add missing snowflake_fields parameter
-        )
-        logger.debug(f"📊 data written to temporary table")
-        transformed_data = merge.transform_and_match_datatypes(session, tmp_table, local_table)
+            # Write to temp table using data_writer (handles null values properly)
+            # Let the session handle schema context - don't override it
+            sd = batch_df.head(1).to_dict()
+            logger.error(f"   here is the batch_df data: {str(sd)[:500]}")
+            dw.write_batch_to_temp_table(
+                session=session,
+                df=batch_df,  # Use original DataFrame, not string version
+                schema=None,  # Taken from the qualified tmp_table name
+                temp_table=tmp_table,  # Unique per run (TMP_<table>_<run id>)
+                df_fields=df_fields,
+                validate_types=True,
+                main_table=target_table,
+                snowflake_fields=snowflake_fields  # Add missing snowflake_fields parameter
+            )
+            logger.debug(f"📊 data written to temporary table")
+            transformed_data = merge.transform_and_match_datatypes(session, tmp_table, target_table)
         
-        # INCREMENTAL SYNC: Use MERGE logic instead of INSERT
-        logger.info("🔄 Performing incremental sync with MERGE logic")
-        #merge_condition = merge.format_filter_condition(session, tmp_table, local_table, match_field, match_field)
-        #merge_statement = merge.format_insert_upsert(session, tmp_table, local_table, merge_condition)
-        merge_statement = merge.format_filter_condition(session, tmp_table, local_table, match_field, match_field)
+            # INCREMENTAL SYNC: Use MERGE logic instead of INSERT
+            logger.info("🔄 Performing incremental sync with MERGE logic")
+            #merge_condition = merge.format_filter_condition(session, tmp_table, local_table, match_field, match_field)
+            #merge_statement = merge.format_insert_upsert(session, tmp_table, local_table, merge_condition)
+            merge_statement = merge.format_filter_condition(session, tmp_table, target_table, match_field, match_field)
         
-        # DEBUG: Print the merge statement before execution
-        logger.info("🔍 MERGE STATEMENT TO BE EXECUTED:")
-        logger.info("=" * 80)
-        logger.info(merge_statement)
-        logger.info("=" * 80)
+            # DEBUG: Print the merge statement before execution
+            logger.info("🔍 MERGE STATEMENT TO BE EXECUTED:")
+            logger.info("=" * 80)
+            logger.info(merge_statement)
+            logger.info("=" * 80)
         
-        session.sql(merge_statement).collect()
-        logger.info(f"✅ Batch {i+1} merged successfully")
-
-    #merge.format_filter_condition(session, tmp_table, local_table,match_field, match_field)
-    return query
\ No newline at end of file
+            statements = [merge_statement]
+            if i == len(data_list) - 1:
+                # Last batch: drop the temp table in the same round trip
+                statements.append(f"DROP TABLE IF EXISTS {tmp_table}")
+            sql_batch.execute_batch(session, statements, label=f"merge batch {i+1} into {target_table}")
+            tmp_dropped = len(statements) > 1
+            logger.info(f"✅ Batch {i+1} merged successfully")
+    finally:
+        # Normally dropped together with the last MERGE
+        if not tmp_dropped:
+            try:
+                session.sql(f"DROP TABLE IF EXISTS {tmp_table}").collect()
+            except Exception as e:
+                logger.debug(f"Could not drop staging table {tmp_table}: {e}")
\ No newline at end of file
@@ -1,26 +1,45 @@
-import requests
 import logging
+import requests
+from . import describe_cache
 from lht.util import field_types
 
 logger = logging.getLogger(__name__) 
 
 def describe(access_info, sobject, lmd=None):
-	headers = {
-		"Authorization":"Bearer {}".format(access_info['access_token']),
-		"Accept": "application/json"
-	}
+	"""Describe an SObject (through the describe cache) and parse it with ``parse_describe``.
 
-	field = {}
-	fields = []
+	Returns:
+		tuple: (query_string, df_fields, snowflake_fields), [] if the SObject
+		isn't retrievable, or None if the describe could not be read.
+
+	Raises:
+		requests.HTTPError: If Salesforce rejected the describe request.
+	"""
 	try:
-		url = access_info['instance_url'] + "/services/data/v62.0/sobjects/{}/describe".format(sobject)
+		results = describe_cache.get_describe(access_info, sobject)
+	except requests.exceptions.HTTPError as e:
+		logger.error(f"❌ Describe of {sobject} failed ({e})")
+		raise
 	except Exception as e:
 		logger.error(e)
 		return None
-	results = requests.get(url, headers=headers)
-	if results.json()['retrieveable'] is False:
+	if results['retrieveable'] is False:
 		return []
-	
+	return parse_describe(results, sobject, lmd)
+
+def parse_describe(results, sobject, lmd=None):
+	"""Build the SOQL field list and the pandas/Snowflake field types from a describe result.
+
+	Compound fields, inaccessible fields and non-retrievable fields are skipped.
+
+	Args:
+		results (dict): SObject describe result.
+		sobject (str): SObject name used in the FROM clause.
+		lmd (str, optional): LastModifiedDate lower bound for the WHERE clause.
+
+	Returns:
+		tuple: (query_string, df_fields, snowflake_fields)
+	"""
 	query_fields = ""
 
 	create_table_fields = ''
@@ -28,14 +47,11 @@ def describe(access_info, sobject, lmd=None):
 	df_fields = {}
 	snowflake_fields = {}  # For table creation with proper Snowflake types
 
-	if results.status_code > 200:
-		logger.error("you are not logged in")
-		exit(0)
-	for field in results.json()['fields']:
+	for field in results['fields']:
 		
 		if field['compoundFieldName'] is not None and field['compoundFieldName'] not in cfields and field['compoundFieldName'] != 'Name':
 			cfields.append(field['compoundFieldName'])
-	for row in results.json()['fields']:
+	for row in results['fields']:
 		# Skip compound fields
 		if row['name'] in cfields:
 			continue
@@ -0,0 +1,311 @@
+"""
+Compiled sync plans.
+
+Every sync of an SObject derives the same artifacts: the field list (minus
+fields Salesforce rejected in an earlier run), the SOQL, the ``CREATE TABLE``
+DDL and the cast SELECT used to move a staged batch into the target table. A
+plan compiles them once and saves them under
+``~/.solomo/plans/<instance>/<SObject>__<DATABASE>.<SCHEMA>.<TABLE>.json``
+together with two fingerprints:
+
+* the describe fingerprint, a hash of the describe's field metadata
+* the table fingerprint, a hash of the target table's column types
+
+Later runs load the plan and only recompile when a fingerprint changed.
+Both inputs come from caches (the describe cache and the session catalog),
+so checking a plan costs no extra round trips.
+
+Fields Salesforce rejects while creating a Bulk API job are recorded in the
+plan (``exclude_fields``) and left out of later queries until the describe
+changes.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from . import describe_cache
+from lht.util import catalog
+
+logger = logging.getLogger(__name__)
+
+# Bump when the plan layout or the compiled SQL changes so old plans recompile
+PLAN_VERSION = 2
+
+# Type of every column in a batch staging table (CSV values are loaded as text)
+STAGING_COLUMN_TYPE = 'VARCHAR(16777216)'
+
+_lock = threading.Lock()
+
+_stats = {
+    'hits': 0,
+    'compiled': 0,
+}
+
+
+def get_plan_dir() -> Path:
+    """Root directory of saved plans (~/.solomo/plans)."""
+    from lht.user.connections.manager import get_solomo_dir
+    return get_solomo_dir() / 'plans'
+
+
+def _plan_path(instance_url: str, sobject: str, database: str, schema: str, table: str) -> Path:
+    target = '.'.join(part.strip('"').upper() for part in (database, schema, table))
+    return get_plan_dir() / describe_cache._instance_key(instance_url) / f"{sobject.lower()}__{target}.json"
+
+
+def _fingerprint(data: Any) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def describe_fingerprint(describe: Dict[str, Any]) -> str:
+    """Hash of the describe metadata a plan depends on."""
+    return _fingerprint([
+        [field.get('name'), field.get('type'), field.get('length'), field.get('precision'),
+         field.get('scale'), field.get('accessible', True), field.get('retrieveable', True),
+         field.get('compoundFieldName')]
+        for field in describe.get('fields', [])
+    ])
+
+
+def table_fingerprint(column_types: Optional[Dict[str, str]]) -> str:
+    """Hash of the target table's columns; 'absent' if the table doesn't exist."""
+    if column_types is None:
+        return 'absent'
+    return _fingerprint([[name.upper(), column_type] for name, column_type in column_types.items()])
+
+
+def compile_plan(instance_url: str, sobject: str, database: str, schema: str, table: str,
+                 describe: Dict[str, Any], column_types: Optional[Dict[str, str]] = None,
+                 excluded_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Compile a plan from a describe and the target table's columns.
+
+    Args:
+        instance_url: Salesforce instance URL
+        sobject: SObject name
+        database: Snowflake database
+        schema: Snowflake schema
+        table: Snowflake table
+        describe: SObject describe result
+        column_types: Target table column types, or None if the table doesn't exist
+        excluded_fields: Fields to leave out of the SOQL
+
+    Returns:
+        dict: The plan
+    """
+    # Imported here so `lht plan show` doesn't load Snowpark
+    from . import sobjects
+
+    _, df_fields, snowflake_fields = sobjects.parse_describe(describe, sobject)
+    excluded = [field for field in (excluded_fields or []) if field in df_fields]
+    plan = {
+        'version': PLAN_VERSION,
+        'instance_url': instance_url,
+        'sobject': sobject,
+        'database': database,
+        'schema': schema,
+        'table': table,
+        'describe_fingerprint': describe_fingerprint(describe),
+        'table_fingerprint': table_fingerprint(column_types),
+        'compiled_at': time.time(),
+        'fields': df_fields,
+        'snowflake_fields': snowflake_fields,
+        'excluded_fields': excluded,
+        'column_types': column_types,
+    }
+    _render_query(plan)
+    return plan
+
+
+def _render_query(plan: Dict[str, Any]) -> None:
+    """(Re)build the SOQL, the DDL and the cast SELECT from the plan's query fields."""
+    from lht.util import table_creator
+
+    excluded = set(plan['excluded_fields'])
+    query_fields = [field for field in plan['fields'] if field not in excluded]
+    plan['query_fields'] = query_fields
+    plan['soql'] = f"SELECT {', '.join(query_fields)} FROM {plan['sobject']}"
+    # Only queried fields get a column, like ensure_table_exists_for_dataframe's field filter
+    table_fields = {field: plan['snowflake_fields'].get(field, STAGING_COLUMN_TYPE) for field in query_fields}
+    plan['create_table_sql'] = table_creator._build_create_table_sql(plan['schema'], plan['table'], table_fields,
+                                                                     database=plan['database'])
+    if plan['column_types'] is None:
+        # Nothing to cast to until the table exists; compiled on the next run
+        plan['cast_columns'] = None
+        plan['cast_select'] = None
+    else:
+        from lht.util import merge
+        staging_types = {field.upper(): STAGING_COLUMN_TYPE for field in query_fields}
+        plan['cast_columns'] = list(staging_types)
+        plan['cast_select'] = merge.build_cast_select(staging_types, plan['column_types'])
+
+
+def load(instance_url: str, sobject: str, database: str, schema: str, table: str) -> Optional[Dict[str, Any]]:
+    """Return the saved plan for a target table, or None."""
+    path = _plan_path(instance_url, sobject, database, schema, table)
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save(plan: Dict[str, Any]) -> None:
+    """Write a plan atomically; failures are logged, not raised."""
+    path = _plan_path(plan['instance_url'], plan['sobject'], plan['database'], plan['schema'], plan['table'])
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(plan, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not save sync plan {path}: {e}")
+
+
+def get_plan(session, access_info: Dict[str, str], sobject: str, database: str, schema: str, table: str,
+             refresh: bool = False) -> Dict[str, Any]:
+    """
+    Load the plan for a sync, recompiling it if the describe or table changed.
+
+    Args:
+        session: Snowflake Snowpark session
+        access_info: Salesforce access details
+        sobject: SObject name
+        database: Snowflake database
+        schema: Snowflake schema
+        table: Snowflake table
+        refresh: Recompile even if the saved plan is current
+
+    Returns:
+        dict: The plan
+
+    Raises:
+        requests.HTTPError: If the describe could not be fetched
+    """
+    instance_url = access_info['instance_url'].rstrip('/')
+    describe = describe_cache.get_describe(access_info, sobject)
+    session_catalog = catalog.get_catalog(session)
+    column_types = None
+    if session_catalog.table_exists(database, schema, table):
+        column_types = session_catalog.column_types(database, schema, table)
+
+    saved = load(instance_url, sobject, database, schema, table)
+    describe_fp = describe_fingerprint(describe)
+    if (not refresh and saved is not None
+            and saved.get('version') == PLAN_VERSION
+            and saved.get('describe_fingerprint') == describe_fp
+            and saved.get('table_fingerprint') == table_fingerprint(column_types)):
+        with _lock:
+            _stats['hits'] += 1
+        logger.debug(f"📐 Using saved sync plan for {sobject} -> {database}.{schema}.{table}")
+        return saved
+
+    # Rejected fields stay excluded while the describe is unchanged
+    excluded = []
+    if saved is not None and saved.get('describe_fingerprint') == describe_fp:
+        excluded = saved.get('excluded_fields', [])
+    plan = compile_plan(instance_url, sobject, database, schema, table, describe, column_types, excluded)
+    save(plan)
+    with _lock:
+        _stats['compiled'] += 1
+    logger.info(f"📐 Compiled sync plan for {sobject} -> {database}.{schema}.{table} ({len(plan['query_fields'])} fields)")
+    return plan
+
+
+def exclude_fields(plan: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """
+    Record fields Salesforce rejected so later runs leave them out of the SOQL.
+
+    Args:
+        plan: Plan returned by ``get_plan``
+        fields: Field names to exclude
+
+    Returns:
+        dict: The updated plan (also saved)
+    """
+    new_fields = [field for field in fields if field in plan['fields'] and field not in plan['excluded_fields']]
+    if not new_fields:
+        return plan
+    plan['excluded_fields'] = plan['excluded_fields'] + new_fields
+    _render_query(plan)
+    save(plan)
+    logger.info(f"📐 Sync plan for {plan['sobject']} now excludes {len(plan['excluded_fields'])} field(s)")
+    return plan
+
+
+def bind_table(plan: Optional[Dict[str, Any]], column_types: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Bring a plan up to date with the target table as it is now.
+
+    A load may create or replace the table after the plan was compiled (a
+    first sync, or a full resync that recreates it from the current
+    describe). If the table's columns differ from those the plan was
+    compiled against, the cast SELECT is rebuilt for them and the plan saved.
+
+    Args:
+        plan: Plan returned by ``get_plan`` (None is passed through)
+        column_types: The target table's current column types
+
+    Returns:
+        dict: The plan
+    """
+    if not plan:
+        return plan
+    fingerprint = table_fingerprint(column_types)
+    if plan.get('table_fingerprint') == fingerprint:
+        return plan
+    plan['column_types'] = column_types
+    plan['table_fingerprint'] = fingerprint
+    _render_query(plan)
+    save(plan)
+    with _lock:
+        _stats['compiled'] += 1
+    logger.info(f"📐 Recompiled cast SELECT for {plan['database']}.{plan['schema']}.{plan['table']} ({len(column_types)} columns)")
+    return plan
+
+
+def cast_select_for(plan: Optional[Dict[str, Any]], columns: List[str]) -> Optional[str]:
+    """The plan's compiled cast SELECT if it was compiled for exactly these staging columns, else None."""
+    if not plan or not plan.get('cast_select'):
+        return None
+    if [column.upper() for column in columns] != plan.get('cast_columns'):
+        return None
+    return plan['cast_select']
+
+
+def list_plans(sobject: Optional[str] = None, table: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Saved plans, optionally filtered by SObject and/or table name.
+
+    Returns:
+        list: Plans sorted by instance and file name
+    """
+    plans = []
+    root = get_plan_dir()
+    if not root.exists():
+        return plans
+    for path in sorted(root.glob('*/*.json')):
+        try:
+            with open(path, 'r') as f:
+                plan = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if sobject and plan.get('sobject', '').lower() != sobject.lower():
+            continue
+        if table and plan.get('table', '').strip('"').upper() != table.strip('"').upper():
+            continue
+        plans.append(plan)
+    return plans
+
+
+def stats() -> Dict[str, int]:
+    """Plan cache counters as a plain dictionary."""
+    with _lock:
+        return dict(_stats)
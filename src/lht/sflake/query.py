@@ -13,4 +13,88 @@ def get_records(session, query):
                 record[key] = value
         records.append(record)
         record = {}
-    return records
\ No newline at end of file
+    return records
+
+def stream_batches(session, query, batch_size=25000, prefetch=1):
+    """
+    Run a query once and yield its result as pandas DataFrames of ``batch_size`` rows.
+
+    Results are read with ``to_pandas_batches()``, i.e. Arrow result chunks
+    fetched as they are consumed. Chunks are re-cut to ``batch_size`` rows, so
+    at most one batch plus one chunk is held in memory. With ``prefetch`` > 0
+    a background thread reads ahead up to that many batches while the caller
+    works on the current one.
+
+    Args:
+        session: Snowflake Snowpark session
+        query: SQL query to run
+        batch_size: Rows per yielded DataFrame (the last one may be smaller)
+        prefetch: Batches to read ahead in a background thread (0 reads inline)
+
+    Yields:
+        pandas.DataFrame: Up to ``batch_size`` rows, in query order
+    """
+    batches = _rebatch(session.sql(query).to_pandas_batches(), batch_size)
+    if prefetch <= 0:
+        yield from batches
+        return
+
+    import queue
+    import threading
+
+    buffer = queue.Queue(maxsize=prefetch)
+    done = object()
+    stop = threading.Event()
+
+    def _put(item):
+        # Gives up once the consumer has stopped, so the thread never blocks forever
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _reader():
+        try:
+            for batch in batches:
+                if not _put(batch):
+                    return
+            _put(done)
+        except BaseException as e:
+            _put(e)
+
+    reader = threading.Thread(target=_reader, name='lht-source-reader', daemon=True)
+    reader.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def _rebatch(frames, batch_size):
+    """Re-cut a stream of DataFrames into DataFrames of exactly ``batch_size`` rows (last one smaller)."""
+    import pandas as pd
+
+    pending = []
+    pending_rows = 0
+    for frame in frames:
+        if frame.empty:
+            continue
+        pending.append(frame)
+        pending_rows += len(frame)
+        while pending_rows >= batch_size:
+            combined = pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0].reset_index(drop=True)
+            yield combined.iloc[:batch_size]
+            rest = combined.iloc[batch_size:]
+            pending = [rest] if len(rest) else []
+            pending_rows = len(rest)
+    if pending_rows:
+        yield pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0].reset_index(drop=True)
@@ -5,10 +5,29 @@ This module provides interactive authentication for Snowflake connections
 using private key authentication.
 """
 
-from lht.user.auth import (
-    authenticate,
-    create_session,
-)
+import importlib
+
+# auth and session_pool import snowflake.snowpark; they are loaded on first
+# use (PEP 562) so that light commands don't pay for it
+_LAZY_EXPORTS = {
+    'authenticate': 'lht.user.auth',
+    'create_session': 'lht.user.auth',
+    'SessionPool': 'lht.user.session_pool',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
 
 # Connection management is in a separate optional module
 try:
@@ -31,6 +50,7 @@ except ImportError:
 __all__ = [
     'authenticate',
     'create_session',
+    'SessionPool',
 ]
 
 # Add connection management exports if available
@@ -6,6 +6,8 @@ credentials and create authenticated Snowflake sessions using JWT authentication
 """
 
 import getpass
+import hashlib
+import threading
 from typing import Dict, Optional, Any, Tuple
 from snowflake.snowpark import Session
 import os
@@ -23,6 +25,11 @@ except ImportError:
         "Install it with: pip install cryptography"
     )
 
+# Decrypted DER keys keyed by (path, mtime, size, passphrase hash); key
+# derivation for encrypted PEM files is deliberately slow
+_private_key_cache: Dict[Tuple[str, int, int, str], bytes] = {}
+_private_key_cache_lock = threading.Lock()
+
 
 def _load_private_key(private_key_file: str, passphrase: Optional[str] = None) -> bytes:
     """
@@ -45,6 +52,18 @@ def _load_private_key(private_key_file: str, passphrase: Optional[str] = None) -
     if not os.path.isfile(private_key_file):
         raise FileNotFoundError(f"Private key file not found: {private_key_file}")
     
+    stat = os.stat(private_key_file)
+    cache_key = (
+        os.path.realpath(private_key_file),
+        stat.st_mtime_ns,
+        stat.st_size,
+        hashlib.sha256((passphrase or '').encode()).hexdigest(),
+    )
+    with _private_key_cache_lock:
+        cached = _private_key_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
         with open(private_key_file, "rb") as key:
             private_key = load_pem_private_key(
@@ -60,6 +79,8 @@ def _load_private_key(private_key_file: str, passphrase: Optional[str] = None) -
             encryption_algorithm=serialization.NoEncryption()
         )
         
+        with _private_key_cache_lock:
+            _private_key_cache[cache_key] = private_key_bytes
         return private_key_bytes
     except Exception as e:
         raise ValueError(f"Failed to load private key: {str(e)}")
@@ -309,6 +330,28 @@ def create_session(credentials: Optional[Dict[str, Any]] = None, connection_name
         ...     'schema': 'MYSCHEMA'
         ... })
     """
+    credentials = _resolve_credentials(credentials, connection_name)
+    
+    # Load and convert private key to DER format
+    private_key_bytes = _load_private_key(
+        credentials['private_key_file'],
+        credentials.get('private_key_passphrase')
+    )
+    
+    return _create_session_with_key(credentials, private_key_bytes)
+
+
+def _resolve_credentials(credentials: Optional[Dict[str, Any]] = None, connection_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Resolve credentials from a saved connection, explicit values or interactive prompts.
+    
+    Args:
+        credentials: Optional dictionary of credentials
+        connection_name: Optional name of connection to load from connections.toml
+        
+    Returns:
+        Dictionary of credentials
+    """
     # If connection_name is provided, try to load from connections module
     if connection_name:
         try:
@@ -333,13 +376,20 @@ def create_session(credentials: Optional[Dict[str, Any]] = None, connection_name
     elif credentials is None:
         # No connection_name and no credentials - prompt interactively
         credentials = authenticate()
+    return credentials
+
+
+def _build_connection_parameters(credentials: Dict[str, Any], private_key_bytes: bytes) -> Dict[str, Any]:
+    """
+    Build Snowpark connection parameters from credentials and a DER private key.
     
-    # Load and convert private key to DER format
-    private_key_bytes = _load_private_key(
-        credentials['private_key_file'],
-        credentials.get('private_key_passphrase')
-    )
-    
+    Args:
+        credentials: Dictionary of credentials
+        private_key_bytes: Private key as DER-encoded bytes
+        
+    Returns:
+        Dictionary of Snowpark connection parameters
+    """
     # Build connection parameters (matching the reference implementation)
     connection_parameters = {
         "account": credentials['account'],
@@ -359,8 +409,29 @@ def create_session(credentials: Optional[Dict[str, Any]] = None, connection_name
     if 'schema' in credentials:
         connection_parameters["schema"] = credentials['schema']
     
+    return connection_parameters
+
+
+def _create_session_with_key(credentials: Dict[str, Any], private_key_bytes: bytes, verbose: bool = True) -> Session:
+    """
+    Create a Snowflake session from credentials and an already loaded private key.
+    
+    Args:
+        credentials: Dictionary of credentials
+        private_key_bytes: Private key as DER-encoded bytes
+        verbose: Print connection progress messages
+        
+    Returns:
+        Authenticated Snowflake Snowpark session
+        
+    Raises:
+        ConnectionError: If authentication fails
+    """
+    connection_parameters = _build_connection_parameters(credentials, private_key_bytes)
+    
     try:
-        print("Connecting to Snowflake...")
+        if verbose:
+            print("Connecting to Snowflake...")
         
         # Use the builder pattern from the reference implementation
         sessionBuilder = Session.builder
@@ -368,7 +439,8 @@ def create_session(credentials: Optional[Dict[str, Any]] = None, connection_name
             sessionBuilder = sessionBuilder.config(key, value)
         
         session = sessionBuilder.create()
-        print("Connection successful!")
+        if verbose:
+            print("Connection successful!")
         return session
         
     except Exception as e:
@@ -5,7 +5,9 @@ This module provides functionality to save, load, and manage Snowflake
 connection configurations stored in TOML format.
 """
 
+import copy
 import shutil
+import threading
 from pathlib import Path
 from typing import Dict, Optional, Any, List
 import os
@@ -30,6 +32,10 @@ except ImportError:
         except ImportError:
             TOML_AVAILABLE = False
 
+# Parsed connections.toml, reused while the file's path, mtime and size are unchanged
+_connections_cache: Dict[str, Any] = {'key': None, 'connections': None}
+_connections_cache_lock = threading.Lock()
+
 
 def get_solomo_dir() -> Path:
     """
@@ -92,18 +98,28 @@ def _load_connections_file() -> Dict[str, Any]:
     
     connections_file = get_connections_file()
     
-    if not connections_file.exists():
+    try:
+        stat = connections_file.stat()
+    except FileNotFoundError:
         raise FileNotFoundError(f"Connections file not found: {connections_file}")
-    
-    # Load connections
-    if TOML_READ_MODE == 'rb':
-        with open(connections_file, TOML_READ_MODE) as f:
-            connections = tomllib.load(f)
-    else:
-        with open(connections_file, TOML_READ_MODE) as f:
-            connections = tomllib.load(f)
-    
-    return connections
+    cache_key = (str(connections_file), stat.st_mtime_ns, stat.st_size)
+    
+    with _connections_cache_lock:
+        if _connections_cache['key'] != cache_key:
+            # Load connections
+            with open(connections_file, TOML_READ_MODE) as f:
+                _connections_cache['connections'] = tomllib.load(f)
+            _connections_cache['key'] = cache_key
+        
+        # Callers modify the result before saving it; never hand out the cached dict
+        return copy.deepcopy(_connections_cache['connections'])
+
+
+def _invalidate_connections_cache() -> None:
+    """Forget the parsed connections.toml so the next read re-parses the file."""
+    with _connections_cache_lock:
+        _connections_cache['key'] = None
+        _connections_cache['connections'] = None
 
 
 def _save_connections_file(connections: Dict[str, Any]) -> None:
@@ -124,6 +140,9 @@ def _save_connections_file(connections: Dict[str, Any]) -> None:
     
     connections_file = get_connections_file()
     
+    # A rewrite within the same mtime tick and with the same size would look unchanged
+    _invalidate_connections_cache()
+    
     # Write back to TOML file
     # Use toml library's dump function if available, otherwise manually format
     if hasattr(tomllib, 'dump'):
@@ -350,6 +369,10 @@ def delete_connection(connection_name: str) -> bool:
     del connections[connection_name]
     _save_connections_file(connections)
     
+    # Drop any cached Salesforce token issued for this connection
+    from lht.user.salesforce_auth import clear_cached_token
+    clear_cached_token(connection_name)
+    
     print(f"✓ Deleted connection '{connection_name}'")
     return True
 
@@ -5,10 +5,26 @@ This module provides functions to interactively prompt users for Salesforce
 credentials and save connection configurations.
 """
 
+import os
+import json
+import time
 import getpass
+import hashlib
+import logging
+import threading
+from pathlib import Path
 from typing import Dict, Optional, Any
 import requests
 
+logger = logging.getLogger(__name__)
+
+# Salesforce does not return an expiry for client-credentials tokens; the
+# default session timeout is two hours. Cached tokens are reused for this
+# long (minus a safety margin) and refreshed on a 401 if the org's session
+# timeout is shorter.
+TOKEN_TTL_SECONDS = 7200
+TOKEN_EXPIRY_MARGIN_SECONDS = 300
+
 
 def _prompt_required(prompt: str, default: Optional[str] = None) -> str:
     """
@@ -65,16 +81,142 @@ def login_user_flow(clientid: str, clientsecret: str, my_domain: str) -> Dict[st
     return response_data
 
 
-def get_salesforce_access_info(connection_name: Optional[str] = None) -> Dict[str, Any]:
+class SalesforceAccessInfo(dict):
+    """
+    ``access_info`` dictionary that can renew its own access token.
+
+    Behaves exactly like the plain ``{'access_token', 'instance_url'}`` dict
+    used throughout LHT. ``lht.salesforce.client`` calls ``refresh`` once when
+    a request comes back 401 and retries it with the new token, so a token
+    expiring in the middle of a long sync doesn't fail the run.
+    """
+
+    def __init__(self, connection_name: str, credentials: Dict[str, Any], token: Dict[str, Any]):
+        super().__init__(access_token=token['access_token'], instance_url=token['instance_url'])
+        self.connection_name = connection_name
+        self._credentials = credentials
+        self._lock = threading.Lock()
+
+    def refresh(self, stale_token: Optional[str] = None) -> str:
+        """
+        Obtain a new access token and store it in this dict and the token cache.
+
+        Args:
+            stale_token: Token that was rejected. If another thread has already
+                         replaced it, the current token is returned without a new login.
+
+        Returns:
+            str: The current access token
+        """
+        with self._lock:
+            if stale_token is not None and self['access_token'] != stale_token:
+                return self['access_token']
+            logger.info(f"🔑 Refreshing Salesforce access token for '{self.connection_name}'")
+            token = _request_token(self.connection_name, self._credentials)
+            self['access_token'] = token['access_token']
+            self['instance_url'] = token['instance_url']
+            return self['access_token']
+
+    def __reduce__(self):
+        # Pickle/copy as a plain dict; credentials stay out of serialized state
+        return (dict, (dict(self),))
+
+
+def _token_cache_path(connection_name: str) -> Path:
+    """Path of the cached token for a connection (~/.solomo/tokens/<connection>.json)."""
+    from lht.user.connections.manager import get_solomo_dir
+    return get_solomo_dir() / 'tokens' / f"{connection_name}.json"
+
+
+def _credentials_fingerprint(credentials: Dict[str, Any]) -> str:
+    """Hash of the credentials a token was issued for, so edited connections don't reuse old tokens."""
+    material = '|'.join(str(credentials.get(key, '')) for key in ('client_id', 'client_key', 'my_domain'))
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def _load_cached_token(connection_name: str, credentials: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the cached token if it was issued for these credentials and has not expired."""
+    path = _token_cache_path(connection_name)
+    try:
+        with open(path, 'r') as f:
+            token = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if token.get('fingerprint') != _credentials_fingerprint(credentials):
+        return None
+    if time.time() >= token.get('expires_at', 0) - TOKEN_EXPIRY_MARGIN_SECONDS:
+        return None
+    if not token.get('access_token') or not token.get('instance_url'):
+        return None
+    return token
+
+
+def _save_cached_token(connection_name: str, credentials: Dict[str, Any], token: Dict[str, Any]) -> None:
+    """Write the token cache file, readable by the owner only."""
+    path = _token_cache_path(connection_name)
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(dict(token, fingerprint=_credentials_fingerprint(credentials)), f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not cache Salesforce token for '{connection_name}': {e}")
+
+
+def clear_cached_token(connection_name: str) -> bool:
+    """
+    Remove the cached token for a connection.
+
+    Args:
+        connection_name: Salesforce connection name
+
+    Returns:
+        bool: True if a cached token was removed
+    """
+    try:
+        _token_cache_path(connection_name).unlink()
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _request_token(connection_name: str, credentials: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the client-credentials flow and cache the resulting token."""
+    auth_result = login_user_flow(credentials['client_id'], credentials['client_key'], credentials['my_domain'])
+
+    if not auth_result.get('access_token') or not auth_result.get('instance_url'):
+        raise ValueError(
+            f"Salesforce authentication failed for connection '{connection_name}'. "
+            "Missing access_token or instance_url in response."
+        )
+
+    now = time.time()
+    token = {
+        'access_token': auth_result['access_token'],
+        'instance_url': auth_result['instance_url'],
+        'issued_at': now,
+        'expires_at': now + float(auth_result.get('expires_in') or TOKEN_TTL_SECONDS),
+    }
+    _save_cached_token(connection_name, credentials, token)
+    return token
+
+
+def get_salesforce_access_info(connection_name: Optional[str] = None, use_cache: bool = True) -> Dict[str, Any]:
     """
     Get Salesforce access_info from a saved connection.
     
-    Loads a Salesforce connection, authenticates using OAuth2 client credentials flow,
-    and returns the access_info dictionary needed for Salesforce API calls.
+    Loads a Salesforce connection and returns the access_info dictionary needed
+    for Salesforce API calls. A token cached in ~/.solomo/tokens is reused while
+    it is valid; otherwise the OAuth2 client credentials flow is run and the new
+    token is cached. The returned dict refreshes itself when Salesforce rejects
+    the token (see ``SalesforceAccessInfo``).
     
     Args:
         connection_name: Optional name of Salesforce connection to use.
                         If None, uses the primary Salesforce connection.
+        use_cache: Reuse a cached token if one is valid (default: True)
         
     Returns:
         Dictionary containing access_info with 'access_token' and 'instance_url'
@@ -104,32 +246,25 @@ def get_salesforce_access_info(connection_name: Optional[str] = None) -> Dict[st
         raise ValueError(f"Connection '{connection_name}' is not a Salesforce connection")
     
     # Extract credentials
-    client_id = credentials.get('client_id', '')
-    client_key = credentials.get('client_key', '')
-    my_domain = credentials.get('my_domain', '')
+    credentials = {
+        'client_id': credentials.get('client_id', ''),
+        'client_key': credentials.get('client_key', ''),
+        'my_domain': credentials.get('my_domain', ''),
+    }
     
-    if not client_id or not client_key or not my_domain:
+    if not credentials['client_id'] or not credentials['client_key'] or not credentials['my_domain']:
         raise ValueError(
             f"Salesforce connection '{connection_name}' is missing required credentials. "
             "Need: client_id, client_key, my_domain"
         )
     
-    # Authenticate with Salesforce
-    auth_result = login_user_flow(client_id, client_key, my_domain)
-    
-    # Extract access_info from auth result
-    access_info = {
-        'access_token': auth_result.get('access_token'),
-        'instance_url': auth_result.get('instance_url'),
-    }
-    
-    if not access_info['access_token'] or not access_info['instance_url']:
-        raise ValueError(
-            f"Salesforce authentication failed for connection '{connection_name}'. "
-            "Missing access_token or instance_url in response."
-        )
+    token = _load_cached_token(connection_name, credentials) if use_cache else None
+    if token is not None:
+        logger.debug(f"🔑 Using cached Salesforce token for '{connection_name}'")
+    else:
+        token = _request_token(connection_name, credentials)
     
-    return access_info
+    return SalesforceAccessInfo(connection_name, credentials, token)
 
 
 def authenticate_salesforce() -> Dict[str, Any]:
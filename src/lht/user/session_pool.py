@@ -0,0 +1,254 @@
+"""
+Pool of Snowpark sessions for parallel loaders.
+
+A ``SessionPool`` opens up to N sessions from one connection profile. The
+private key is loaded and decrypted once and reused for every session.
+Sessions are handed out with a health check (``SELECT 1``) when they have
+been idle for a while, and a background thread keeps idle sessions alive so
+long extracts don't come back to expired connections.
+
+Example:
+    >>> from lht.user.session_pool import SessionPool
+    >>> with SessionPool(connection_name='my_snowflake', size=4) as pool:
+    ...     with pool.session() as session:
+    ...         session.sql('SELECT CURRENT_WAREHOUSE()').collect()
+"""
+
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+from snowflake.snowpark import Session
+
+from lht.user.auth import _resolve_credentials, _load_private_key, _create_session_with_key
+
+logger = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """
+    Thread-safe pool of Snowpark sessions sharing one connection profile.
+
+    Sessions are created lazily up to ``size``. Staging tables written
+    through pooled sessions must not be TEMPORARY, because a temporary table
+    is only visible to the session that created it.
+    """
+
+    def __init__(self,
+                 connection_name: Optional[str] = None,
+                 credentials: Optional[Dict[str, Any]] = None,
+                 size: int = 4,
+                 health_check_after: float = 60.0,
+                 keep_alive_interval: float = 300.0):
+        """
+        Initialize the pool.
+
+        Args:
+            connection_name: Name of connection to load from connections.toml
+            credentials: Credentials dictionary (used if connection_name is not given)
+            size: Maximum number of open sessions
+            health_check_after: Idle seconds after which a session is checked before hand-out
+            keep_alive_interval: Seconds between keep-alive pings of idle sessions (0 disables)
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+
+        self.size = size
+        self.health_check_after = health_check_after
+        self.keep_alive_interval = keep_alive_interval
+
+        # Load and decrypt the key once for every session in the pool
+        self._credentials = _resolve_credentials(credentials, connection_name)
+        self._private_key = _load_private_key(
+            self._credentials['private_key_file'],
+            self._credentials.get('private_key_passphrase')
+        )
+
+        self._condition = threading.Condition()
+        self._create_lock = threading.Lock()
+        self._idle: List[Dict[str, Any]] = []
+        self._open = 0
+        self._closed = False
+        self.stats = {
+            'created': 0,
+            'acquired': 0,
+            'health_checks': 0,
+            'replaced': 0,
+            'keep_alive_pings': 0,
+            'wait_seconds': 0.0,
+        }
+
+        self._keep_alive_stop = threading.Event()
+        self._keep_alive_thread = None
+        if keep_alive_interval and keep_alive_interval > 0:
+            self._keep_alive_thread = threading.Thread(
+                target=self._keep_alive_loop, name='lht-session-keepalive', daemon=True
+            )
+            self._keep_alive_thread.start()
+
+    # ------------------------------------------------------------------
+    # Hand-out
+    # ------------------------------------------------------------------
+    def acquire(self, timeout: Optional[float] = None) -> Session:
+        """
+        Take a session from the pool, opening a new one if below ``size``.
+
+        Args:
+            timeout: Seconds to wait for a free session (None waits indefinitely)
+
+        Returns:
+            Session: A healthy Snowpark session
+
+        Raises:
+            TimeoutError: If no session became available within ``timeout``
+        """
+        start = time.time()
+        deadline = None if timeout is None else start + timeout
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Session pool is closed")
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    entry = None
+                    break
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No Snowflake session available after {timeout}s")
+                self._condition.wait(remaining)
+            self.stats['wait_seconds'] += time.time() - start
+            self.stats['acquired'] += 1
+
+        try:
+            if entry is None:
+                return self._new_session()
+            if time.time() - entry['last_used'] > self.health_check_after and not self._healthy(entry['session']):
+                logger.warning("⚠️ Pooled Snowflake session failed its health check, replacing it")
+                self._close_quietly(entry['session'])
+                with self._condition:
+                    self.stats['replaced'] += 1
+                return self._new_session()
+            return entry['session']
+        except Exception:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, session: Session, discard: bool = False) -> None:
+        """
+        Return a session to the pool.
+
+        Args:
+            session: Session obtained from ``acquire``
+            discard: Close the session instead of reusing it (e.g. after a connection error)
+        """
+        with self._condition:
+            if discard or self._closed:
+                self._open -= 1
+                self._close_quietly(session)
+            else:
+                self._idle.append({'session': session, 'last_used': time.time()})
+            self._condition.notify()
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None):
+        """Context manager around ``acquire``/``release``."""
+        session = self.acquire(timeout)
+        try:
+            yield session
+        except Exception:
+            # A failed statement leaves the session usable; a broken connection does not
+            self.release(session, discard=not self._healthy(session))
+            raise
+        else:
+            self.release(session)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def close(self) -> None:
+        """Close all idle sessions and stop the keep-alive thread."""
+        self._keep_alive_stop.set()
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._condition.notify_all()
+        for entry in idle:
+            self._close_quietly(entry['session'])
+        if self._keep_alive_thread is not None:
+            self._keep_alive_thread.join(timeout=5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Pool counters as a plain dictionary."""
+        with self._condition:
+            data = dict(self.stats)
+            data.update({'size': self.size, 'open': self._open, 'idle': len(self._idle)})
+            return data
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _new_session(self) -> Session:
+        # Session.builder is shared module state; build one session at a time
+        with self._create_lock:
+            session = _create_session_with_key(self._credentials, self._private_key, verbose=False)
+        with self._condition:
+            self.stats['created'] += 1
+            created = self.stats['created']
+        logger.debug(f"🔌 Opened pooled Snowflake session ({created} total)")
+        return session
+
+    def _healthy(self, session: Session) -> bool:
+        with self._condition:
+            self.stats['health_checks'] += 1
+        try:
+            session.sql('SELECT 1').collect()
+            return True
+        except Exception as e:
+            logger.debug(f"Session health check failed: {e}")
+            return False
+
+    @staticmethod
+    def _close_quietly(session: Session) -> None:
+        try:
+            session.close()
+        except Exception as e:
+            logger.debug(f"Error closing Snowflake session: {e}")
+
+    def _keep_alive_loop(self) -> None:
+        while not self._keep_alive_stop.wait(self.keep_alive_interval):
+            with self._condition:
+                due = [entry for entry in self._idle
+                       if time.time() - entry['last_used'] >= self.keep_alive_interval]
+                for entry in due:
+                    self._idle.remove(entry)
+            for entry in due:
+                healthy = self._healthy(entry['session'])
+                with self._condition:
+                    self.stats['keep_alive_pings'] += 1
+                if healthy and not self._closed:
+                    entry['last_used'] = time.time()
+                    with self._condition:
+                        self._idle.append(entry)
+                        self._condition.notify()
+                else:
+                    self._close_quietly(entry['session'])
+                    with self._condition:
+                        self._open -= 1
+                        if not healthy:
+                            self.stats['replaced'] += 1
+                        self._condition.notify()
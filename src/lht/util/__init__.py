@@ -1,14 +1,38 @@
-from .soql_query import build_soql  # If this is how you want to import it
-from .csv import json_to_csv
-from .data_writer import (
-    write_dataframe_to_table, 
-    write_batch_to_temp_table, 
-    write_batch_to_main_table,
-    validate_dataframe_types,
-    standardize_dataframe_types,
-    write_dataframe_with_type_handling
-)
-from .table_creator import (
-    create_salesforce_table,
-    ensure_table_exists_for_dataframe
-)
\ No newline at end of file
+"""
+Shared utilities for Snowflake writes, staging and SOQL helpers.
+
+Exports are resolved on first access (PEP 562); ``data_writer`` and
+``table_creator`` import pandas and Snowpark, which light modules such as
+``lht.util.field_types`` or ``lht.util.staging`` don't need.
+"""
+
+import importlib
+
+# Exported name -> module that defines it
+_LAZY_EXPORTS = {
+    'build_soql': '.soql_query',
+    'json_to_csv': '.csv',
+    'write_dataframe_to_table': '.data_writer',
+    'write_batch_to_temp_table': '.data_writer',
+    'write_batch_to_main_table': '.data_writer',
+    'validate_dataframe_types': '.data_writer',
+    'standardize_dataframe_types': '.data_writer',
+    'write_dataframe_with_type_handling': '.data_writer',
+    'create_salesforce_table': '.table_creator',
+    'ensure_table_exists_for_dataframe': '.table_creator',
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
@@ -0,0 +1,237 @@
+"""
+Per-session cache of Snowflake metadata.
+
+Syncs repeatedly ask Snowflake for the current database, whether a schema or
+table exists and which columns a table has. ``SessionCatalog`` answers those
+from memory after the first lookup. Listings are fetched a whole schema at a
+time, so checking many tables costs one ``SHOW`` per schema. Code that runs
+DDL reports it (``table_created``, ``table_dropped``, ``columns_changed``,
+...) so the cache stays in step with our own changes.
+
+The cache lives as long as the Snowpark session. DDL run by other sessions
+during a sync is not seen; call ``invalidate`` if that matters.
+
+Example:
+    >>> from lht.util import catalog
+    >>> cat = catalog.get_catalog(session)
+    >>> cat.table_exists(cat.current_database(), 'RAW', 'ACCOUNT')
+"""
+
+import threading
+import weakref
+import logging
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_catalogs: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+_catalogs_lock = threading.Lock()
+
+
+def _norm(identifier: Optional[str]) -> str:
+    """Normalize an identifier for lookups (unquoted Snowflake identifiers are upper case)."""
+    return (identifier or '').strip().strip('"').upper()
+
+
+class SessionCatalog:
+    """
+    Metadata cache bound to one Snowpark session.
+    """
+
+    def __init__(self, session):
+        """
+        Initialize the catalog.
+
+        Args:
+            session: Snowflake Snowpark session
+        """
+        self.session = session
+        self._lock = threading.RLock()
+        self._context: Optional[Tuple[Optional[str], Optional[str]]] = None
+        self._schemas: Dict[str, Set[str]] = {}
+        self._tables: Dict[Tuple[str, str], Set[str]] = {}
+        self._columns: Dict[Tuple[str, str, str], List[Tuple[str, str]]] = {}
+        self.stats = {'hits': 0, 'queries': 0}
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def current_database(self) -> Optional[str]:
+        """The session's current database."""
+        return self._current_context()[0]
+
+    def current_schema(self) -> Optional[str]:
+        """The session's current schema."""
+        return self._current_context()[1]
+
+    def schema_exists(self, database: str, schema: str) -> bool:
+        """
+        Check whether a schema exists, listing the database's schemas on first use.
+
+        Args:
+            database: Database name
+            schema: Schema name
+
+        Returns:
+            bool: True if the schema exists
+        """
+        with self._lock:
+            names = self._schemas.get(_norm(database))
+            if names is None:
+                names = self._list_names(f"SHOW TERSE SCHEMAS IN DATABASE {database}")
+                if names is None:
+                    return False
+                self._schemas[_norm(database)] = names
+            else:
+                self.stats['hits'] += 1
+            return _norm(schema) in names
+
+    def table_exists(self, database: str, schema: str, table: str) -> bool:
+        """
+        Check whether a table exists, listing the schema's tables on first use.
+
+        Args:
+            database: Database name
+            schema: Schema name
+            table: Table name
+
+        Returns:
+            bool: True if the table exists
+        """
+        key = (_norm(database), _norm(schema))
+        with self._lock:
+            names = self._tables.get(key)
+            if names is None:
+                names = self._list_names(f"SHOW TERSE TABLES IN SCHEMA {database}.{schema}")
+                if names is None:
+                    return False
+                self._tables[key] = names
+            else:
+                self.stats['hits'] += 1
+            return _norm(table) in names
+
+    def column_types(self, database: str, schema: str, table: str) -> Dict[str, str]:
+        """
+        Columns of a table in ordinal order, mapped to their Snowflake types.
+
+        Args:
+            database: Database name
+            schema: Schema name
+            table: Table name
+
+        Returns:
+            dict: Column name -> type (e.g. ``{'ID': 'VARCHAR(18)', ...}``)
+        """
+        key = (_norm(database), _norm(schema), _norm(table))
+        with self._lock:
+            columns = self._columns.get(key)
+            if columns is None:
+                self.stats['queries'] += 1
+                rows = self.session.sql(f"DESCRIBE TABLE {database}.{schema}.{table}").collect()
+                columns = [(row['name'], row['type']) for row in rows]
+                self._columns[key] = columns
+                # A table we could describe exists
+                if key[:2] in self._tables:
+                    self._tables[key[:2]].add(key[2])
+            else:
+                self.stats['hits'] += 1
+            return dict(columns)
+
+    def columns(self, database: str, schema: str, table: str) -> List[str]:
+        """Column names of a table in ordinal order."""
+        return list(self.column_types(database, schema, table))
+
+    # ------------------------------------------------------------------
+    # DDL notifications
+    # ------------------------------------------------------------------
+    def schema_created(self, database: str, schema: str) -> None:
+        """Record a schema created by this process."""
+        with self._lock:
+            if _norm(database) in self._schemas:
+                self._schemas[_norm(database)].add(_norm(schema))
+
+    def table_created(self, database: str, schema: str, table: str) -> None:
+        """Record a table created or replaced by this process; its columns are re-read on next use."""
+        with self._lock:
+            key = (_norm(database), _norm(schema))
+            if key in self._tables:
+                self._tables[key].add(_norm(table))
+            self._columns.pop(key + (_norm(table),), None)
+
+    def table_dropped(self, database: str, schema: str, table: str) -> None:
+        """Record a table dropped by this process."""
+        with self._lock:
+            key = (_norm(database), _norm(schema))
+            if key in self._tables:
+                self._tables[key].discard(_norm(table))
+            self._columns.pop(key + (_norm(table),), None)
+
+    def columns_changed(self, database: str, schema: str, table: str) -> None:
+        """Forget a table's cached columns after ALTER TABLE or a write that may have changed them."""
+        with self._lock:
+            self._columns.pop((_norm(database), _norm(schema), _norm(table)), None)
+
+    def invalidate(self) -> None:
+        """Forget everything; the next lookups query Snowflake again."""
+        with self._lock:
+            self._context = None
+            self._schemas.clear()
+            self._tables.clear()
+            self._columns.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cache counters as a plain dictionary."""
+        with self._lock:
+            data = dict(self.stats)
+            data.update({
+                'schemas_cached': sum(len(names) for names in self._schemas.values()),
+                'tables_cached': sum(len(names) for names in self._tables.values()),
+                'column_lists_cached': len(self._columns),
+            })
+            return data
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _current_context(self) -> Tuple[Optional[str], Optional[str]]:
+        with self._lock:
+            if self._context is None:
+                self.stats['queries'] += 1
+                row = self.session.sql('SELECT CURRENT_DATABASE(), CURRENT_SCHEMA()').collect()[0]
+                self._context = (row[0], row[1])
+            else:
+                self.stats['hits'] += 1
+            return self._context
+
+    def _list_names(self, query: str) -> Optional[Set[str]]:
+        """
+        Run a SHOW command and return the upper-cased object names.
+
+        Returns None if the command failed (e.g. the database or schema doesn't
+        exist); failures are not cached so a later ``CREATE`` is picked up.
+        """
+        self.stats['queries'] += 1
+        try:
+            rows = self.session.sql(query).collect()
+        except Exception as e:
+            logger.debug(f"Catalog lookup failed ({query}): {e}")
+            return None
+        return {_norm(row['name']) for row in rows}
+
+
+def get_catalog(session) -> SessionCatalog:
+    """
+    Return the catalog bound to a Snowpark session, creating it on first use.
+
+    Args:
+        session: Snowflake Snowpark session
+
+    Returns:
+        SessionCatalog: Catalog shared by all code using that session
+    """
+    with _catalogs_lock:
+        catalog = _catalogs.get(session)
+        if catalog is None:
+            catalog = SessionCatalog(session)
+            _catalogs[session] = catalog
+        return catalog
@@ -7,25 +7,223 @@ import logging
 logger = logging.getLogger(__name__)
 
 def json_to_csv(json_data):
+    """
+    Convert a list of records (dicts, or a JSON string of them) to Bulk API CSV.
+
+    Columns follow the keys of the first record. The records are loaded into
+    a DataFrame once and written column-wise by ``dataframe_to_csv``.
+
+    Returns:
+        str: CSV content, or None if there are no records
+    """
     if isinstance(json_data, str):
         json_data = json.loads(json_data)
 
-    output = io.StringIO()
-    
-    writer = csv.writer(output)
-
     try:
-        writer.writerow(json_data[0].keys())
-    except:
+        columns = list(json_data[0].keys())
+    except (IndexError, KeyError, TypeError, AttributeError):
         logger.warning("no data to process")
         return None
-    for item in json_data:
-        writer.writerow(item.values())
 
-    csv_content = output.getvalue()
-    output.close()
-    
-    return csv_content
+    return dataframe_to_csv(pd.DataFrame.from_records(json_data, columns=columns))
+
+def _whole_number_floats_to_int(df):
+    """Write float columns holding only whole numbers (integer columns with nulls) as Int64."""
+    converted = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_float_dtype(series):
+            values = series.dropna()
+            if len(values) and (values == values.round()).all() and values.abs().max() < 2 ** 53:
+                converted[column] = series.astype('Int64')
+    if converted:
+        df = df.assign(**converted)
+    return df
+
+def dataframe_to_csv(df, header=True):
+    """
+    Convert a DataFrame to Bulk API CSV (CRLF line endings), like ``json_to_csv``.
+
+    Nulls become empty fields. Float columns holding only whole numbers (how
+    pandas represents integer columns with nulls) are written without a
+    trailing ``.0``.
+
+    Args:
+        df: pandas DataFrame
+        header: Whether to write the header row
+
+    Returns:
+        str: CSV content, or None if the DataFrame has no rows
+    """
+    if df is None or df.empty:
+        logger.warning("no data to process")
+        return None
+
+    df = _whole_number_floats_to_int(df)
+    return df.to_csv(index=False, header=header, na_rep='', lineterminator='\r\n')
+
+def _encode_rows(df, header=False):
+    return df.to_csv(index=False, header=header, na_rep='', lineterminator='\r\n').encode('utf-8')
+
+class CsvBody:
+    """
+    Bulk API upload body made of encoded CSV chunks.
+
+    Behaves as a read-only file of known length, so ``requests`` streams the
+    chunks with a Content-Length header instead of joining them into one
+    payload. ``seek`` rewinds it for a retried upload.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.length = sum(len(chunk) for chunk in chunks)
+        self.groups = None
+        self._index = 0
+        self._offset = 0
+        self._position = 0
+
+    def __len__(self):
+        return self.length
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.length - self._position
+        parts = []
+        while size > 0 and self._index < len(self.chunks):
+            chunk = self.chunks[self._index]
+            part = chunk[self._offset:self._offset + size]
+            parts.append(part)
+            size -= len(part)
+            self._offset += len(part)
+            self._position += len(part)
+            if self._offset >= len(chunk):
+                self._index += 1
+                self._offset = 0
+        return b''.join(parts)
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=0):
+        if whence != 0:
+            raise io.UnsupportedOperation("CsvBody only supports absolute seeks")
+        self._index = 0
+        self._offset = 0
+        self._position = 0
+        self.read(offset)
+        return self._position
+
+    def getvalue(self):
+        """The whole body as bytes."""
+        return b''.join(self.chunks)
+
+def _group_starts(values):
+    """Row positions where a new run of equal values starts (always includes 0)."""
+    return (values != values.shift()).to_numpy().nonzero()[0]
+
+def _piece_end(starts, start, want, total):
+    """
+    End of a piece of about ``want`` rows from ``start``, moved to a group start.
+
+    The piece ends at the last group start within ``want`` rows or, if one
+    group is longer than that, at the end of that group.
+    """
+    end = min(start + want, total)
+    if starts is None or end >= total:
+        return end
+    i = int(starts.searchsorted(end, side='right'))
+    before = starts[i - 1]
+    if before > start:
+        return int(before)
+    return int(starts[i]) if i < len(starts) else total
+
+def _piece_groups(values):
+    """[value, rows] for each run of equal values."""
+    starts = list(_group_starts(values)) + [len(values)]
+    return [[values.iat[a], int(b - a)] for a, b in zip(starts, starts[1:])]
+
+def csv_payloads(frames, max_bytes, max_rows=None, chunk_rows=1000, group_by=None):
+    """
+    Encode a stream of DataFrames into Bulk API upload bodies of at most ``max_bytes``.
+
+    Each DataFrame is written ``chunk_rows`` rows at a time with
+    ``DataFrame.to_csv`` and the encoded chunks are packed into bodies, each
+    starting with the header row. A body is closed when the next chunk would
+    take it over ``max_bytes`` (or ``max_rows`` rows); a chunk too large for
+    an empty body is halved until it fits.
+
+    With ``group_by``, rows with the same value in that column (which must be
+    contiguous, including across DataFrames) are kept in one body; only a
+    group too large for a body on its own (over ``max_bytes`` or
+    ``max_rows``) is split. Each body's ``groups``
+    attribute lists ``[value, rows]`` for its groups in order.
+
+    Args:
+        frames: Iterable of pandas DataFrames with the same columns
+        max_bytes: Largest body size in bytes (UTF-8, header included)
+        max_rows: Largest number of rows per body (None for no limit)
+        chunk_rows: Rows encoded per chunk
+        group_by: Column whose groups of rows are not split across bodies
+
+    Yields:
+        tuple: (CsvBody, row count)
+
+    Raises:
+        ValueError: If a single row doesn't fit in ``max_bytes``
+    """
+    header = None
+    chunks, size, rows, groups = [], 0, 0, []
+
+    def _body():
+        body = CsvBody(chunks)
+        if group_by is not None:
+            body.groups = groups
+        return body
+
+    for df in frames:
+        if df is None or df.empty:
+            continue
+        df = _whole_number_floats_to_int(df)
+        if header is None:
+            header = _encode_rows(df.head(0), header=True)
+        starts = _group_starts(df[group_by]) if group_by is not None else None
+        start = 0
+        while start < len(df):
+            step = chunk_rows if not max_rows else min(chunk_rows, max_rows - rows)
+            end = _piece_end(starts, start, step, len(df))
+            if max_rows and end - start > max_rows:
+                # One group has more rows than a body may hold; fill this body and go on in the next
+                end = start + max_rows - rows
+            data = _encode_rows(df.iloc[start:end])
+            while len(header) + len(data) > max_bytes and end - start > 1:
+                half = _piece_end(starts, start, (end - start) // 2, len(df))
+                end = half if half < end else start + (end - start) // 2
+                data = _encode_rows(df.iloc[start:end])
+            if len(header) + len(data) > max_bytes:
+                raise ValueError(f"A single row encodes to {len(data):,} bytes, over the {max_bytes:,} byte upload limit")
+
+            if rows and (size + len(data) > max_bytes or (max_rows and rows + end - start > max_rows)):
+                yield _body(), rows
+                chunks, size, rows, groups = [], 0, 0, []
+            if not chunks:
+                chunks.append(header)
+                size = len(header)
+            chunks.append(data)
+            size += len(data)
+            rows += end - start
+            if group_by is not None:
+                for value, count in _piece_groups(df[group_by].iloc[start:end]):
+                    if groups and groups[-1][0] == value:
+                        groups[-1][1] += count
+                    else:
+                        groups.append([value, count])
+            start = end
+
+            if max_rows and rows >= max_rows:
+                yield _body(), rows
+                chunks, size, rows, groups = [], 0, 0, []
+    if rows:
+        yield _body(), rows
 
 def success_upserts(data, job_id):
     csv_file = io.StringIO(data)
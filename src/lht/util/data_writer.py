@@ -5,6 +5,8 @@ from snowflake.snowpark.dataframe import DataFrame
 import pandas as pd
 import numpy as np
 from . import table_creator
+from . import staging
+from . import catalog
 
 logger = logging.getLogger(__name__)
 
@@ -97,7 +99,8 @@ def write_dataframe_to_table(
     on_error: str = "CONTINUE",
     df_fields: Optional[dict] = None,
     snowflake_fields: Optional[dict] = None,
-    force_full_sync: bool = False
+    force_full_sync: bool = False,
+    database: Optional[str] = None
 ) -> bool:
     """
     Centralized function for writing DataFrames to Snowflake tables.
@@ -114,6 +117,7 @@ def write_dataframe_to_table(
         use_logical_type: Whether to use logical types (set to False for lenient type handling)
         on_error: Error handling strategy ("CONTINUE", "ABORT", "SKIP_FILE")
         df_fields: Optional dictionary of field types for formatting (uses field_types.format_sync_file if provided)
+        database: Target database name (defaults to the session's current database)
         
     Returns:
         bool: True if successful, False otherwise
@@ -167,8 +171,8 @@ def write_dataframe_to_table(
                     use_logical_type = False
                     on_error = "CONTINUE"  # Be more permissive with errors
         
-        # Get current database for fully qualified table name
-        current_db = session.sql('SELECT CURRENT_DATABASE()').collect()[0][0]
+        # Get target database for fully qualified table name
+        current_db = database or catalog.get_catalog(session).current_database()
         
         # Determine the target table name
         if temp_table:
@@ -330,23 +334,26 @@ def write_dataframe_to_table(
                 logger.debug(f"🔍 DEBUG: DataFrame has index: {df_processed.index.tolist()[:5]}")
                 
                 # DEBUG: Try write_pandas first to a temporary table to validate DataFrame
-                try:
-                    debug_temp_table = f"{temp_table}_DEBUG" if temp_table else f"{table}_DEBUG"
-                    logger.debug(f"🔍 DEBUG: Testing DataFrame with write_pandas to {schema}.{debug_temp_table}")
-                    
-                    session.write_pandas(
-                        df_processed, 
-                        table_name=debug_temp_table,
-                        schema=schema,
-                        auto_create_table=True,
-                        overwrite=True
-                    )
-                    logger.debug(f"✅ DEBUG: write_pandas succeeded - DataFrame is valid")
-                    logger.debug(f"🔍 DEBUG: Table {schema}.{debug_temp_table} created for inspection - NOT dropping")
-                    # Table will remain for manual inspection - you can drop it manually after reviewing
-                except Exception as wp_error:
-                    logger.error(f"❌ DEBUG: write_pandas also failed: {wp_error}")
-                    logger.error(f"   This suggests the DataFrame itself has structural issues")
+                # Only when debug logging is on, and under a unique name so concurrent writers don't collide
+                if logger.isEnabledFor(logging.DEBUG):
+                    try:
+                        debug_temp_table = staging.staging_table_name(temp_table or table, prefix='DEBUG')
+                        logger.debug(f"🔍 DEBUG: Testing DataFrame with write_pandas to {current_db}.{schema}.{debug_temp_table}")
+                        
+                        session.write_pandas(
+                            df_processed, 
+                            table_name=debug_temp_table,
+                            database=current_db,
+                            schema=schema,
+                            auto_create_table=True,
+                            overwrite=True
+                        )
+                        logger.debug(f"✅ DEBUG: write_pandas succeeded - DataFrame is valid")
+                        logger.debug(f"🔍 DEBUG: Table {schema}.{debug_temp_table} created for inspection - NOT dropping")
+                        # Table will remain for manual inspection - you can drop it manually after reviewing
+                    except Exception as wp_error:
+                        logger.error(f"❌ DEBUG: write_pandas also failed: {wp_error}")
+                        logger.error(f"   This suggests the DataFrame itself has structural issues")
                 
                 snowpark_df = session.create_dataframe(df_processed)
             except Exception as create_error:
@@ -385,6 +392,10 @@ def write_dataframe_to_table(
             logger.info(f"✅ Processed data written successfully with mode: {'overwrite' if overwrite else 'append'}")
             result = True  # save_as_table doesn't return a result object like write_pandas
         
+        if overwrite or auto_create:
+            # save_as_table may have created or replaced the table
+            catalog.get_catalog(session).table_created(current_db, schema, target_table)
+        
         logger.debug(f"✅ Successfully wrote {len(df)} records to {full_table_name}")
         return True
         
@@ -549,11 +560,16 @@ def write_batch_to_temp_table(
     validate_types: bool = True,
     force_full_sync: bool = False,
     main_table: str = None,
-    snowflake_fields: Optional[dict] = None
+    snowflake_fields: Optional[dict] = None,
+    database: Optional[str] = None
 ) -> bool:
     """
     Write a batch DataFrame to a temporary table for incremental sync operations.
     
+    Callers should pass a per-run unique ``temp_table`` name (see
+    ``lht.util.staging.staging_table_name``) so concurrent syncs sharing a
+    session or schema never write into each other's staging table.
+    
     Args:
         session: Snowflake Snowpark session
         df: DataFrame to write
@@ -564,25 +580,26 @@ def write_batch_to_temp_table(
         force_full_sync: Whether this is a full sync operation
         main_table: Main table name to copy schema from (for temp table creation)
         snowflake_fields: Salesforce field type definitions
+        database: Target database name (None to use session's current database)
         
     Returns:
         bool: True if successful
     """
-    # Get current schema if not provided
-    if schema is None:
-        current_schema = session.sql('SELECT CURRENT_SCHEMA()').collect()[0][0]
-        logger.debug(f"📦 Using current schema: {current_schema}")
-    else:
-        current_schema = schema
+    # Resolve database/schema once so every statement below is fully qualified
+    current_db, current_schema, temp_table = staging.resolve_table_name(session, temp_table, database, schema)
+    logger.debug(f"📦 Using database/schema: {current_db}.{current_schema}")
         
     logger.debug(f"📦 Writing batch to temp table: {current_schema}.{temp_table}")
     
     # Create temporary table with schema copied from main table if provided
     if main_table:
         try:
-            create_temp_query = f"CREATE OR REPLACE TEMPORARY TABLE {temp_table} LIKE {main_table}"
+            temp_table_fq = staging.qualify(current_db, current_schema, temp_table)
+            main_table_fq = staging.qualify(current_db, current_schema, main_table)
+            create_temp_query = f"CREATE OR REPLACE TEMPORARY TABLE {temp_table_fq} LIKE {main_table_fq}"
             logger.debug(f"🔍 Creating temp table with schema copy: {create_temp_query}")
             session.sql(create_temp_query).collect()
+            catalog.get_catalog(session).table_created(current_db, current_schema, temp_table)
             logger.debug(f"✅ Temp table created with schema from {main_table}")
         except Exception as e:
             logger.warning(f"⚠️ Failed to create temp table with schema copy: {e}")
@@ -603,7 +620,8 @@ def write_batch_to_temp_table(
             on_error="CONTINUE",
             df_fields=df_fields,  # Pass field definitions for proper formatting
             snowflake_fields=snowflake_fields,  # Pass Salesforce field types
-            force_full_sync=force_full_sync  # Pass through force_full_sync parameter
+            force_full_sync=force_full_sync,  # Pass through force_full_sync parameter
+            database=current_db
         )
     except Exception as e:
         error_msg = str(e)
@@ -626,7 +644,8 @@ def write_batch_to_temp_table(
                 on_error="CONTINUE",
                 df_fields=df_fields,  # Pass field definitions for proper formatting
                 snowflake_fields=snowflake_fields,  # Pass Salesforce field types
-                force_full_sync=force_full_sync  # Pass through force_full_sync parameter
+                force_full_sync=force_full_sync,  # Pass through force_full_sync parameter
+                database=current_db
             )
         else:
             logger.error(f"❌ Non-casting error in temp table write: {error_msg}")
@@ -1,8 +1,8 @@
 import json
-import requests
 from snowflake.snowpark import Session
 from snowflake.snowpark.functions import col
 from . import csv
+from lht.salesforce import client
 
 
 def job(session, json_data):   
@@ -21,7 +21,7 @@ def successful_results(access_info, job_id):
         'Authorization': f'Bearer {access_token}',
         'Accept': 'text/csv'
     }
-    response = requests.get(url, headers=headers)
+    response = client.get(access_info, url, call_type='bulk_ingest', headers=headers)
     results = csv.success_upserts(response.text, job_id)
 
     return results
@@ -33,7 +33,7 @@ def failed_results(access_info, job_id):
         'Authorization': f'Bearer {access_token}',
         'Accept': 'text/csv'
     }
-    response = requests.get(url, headers=headers)
+    response = client.get(access_info, url, call_type='bulk_ingest', headers=headers)
     results = csv.fail_upserts(response.text, job_id)
 
     return results
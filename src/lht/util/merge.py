@@ -1,6 +1,8 @@
 from snowflake.snowpark import Session
 from snowflake.snowpark import functions as F
 import logging
+from . import staging
+from . import catalog
 
 logger = logging.getLogger(__name__)
 
@@ -46,21 +48,24 @@ def format_insert_upsert(snowpark_session, src_table, tgt_table, s_filter_cond):
     update_col = list()
     insert_sel = list()
     insert_val = list()
-    # Get current database and schema for proper table references
-    current_db = snowpark_session.sql("SELECT CURRENT_DATABASE()").collect()[0][0]
-    schema_name = snowpark_session.get_current_schema().replace('"','')
+    # Resolve each table to database/schema/name so qualified names work and
+    # lookups don't depend on the session's current database/schema
+    src_db, src_schema, src_name = staging.resolve_table_name(snowpark_session, src_table)
+    tgt_db, tgt_schema, tgt_name = staging.resolve_table_name(snowpark_session, tgt_table)
     
-    # Use fully qualified table names for temporary table queries
-    src_table_col = snowpark_session.sql("select COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = '{0}' AND TABLE_SCHEMA = \'{1}\' ORDER BY ORDINAL_POSITION".format(src_table, schema_name)).collect()
-    tgt_table_col = snowpark_session.sql("select COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = '{0}' AND TABLE_SCHEMA = \'{1}\' ORDER BY ORDINAL_POSITION".format(tgt_table, schema_name)).collect()
+    # Column lists come from the session catalog, so repeated merges into the
+    # same target don't query INFORMATION_SCHEMA again
+    session_catalog = catalog.get_catalog(snowpark_session)
+    src_table_col = session_catalog.columns(src_db, src_schema, src_name)
+    tgt_table_col = session_catalog.columns(tgt_db, tgt_schema, tgt_name)
     logger.info("\n\nsrc_table_col: {}".format(src_table_col))
     logger.info("\n\ntgt_table_col: {}".format(tgt_table_col))
     if len(src_table_col) != 0:
         for idx_value in range(len(src_table_col)):
-            sel_colum.append('"'+src_table_col[idx_value][0]+'"')
-            insert_val.append("src." + '"' + str(src_table_col[idx_value][0]) + '"')
-            insert_sel.append("tgt." + '"' + str(tgt_table_col[idx_value][0]) + '"')
-            update_col.append("tgt." + '"' + str(tgt_table_col[idx_value][0]) + '"' + ' = ' + "src." + '"' + str(src_table_col[idx_value][0]) + '"')
+            sel_colum.append('"'+src_table_col[idx_value]+'"')
+            insert_val.append("src." + '"' + str(src_table_col[idx_value]) + '"')
+            insert_sel.append("tgt." + '"' + str(tgt_table_col[idx_value]) + '"')
+            update_col.append("tgt." + '"' + str(tgt_table_col[idx_value]) + '"' + ' = ' + "src." + '"' + str(src_table_col[idx_value]) + '"')
 
         # DEBUG: Log the column lists before generating SQL
         logger.debug("🔍 DEBUG: Column lists being used in merge statement:")
@@ -117,20 +122,31 @@ def transform_and_match_datatypes(session, temp_table, permanent_table, temp_sch
   Returns:
       Snowpark DataFrame with transformed data types
   """
+  # Get schema info for both tables (cached per session)
+  session_catalog = catalog.get_catalog(session)
+  temp_schema_info = session_catalog.column_types(*staging.resolve_table_name(session, temp_table, schema=temp_schema))
 
+  perm_schema_info = session_catalog.column_types(*staging.resolve_table_name(session, permanent_table, schema=perm_schema))
 
-  fields = ""
-  # Get schema info for both tables
-  temp_schema_info = session.sql(f"DESCRIBE TABLE {temp_table}").collect()
+  return build_cast_select(temp_schema_info, perm_schema_info)
+
+def build_cast_select(temp_schema_info, perm_schema_info):
+  """
+  Build the SELECT list that casts temp table columns to the permanent table's types.
 
-  perm_schema_info = session.sql(f"DESCRIBE TABLE {permanent_table}").collect()
+  Args:
+      temp_schema_info: Temp table column name -> Snowflake type
+      perm_schema_info: Permanent table column name -> Snowflake type
 
+  Returns:
+      str: Comma-separated select expressions, one per permanent table column
+  """
+  fields = ""
   # Create mapping of column name to data type for permanent table
-  perm_types = {row['name'].upper(): row['type'] for row in perm_schema_info}
-  temp_types = {row['name'].upper(): row['type'] for row in temp_schema_info}
+  perm_types = {name.upper(): col_type for name, col_type in perm_schema_info.items()}
+  temp_types = {name.upper(): col_type for name, col_type in temp_schema_info.items()}
 
-  for row in perm_schema_info:
-      col_name = row['name'].upper()
+  for col_name in perm_types:
       
       if col_name in temp_types:
           temp_type = temp_types[col_name]
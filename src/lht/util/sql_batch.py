@@ -0,0 +1,157 @@
+"""
+Multi-statement batching for Snowflake.
+
+Related statements such as ``DROP`` + ``CREATE``, ``COPY`` + ``DROP`` or a
+run of ``ALTER TABLE ... ADD COLUMN`` each cost a network round trip when
+sent with ``session.sql(...).collect()``. ``execute_batch`` sends them as
+one multi-statement request through the session's connector cursor
+(``num_statements``), so Snowflake runs them in order in a single call.
+
+If the session has no connector cursor (e.g. a stored procedure session),
+the statements are sent one by one instead. Either way execution stops at
+the first failing statement.
+
+Example:
+    >>> from lht.util import sql_batch
+    >>> sql_batch.execute_batch(session, [
+    ...     "DROP TABLE IF EXISTS RAW.ACCOUNT",
+    ...     "CREATE TABLE RAW.ACCOUNT (ID VARCHAR(18))",
+    ... ], label="recreate RAW.ACCOUNT")
+"""
+
+import threading
+import logging
+from typing import Dict, Any, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+_stats = {'batches': 0, 'statements': 0, 'round_trips': 0, 'round_trips_saved': 0, 'fallbacks': 0}
+_stats_lock = threading.Lock()
+
+
+class SqlBatchError(Exception):
+    """A statement in a batch failed; ``index`` is its position in the batch."""
+
+    def __init__(self, message: str, index: Optional[int] = None):
+        super().__init__(message)
+        self.index = index
+
+
+def execute_batch(session, statements: Sequence[str], label: str = '') -> List[List[Any]]:
+    """
+    Run statements in order using as few round trips as possible.
+
+    Args:
+        session: Snowflake Snowpark session
+        statements: SQL statements without trailing semicolons; empty entries are skipped
+        label: Short description used in log messages
+
+    Returns:
+        list: Result rows of each statement, in order
+
+    Raises:
+        SqlBatchError: If a statement failed; later statements were not run
+    """
+    statements = [statement.strip().rstrip(';').strip() for statement in statements if statement and statement.strip()]
+    if not statements:
+        return []
+    if len(statements) == 1:
+        return [_run_sequential(session, statements)[0]]
+
+    cursor = _cursor(session)
+    if cursor is not None:
+        try:
+            cursor.execute(';\n'.join(statements), num_statements=len(statements))
+        except Exception as e:
+            # Snowflake stops at the first failing statement; earlier ones have
+            # run, so the batch is not retried statement by statement
+            _close(cursor)
+            raise SqlBatchError(f"SQL batch failed{_describe(label)}: {e}")
+        try:
+            results = [_fetch(cursor)]
+            index = 1
+            while index < len(statements):
+                try:
+                    has_next = cursor.nextset()
+                except Exception as e:
+                    raise SqlBatchError(f"SQL batch failed at statement {index + 1}/{len(statements)}{_describe(label)}: {e}", index)
+                if not has_next:
+                    break
+                results.append(_fetch(cursor))
+                index += 1
+        finally:
+            _close(cursor)
+        _record(statements, round_trips=1)
+        logger.debug(f"📦 Ran {len(statements)} statements in one round trip{_describe(label)}")
+        return results
+
+    _record(statements, round_trips=len(statements), fallback=True)
+    return _run_sequential(session, statements)
+
+
+def stats() -> Dict[str, Any]:
+    """Counters for batches of two or more statements in this process, as a plain dictionary."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def stats_since(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Counters accumulated since ``snapshot`` (an earlier ``stats()`` result)."""
+    current = stats()
+    return {key: value - snapshot.get(key, 0) for key, value in current.items()}
+
+
+def reset_stats() -> None:
+    """Zero the batching counters."""
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def _run_sequential(session, statements: List[str]) -> List[List[Any]]:
+    """Send each statement in its own round trip."""
+    results = []
+    for index, statement in enumerate(statements):
+        try:
+            results.append(session.sql(statement).collect())
+        except Exception as e:
+            raise SqlBatchError(f"SQL statement {index + 1}/{len(statements)} failed: {e}", index)
+    return results
+
+
+def _record(statements: List[str], round_trips: int, fallback: bool = False) -> None:
+    """Count a batch of two or more statements."""
+    with _stats_lock:
+        _stats['batches'] += 1
+        _stats['statements'] += len(statements)
+        _stats['round_trips'] += round_trips
+        _stats['round_trips_saved'] += len(statements) - round_trips
+        if fallback:
+            _stats['fallbacks'] += 1
+
+
+def _cursor(session):
+    """A new connector cursor for the session, or None if the session doesn't expose one."""
+    try:
+        return session.connection.cursor()
+    except Exception:
+        return None
+
+
+def _fetch(cursor) -> List[Any]:
+    """Rows of the current result set (DDL returns a single status row)."""
+    try:
+        return cursor.fetchall()
+    except Exception:
+        return []
+
+
+def _close(cursor) -> None:
+    try:
+        cursor.close()
+    except Exception:
+        pass
+
+
+def _describe(label: str) -> str:
+    return f" ({label})" if label else ''
@@ -1,6 +1,8 @@
 import io
 import os
 import pandas as pd
+from . import staging
+from . import sql_batch
 
 def put_file(session, stage, file, filename=None):
     # Create an in-memory file object
@@ -59,17 +61,14 @@ def put_dataframe_to_stage(session, stage_name, df, filename=None, schema=None):
     csv_content = csv_buffer.getvalue()
     
     # Create a Snowflake DataFrame from the CSV content
-    # We'll use a temporary table approach to get the data into the stage
-    temp_table_name = f"TEMP_{filename.replace('.csv', '').replace('-', '_')}"
+    # We'll use a temporary table approach to get the data into the stage.
+    # The table name is unique per call so concurrent uploads never collide.
+    temp_table_name = staging.staging_table_name("STAGE", prefix="TEMP")
     
-    # Get current database for fully qualified table name
-    current_db = session.sql('SELECT CURRENT_DATABASE()').collect()[0][0]
-    
-    # Use schema if provided, otherwise use current schema
-    if schema:
-        full_temp_table_name = f"{current_db}.{schema}.{temp_table_name}"
-    else:
-        full_temp_table_name = f"{current_db}.{temp_table_name}"
+    # Resolve database and schema (defaulting to the session's current ones)
+    # so the temp table is always fully qualified
+    current_db, schema, temp_table_name = staging.resolve_table_name(session, temp_table_name, schema=schema)
+    full_temp_table_name = staging.qualify(current_db, schema, temp_table_name)
     
     try:
         # Write DataFrame to a temporary table using centralized data_writer
@@ -77,12 +76,13 @@ def put_dataframe_to_stage(session, stage_name, df, filename=None, schema=None):
         data_writer.write_dataframe_to_table(
             session=session,
             df=df,
-            schema=schema if schema else "PUBLIC",
+            schema=schema,
             table=temp_table_name,
             auto_create=True,
             overwrite=True,
             use_logical_type=True,
-            on_error="CONTINUE"
+            on_error="CONTINUE",
+            database=current_db
         )
         
         # Copy from temporary table to stage
@@ -95,10 +95,11 @@ def put_dataframe_to_stage(session, stage_name, df, filename=None, schema=None):
         OVERWRITE = TRUE
         """
         
-        session.sql(copy_command).collect()
-        
-        # Clean up temporary table
-        session.sql(f"DROP TABLE IF EXISTS {full_temp_table_name}").collect()
+        # Copy and clean up the temporary table in one round trip
+        sql_batch.execute_batch(session, [
+            copy_command,
+            f"DROP TABLE IF EXISTS {full_temp_table_name}",
+        ], label=f"stage {filename}")
         
         return filename
         
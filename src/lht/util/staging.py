@@ -0,0 +1,222 @@
+"""
+Staging object naming and per-table write locks.
+
+Every staging table created during a sync gets a per-run unique name and is
+referenced by its fully qualified name, so concurrent syncs (or parallel chunks
+of the same sync) never collide and never depend on the session's current
+database/schema. Loads into the same target table are serialized with
+``table_lock``.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+import logging
+from contextlib import contextmanager
+from typing import Optional, Tuple, Dict
+
+from . import catalog
+
+logger = logging.getLogger(__name__)
+
+# In-process locks, one per fully qualified target table
+_process_locks: Dict[str, threading.Lock] = {}
+_process_locks_guard = threading.Lock()
+
+
+def new_run_id() -> str:
+    """
+    Generate a short identifier that is unique per sync run or chunk.
+
+    Returns:
+        str: 12 character uppercase hex identifier
+    """
+    return uuid.uuid4().hex[:12].upper()
+
+
+def staging_table_name(table: str, run_id: Optional[str] = None, prefix: str = 'TMP') -> str:
+    """
+    Build a unique, unquoted staging table name for a target table.
+
+    Args:
+        table: Target table name (a qualified name is reduced to its last part)
+        run_id: Optional run identifier (generated if not provided)
+        prefix: Name prefix (default: 'TMP')
+
+    Returns:
+        str: Staging table name such as ``TMP_ACCOUNT_1A2B3C4D5E6F``
+    """
+    base = _strip_quotes(table.split('.')[-1])
+    return f"{prefix}_{base}_{run_id or new_run_id()}".upper()
+
+
+def qualify(database: Optional[str], schema: Optional[str], name: str) -> str:
+    """
+    Join database, schema and object name into a qualified identifier.
+
+    Names that are already qualified are returned unchanged.
+
+    Args:
+        database: Database name (optional)
+        schema: Schema name (optional)
+        name: Object name
+
+    Returns:
+        str: Qualified name, e.g. ``MYDB.RAW.ACCOUNT``
+    """
+    if '.' in name:
+        return name
+    parts = [part for part in (database, schema, name) if part]
+    return '.'.join(parts)
+
+
+def resolve_table_name(session, name: str, database: Optional[str] = None, schema: Optional[str] = None) -> Tuple[str, str, str]:
+    """
+    Split a (possibly partially) qualified table name into its parts.
+
+    Missing parts are taken from the provided defaults and, as a last resort,
+    from the session's current database/schema.
+
+    Args:
+        session: Snowflake Snowpark session
+        name: Table name, ``TABLE``, ``SCHEMA.TABLE`` or ``DB.SCHEMA.TABLE``
+        database: Default database
+        schema: Default schema
+
+    Returns:
+        Tuple of (database, schema, table) without surrounding quotes
+    """
+    parts = [_strip_quotes(part) for part in name.split('.')]
+    table = parts[-1]
+    if len(parts) >= 2:
+        schema = parts[-2]
+    if len(parts) >= 3:
+        database = parts[-3]
+
+    if not database or not schema:
+        session_catalog = catalog.get_catalog(session)
+        if not database:
+            database = _strip_quotes(session_catalog.current_database() or '')
+        if not schema:
+            schema = _strip_quotes(session_catalog.current_schema() or '')
+
+    return database, schema, table
+
+
+def _strip_quotes(identifier: str) -> str:
+    """Remove surrounding double quotes from an identifier."""
+    return identifier.strip().strip('"')
+
+
+def _lock_dir():
+    """Directory holding cross-process table lock files (~/.solomo/locks)."""
+    from lht.user.connections.manager import get_solomo_dir
+    lock_dir = get_solomo_dir() / 'locks'
+    lock_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return lock_dir
+
+
+def _lock_key(database: Optional[str], schema: Optional[str], table: str) -> str:
+    """Normalized key identifying a target table."""
+    return qualify(database, schema, table).replace('"', '').upper()
+
+
+def _pid_alive(pid: int) -> bool:
+    """Return True if a process with the given id is running on this host."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def _lock_is_stale(lock_path, stale_after: float) -> bool:
+    """Check whether an existing lock file was left behind by a dead writer."""
+    try:
+        age = time.time() - os.path.getmtime(lock_path)
+        with open(lock_path, 'r') as f:
+            owner = f.read().strip().split(':')
+    except OSError:
+        return False
+
+    if age > stale_after:
+        return True
+    if len(owner) >= 2 and owner[0] == socket.gethostname():
+        try:
+            return not _pid_alive(int(owner[1]))
+        except ValueError:
+            return True
+    return False
+
+
+@contextmanager
+def table_lock(database: Optional[str], schema: Optional[str], table: str,
+               timeout: Optional[float] = None, poll_interval: float = 1.0,
+               stale_after: float = 6 * 3600):
+    """
+    Advisory lock ensuring only one writer loads a target table at a time.
+
+    The lock is held in-process (for parallel threads) and through a lock file
+    under ``~/.solomo/locks`` (for concurrent CLI runs on the same host).
+    Lock files left behind by dead processes are reclaimed automatically.
+
+    Args:
+        database: Target database
+        schema: Target schema
+        table: Target table
+        timeout: Seconds to wait before giving up (None waits indefinitely)
+        poll_interval: Seconds between attempts to acquire the lock file
+        stale_after: Age in seconds after which a lock file is considered abandoned
+
+    Raises:
+        TimeoutError: If the lock could not be acquired within ``timeout``
+    """
+    key = _lock_key(database, schema, table)
+
+    with _process_locks_guard:
+        process_lock = _process_locks.setdefault(key, threading.Lock())
+
+    deadline = None if timeout is None else time.time() + timeout
+    if not process_lock.acquire(timeout=-1 if timeout is None else timeout):
+        raise TimeoutError(f"Timed out waiting for load lock on {key}")
+
+    lock_path = None
+    try:
+        lock_path = _lock_dir() / f"{key}.lock"
+        waited = False
+        while True:
+            try:
+                fd = os.open(str(lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+                with os.fdopen(fd, 'w') as f:
+                    f.write(f"{socket.gethostname()}:{os.getpid()}:{time.time():.0f}")
+                break
+            except FileExistsError:
+                if _lock_is_stale(lock_path, stale_after):
+                    logger.warning(f"⚠️ Removing stale load lock for {key}")
+                    try:
+                        os.remove(lock_path)
+                    except OSError:
+                        pass
+                    continue
+                if deadline is not None and time.time() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for load lock on {key}")
+                if not waited:
+                    logger.info(f"⏳ Waiting for another writer to finish loading {key}...")
+                    waited = True
+                time.sleep(poll_interval)
+
+        logger.debug(f"🔒 Acquired load lock for {key}")
+        try:
+            yield key
+        finally:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+            logger.debug(f"🔓 Released load lock for {key}")
+    finally:
+        process_lock.release()
@@ -7,6 +7,8 @@ across multiple sync functions.
 import logging
 from typing import Dict, Optional
 from snowflake.snowpark import Session
+from . import catalog
+from . import sql_batch
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +18,8 @@ def create_salesforce_table(
     table: str,
     snowflake_fields: Dict[str, str],
     force_full_sync: bool = False,
-    database: Optional[str] = None
+    database: Optional[str] = None,
+    create_table_sql: Optional[str] = None
 ) -> bool:
     """
     Create a Snowflake table with the correct schema for Salesforce data.
@@ -28,6 +31,7 @@ def create_salesforce_table(
         snowflake_fields: Dictionary mapping field names to Snowflake types
         force_full_sync: Whether to force table recreation (uses CREATE OR REPLACE)
         database: Target database name (auto-detected if not provided)
+        create_table_sql: Precompiled CREATE TABLE statement (e.g. from a sync plan)
         
     Returns:
         bool: True if table was created successfully or already exists
@@ -38,32 +42,26 @@ def create_salesforce_table(
     try:
         logger.debug(f"🔍 create_salesforce_table called with force_full_sync={force_full_sync}")
         
+        session_catalog = catalog.get_catalog(session)
+        
         # Auto-detect database if not provided
         if database is None:
-            database = session.sql('SELECT CURRENT_DATABASE()').collect()[0][0]
+            database = session_catalog.current_database()
             logger.debug(f"Auto-detected database: {database}")
         
-        # Set the current database and schema context
-        session.sql(f"USE DATABASE {database}").collect()
-        session.sql(f"USE SCHEMA {schema}").collect()
-        
         # Check if table already exists
+        drop_sql = None
         try:
             logger.debug(f"🔍 Checking if table {schema}.{table} exists...")
             
-            table_check = session.sql(f'SHOW TABLES IN SCHEMA "{schema}"').collect()
-            table_names = [row['name'] for row in table_check]
-            
-            if table in table_names:
+            if session_catalog.table_exists(database, schema, table):
                 logger.debug(f"🔍 Table {table} EXISTS in schema {schema}")
                 if force_full_sync:
                     logger.debug(f"🔍 force_full_sync is TRUE - will recreate table")
                     logger.info(f"Table {schema}.{table} exists and force_full_sync=True, recreating it...")
-                    # Drop existing table first
+                    # Drop existing table first; sent together with the CREATE below
                     logger.info(f"🗑️ Dropping existing table {schema}.{table}...")
-                    session.sql(f"DROP TABLE IF EXISTS {schema}.{table}").collect()
-                    logger.info(f"✅ Dropped existing table {schema}.{table}")
-                    logger.info(f"Dropped existing table {schema}.{table}")
+                    drop_sql = f"DROP TABLE IF EXISTS {database}.{schema}.{table}"
                 else:
                     logger.debug(f"🔍 force_full_sync is FALSE - skipping table creation")
                     logger.info(f"Table {schema}.{table} already exists, skipping creation")
@@ -73,11 +71,16 @@ def create_salesforce_table(
             
             # Create table with correct schema (either new or after dropping)
             logger.info(f"Creating table {schema}.{table}...")
-            create_table_sql = _build_create_table_sql(schema, table, snowflake_fields, force_full_sync)
+            if create_table_sql is None:
+                create_table_sql = _build_create_table_sql(schema, table, snowflake_fields, force_full_sync, database)
             
             # Create table with correct schema (either new or after dropping)
-            
-            result = session.sql(create_table_sql).collect()
+            # DROP + CREATE go out as one multi-statement request
+            sql_batch.execute_batch(session, [drop_sql, create_table_sql], label=f"recreate {schema}.{table}")
+            if drop_sql:
+                session_catalog.table_dropped(database, schema, table)
+                logger.info(f"✅ Dropped existing table {schema}.{table}")
+            session_catalog.table_created(database, schema, table)
             logger.info(f"Table created successfully with correct schema")
             return True
                 
@@ -101,20 +104,19 @@ def create_salesforce_table(
                     auto_create=True,
                     overwrite=False,
                     use_logical_type=False,
-                    on_error="CONTINUE"
+                    on_error="CONTINUE",
+                    database=database
                 )
                 logger.info(f"Auto-created table {schema}.{table}")
                 
                 # Now drop it and recreate with correct schema
                 logger.info(f"Dropping auto-created table to recreate with correct schema...")
-                session.sql(f"DROP TABLE IF EXISTS {schema}.{table}").collect()
-                
-                # Create table with correct schema
-                create_table_sql = _build_create_table_sql(schema, table, snowflake_fields, force_full_sync)
-                
-                # Create table with correct schema
-                
-                result = session.sql(create_table_sql).collect()
+                create_table_sql = _build_create_table_sql(schema, table, snowflake_fields, force_full_sync, database)
+                sql_batch.execute_batch(session, [
+                    f"DROP TABLE IF EXISTS {database}.{schema}.{table}",
+                    create_table_sql,
+                ], label=f"recreate {schema}.{table}")
+                session_catalog.table_created(database, schema, table)
                 logger.info(f"Table recreated with correct schema")
                 return True
                 
@@ -127,7 +129,7 @@ def create_salesforce_table(
         raise Exception(f"Failed to create table {schema}.{table}: {e}")
 
 
-def _build_create_table_sql(schema: str, table: str, snowflake_fields: Dict[str, str], force_full_sync: bool = False) -> str:
+def _build_create_table_sql(schema: str, table: str, snowflake_fields: Dict[str, str], force_full_sync: bool = False, database: Optional[str] = None) -> str:
     """
     Build CREATE TABLE SQL statement based on Salesforce field definitions.
     
@@ -136,6 +138,7 @@ def _build_create_table_sql(schema: str, table: str, snowflake_fields: Dict[str,
         table: Snowflake table name
         snowflake_fields: Dictionary mapping field names to Snowflake types
         force_full_sync: Whether to force table recreation
+        database: Optional database name used to fully qualify the table
         
     Returns:
         str: CREATE TABLE SQL statement
@@ -152,7 +155,8 @@ def _build_create_table_sql(schema: str, table: str, snowflake_fields: Dict[str,
     # Build CREATE TABLE statement
     column_defs = ',\n\t'.join(columns)
     # Always use CREATE TABLE (not CREATE OR REPLACE) since we handle DROP separately
-    create_sql = f"""CREATE TABLE "{schema}"."{table}" (
+    table_ref = f'"{database}"."{schema}"."{table}"' if database else f'"{schema}"."{table}"'
+    create_sql = f"""CREATE TABLE {table_ref} (
 	{column_defs}
 )"""
     
@@ -166,7 +170,8 @@ def ensure_table_exists_for_dataframe(
     df_fields: Dict[str, str],
     snowflake_fields: Dict[str, str],
     force_full_sync: bool = False,
-    database: Optional[str] = None
+    database: Optional[str] = None,
+    create_table_sql: Optional[str] = None
 ) -> bool:
     """
     Ensure a table exists with the correct schema for a DataFrame.
@@ -181,6 +186,7 @@ def ensure_table_exists_for_dataframe(
         snowflake_fields: Dictionary mapping field names to Snowflake types
         force_full_sync: Whether to force table recreation
         database: Target database name (auto-detected if not provided)
+        create_table_sql: Precompiled CREATE TABLE statement (e.g. from a sync plan)
         
     Returns:
         bool: True if table is ready for data insertion
@@ -206,7 +212,8 @@ def ensure_table_exists_for_dataframe(
             table=table,
             snowflake_fields=filtered_snowflake_fields,
             force_full_sync=force_full_sync,
-            database=database
+            database=database,
+            create_table_sql=create_table_sql
         )
         
     except Exception as e:
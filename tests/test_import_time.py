@@ -0,0 +1,75 @@
+"""
+Import-time budget for lightweight CLI commands.
+
+Each command's modules are imported in a fresh interpreter with
+``python -X importtime``. The test fails if a command pulls in a heavy
+dependency (pandas, numpy, Snowpark, pyarrow) or if importing LHT's modules
+takes longer than the command's budget.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+
+# Dependencies that only the sync / rETL commands should load
+HEAVY_MODULES = ('pandas', 'numpy', 'snowflake.snowpark', 'pyarrow')
+
+# Command -> (modules it imports when run, budget in milliseconds)
+LIGHT_COMMANDS = {
+    'help': (['lht.cli'], 150),
+    'list-connections': (['lht.cli', 'lht.cli.commands.list_connections', 'lht.user.connections'], 150),
+    'set-primary': (['lht.cli', 'lht.cli.commands.set_primary'], 150),
+    'edit-connection': (['lht.cli', 'lht.cli.commands.edit_connection', 'lht.user.connections'], 150),
+    'show-job': (['lht.cli', 'lht.cli.commands.show_job', 'lht.user.salesforce_auth', 'lht.salesforce.jobs'], 500),
+    'list-jobs': (['lht.cli', 'lht.cli.commands.list_jobs', 'lht.user.salesforce_auth', 'lht.salesforce.jobs'], 500),
+    'delete-job': (['lht.cli', 'lht.cli.commands.delete_job', 'lht.user.salesforce_auth', 'lht.salesforce.jobs'], 500),
+    'get-job-results': (['lht.cli', 'lht.cli.commands.get_job_results', 'lht.user.salesforce_auth', 'lht.salesforce.jobs'], 500),
+    'limits': (['lht.cli', 'lht.cli.commands.limits', 'lht.user.salesforce_auth', 'lht.salesforce.limits'], 500),
+    'cache': (['lht.cli', 'lht.cli.commands.cache', 'lht.user.salesforce_auth', 'lht.salesforce.describe_cache'], 500),
+    'plan': (['lht.cli', 'lht.cli.commands.plan', 'lht.salesforce.sync_plan'], 500),
+}
+
+
+def _import_times(modules):
+    """
+    Import ``modules`` in a fresh interpreter.
+
+    Returns:
+        tuple: (set of every module imported, cumulative microseconds spent importing lht.*)
+    """
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    code = '; '.join(f"import {module}" for module in modules)
+    # Run outside the repository root so lht.py there doesn't shadow the package
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=SRC_DIR.parent / 'tests', env=env, capture_output=True, text=True, check=True
+    )
+
+    imported = set()
+    lht_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imported.add(name.strip())
+        # Top-level entries (no indentation) were imported directly by the command
+        if not name[1:].startswith(' ') and name.strip().startswith('lht'):
+            lht_us += int(cumulative)
+    return imported, lht_us
+
+
+@pytest.mark.parametrize('command', sorted(LIGHT_COMMANDS))
+def test_light_command_import_budget(command):
+    modules, budget_ms = LIGHT_COMMANDS[command]
+    imported, lht_us = _import_times(modules)
+
+    heavy = sorted(name for name in imported if name in HEAVY_MODULES)
+    assert not heavy, f"'lht {command}' imports heavy dependencies: {', '.join(heavy)}"
+    assert lht_us / 1000 <= budget_ms, (
+        f"'lht {command}' spent {lht_us / 1000:.0f} ms importing LHT modules (budget {budget_ms} ms)"
+    )
@@ -0,0 +1,66 @@
+"""
+API limit reserve: new work stops at the reserve, work under way continues.
+
+None of these tests talk to Salesforce.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lht.salesforce import limits  # noqa: E402
+
+ACCESS_INFO = {'instance_url': 'https://limits.test', 'access_token': 'token'}
+BASE = 'https://limits.test/services/data/v58.0'
+
+
+@pytest.fixture
+def governor(monkeypatch):
+    """A governor with 5% of daily API requests left, below the 10% reserve."""
+    sleeps = []
+    monkeypatch.setattr(limits.time, 'sleep', sleeps.append)
+    governor = limits.ApiLimitsGovernor(ACCESS_INFO['instance_url'], max_delay_seconds=7.0)
+    governor.api_used, governor.api_max = 950, 1000
+    governor.limits_fetched_at = time.time()
+    governor.sleeps = sleeps
+    return governor
+
+
+def test_new_work_stops_at_the_reserve(governor):
+    with pytest.raises(limits.ApiLimitReserveError):
+        governor.before_request(ACCESS_INFO, 'bulk_query', creates_job=True)
+    with pytest.raises(limits.ApiLimitReserveError):
+        governor.before_request(ACCESS_INFO, 'describe')
+    with pytest.raises(limits.ApiLimitReserveError):
+        governor.before_request(ACCESS_INFO, 'query',
+                                new_work=limits.starts_new_work('query', f"{BASE}/query?q=SELECT+Id+FROM+Account"))
+    assert governor.sleeps == []
+
+
+def test_work_under_way_continues_at_the_reserve(governor):
+    governor.before_request(ACCESS_INFO, 'bulk_query')
+    governor.before_request(ACCESS_INFO, 'query',
+                            new_work=limits.starts_new_work('query', f"{BASE}/query/01gD0000002HU6KIAW-2000"))
+    assert governor.sleeps == [7.0, 7.0]
+    assert governor.snapshot()['throttled_seconds'] == 14.0
+
+
+def test_calls_above_the_reserve_are_not_stopped(governor):
+    governor.api_used = 500
+    governor.before_request(ACCESS_INFO, 'bulk_query', creates_job=True)
+    assert governor.sleeps == []
+
+
+def test_starts_new_work():
+    assert limits.starts_new_work('bulk_ingest', f"{BASE}/jobs/ingest", creates_job=True)
+    assert limits.starts_new_work('describe', f"{BASE}/sobjects/Account/describe")
+    assert limits.starts_new_work('query', f"{BASE}/queryAll?q=SELECT+Id+FROM+Contact")
+    assert not limits.starts_new_work('query', f"{BASE}/query/01gD0000002HU6KIAW-2000")
+    assert not limits.starts_new_work('bulk_query', f"{BASE}/jobs/query/750xx/results?locator=abc")
+    assert not limits.starts_new_work('bulk_ingest', f"{BASE}/jobs/ingest/750xx/")
@@ -0,0 +1,92 @@
+"""
+Parent-aware rETL partitioning: group-preserving CSV bodies, re-cut source
+batches and contention estimates.
+
+None of these tests talk to Salesforce or Snowflake.
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lht.util import csv  # noqa: E402
+from lht.salesforce import retl, retl_partition  # noqa: E402
+
+
+def _frame(parents, column='P'):
+    return pd.DataFrame({column: list(parents), 'Name': [f"n{i}" for i in range(len(parents))]})
+
+
+# ----------------------------------------------------------------------
+# csv_payloads with group_by
+# ----------------------------------------------------------------------
+def test_groups_are_not_cut_at_the_row_cap():
+    payloads = list(csv.csv_payloads([_frame('AABBBCC')], 10 ** 6, max_rows=4, group_by='P'))
+    assert [body.groups for body, _ in payloads] == [[['A', 2]], [['B', 3]], [['C', 2]]]
+
+
+def test_groups_larger_than_the_row_cap_are_split():
+    payloads = list(csv.csv_payloads([_frame('AAAAAB')], 10 ** 6, max_rows=2, group_by='P'))
+    assert [rows for _, rows in payloads] == [2, 2, 2]
+    assert [body.groups for body, _ in payloads] == [[['A', 2]], [['A', 2]], [['A', 1], ['B', 1]]]
+
+
+def test_groups_are_cut_on_boundaries_by_bytes():
+    df = _frame('A' * 5 + 'B' * 5 + 'C' * 5)
+    header = len(b'P,Name\r\n')
+    row = len(b'A,n10\r\n')
+    payloads = list(csv.csv_payloads([df], max_bytes=header + 8 * row, chunk_rows=4, group_by='P'))
+    for body, rows in payloads:
+        assert sum(count for _, count in body.groups) == rows
+    parents = [value for body, _ in payloads for value, _ in body.groups]
+    assert parents == ['A', 'B', 'C']
+
+
+def test_groups_continue_across_frames():
+    payloads = list(csv.csv_payloads([_frame('AA'), _frame('AB')], 10 ** 6, group_by='P'))
+    assert [body.groups for body, _ in payloads] == [[['A', 3], ['B', 1]]]
+
+
+
+# ----------------------------------------------------------------------
+# align_groups
+# ----------------------------------------------------------------------
+def test_align_groups_moves_trailing_group_to_next_frame():
+    frames = list(retl_partition.align_groups([_frame('AAB'), _frame('BBC'), _frame('CD')], 'P'))
+    assert [''.join(frame['P']) for frame in frames] == ['AA', 'BBB', 'CC', 'D']
+
+
+def test_align_groups_carries_a_group_spanning_several_frames():
+    frames = list(retl_partition.align_groups([_frame('AA'), _frame('AA'), pd.DataFrame(), _frame('AB')], 'P'))
+    assert [''.join(frame['P']) for frame in frames] == ['AAAAA', 'B']
+
+
+def test_contention_reports_shared_parents():
+    seen = set()
+    first = retl_partition.contention([['A', 2], ['B', 1]], seen, concurrent=True)
+    second = retl_partition.contention([['B', 1], [None, 3]], seen, concurrent=True)
+    assert (first['shared_parents'], first['risk']) == (0, 'none')
+    assert (second['parents'], second['shared_parents'], second['risk']) == (1, 1, 'high')
+
+
+def test_align_groups_passes_on_a_group_over_the_row_cap():
+    frames = list(retl_partition.align_groups([_frame('AA'), _frame('AA'), _frame('AA'), _frame('AB')], 'P', max_rows=3))
+    assert [''.join(frame['P']) for frame in frames] == ['AAAA', 'AAA', 'B']
+
+
+def test_align_groups_passes_on_a_group_over_the_byte_cap():
+    frames = list(retl_partition.align_groups([_frame('A' * 3)] * 4 + [_frame('B')], 'P', max_bytes=30))
+    assert [len(frame) for frame in frames] == [6, 6, 1]
+    assert max(len(csv._encode_rows(frame)) for frame in frames) < 60
+
+
+def test_parent_field_is_refused_with_changed_columns():
+    access_info = {'instance_url': 'https://partition.test', 'access_token': 'token'}
+    with pytest.raises(ValueError):
+        retl.upsert(None, access_info, 'Contact', 'SELECT 1', 'Ext__c', by_column=True, parent_field='AccountId')
@@ -0,0 +1,125 @@
+"""
+Pure rETL payload logic: CSV upload bodies.
+
+None of these tests talk to Salesforce or Snowflake.
+"""
+
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import requests
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lht.util import csv  # noqa: E402
+from lht.salesforce import client  # noqa: E402
+
+
+def _frame(parents, column='P'):
+    return pd.DataFrame({column: list(parents), 'Name': [f"n{i}" for i in range(len(parents))]})
+
+
+def _rows(body):
+    """Data rows of an upload body, header excluded."""
+    return pd.read_csv(io.BytesIO(body.getvalue()), dtype=str)
+
+
+# ----------------------------------------------------------------------
+# csv_payloads
+# ----------------------------------------------------------------------
+def test_payloads_match_dataframe_to_csv():
+    df = pd.DataFrame({'Ext__c': ['1', '2', '3'], 'Amount': [1.0, 2.5, None], 'Name': ['a', 'b,c', 'd']})
+    (body, rows), = csv.csv_payloads([df], 10 ** 6)
+    assert rows == 3
+    assert body.getvalue().decode('utf-8') == csv.dataframe_to_csv(df)
+
+
+def test_payloads_respect_max_bytes_and_repeat_header():
+    df = pd.DataFrame({'Name': [f"row-{i:04d}" for i in range(200)]})
+    payloads = list(csv.csv_payloads([df], max_bytes=300, chunk_rows=50))
+    assert len(payloads) > 1
+    assert sum(rows for _, rows in payloads) == 200
+    for body, rows in payloads:
+        assert len(body) <= 300
+        assert body.getvalue().startswith(b'Name\r\n')
+        assert len(_rows(body)) == rows
+    names = pd.concat([_rows(body) for body, _ in payloads], ignore_index=True)['Name']
+    assert list(names) == list(df['Name'])
+
+
+def test_payloads_halve_chunks_that_are_too_large():
+    # One chunk of 100 rows is far over the limit and must be halved until it fits
+    df = pd.DataFrame({'Name': ['x' * 20] * 100})
+    payloads = list(csv.csv_payloads([df], max_bytes=100, chunk_rows=100))
+    assert sum(rows for _, rows in payloads) == 100
+    assert all(len(body) <= 100 for body, _ in payloads)
+
+
+def test_payloads_respect_max_rows():
+    payloads = list(csv.csv_payloads([_frame('ABCDEFG')], 10 ** 6, max_rows=3))
+    assert [rows for _, rows in payloads] == [3, 3, 1]
+
+
+def test_payloads_reject_a_row_over_the_limit():
+    df = pd.DataFrame({'Name': ['x' * 500]})
+    with pytest.raises(ValueError):
+        list(csv.csv_payloads([df], max_bytes=100))
+
+
+def test_payloads_skip_empty_frames():
+    assert list(csv.csv_payloads([pd.DataFrame(), None], 10 ** 6)) == []
+
+
+# ----------------------------------------------------------------------
+# CsvBody
+# ----------------------------------------------------------------------
+def test_body_reads_across_chunks_and_seeks():
+    body = csv.CsvBody([b'abc', b'defg', b'h'])
+    assert len(body) == 8
+    assert body.read(2) == b'ab'
+    assert body.read(3) == b'cde'
+    assert body.tell() == 5
+    assert body.seek(4) == 4
+    assert body.read() == b'efgh'
+    assert body.read(10) == b''
+    body.seek(0)
+    assert body.read() == b'abcdefgh'
+
+
+def test_body_rejects_relative_seeks():
+    with pytest.raises(io.UnsupportedOperation):
+        csv.CsvBody([b'abc']).seek(0, io.SEEK_END)
+
+
+def test_retried_upload_resends_the_whole_body(monkeypatch):
+    access_info = {'instance_url': 'https://payloads.test', 'access_token': 'token'}
+    api = client.get_client(access_info)
+    monkeypatch.setattr(api, '_backoff', lambda attempt, retry_after, reason: None)
+
+    sent = []
+
+    class Response:
+        def __init__(self, status_code):
+            self.status_code = status_code
+            self.ok = status_code < 400
+            self.headers = {}
+
+    def send(method, url, call_type='rest', **kwargs):
+        data = kwargs['data']
+        if not sent:
+            # The first attempt fails after part of the body went out
+            sent.append(data.read(4))
+            raise requests.exceptions.ConnectionError('connection reset')
+        sent.append(data.read())
+        return Response(201)
+
+    monkeypatch.setattr(api, 'send', send)
+    body = csv.CsvBody([b'Name\r\n', b'a\r\n', b'b\r\n'])
+    response = client.put(access_info, 'https://payloads.test/batches/', call_type='bulk_ingest', data=body)
+    assert response.status_code == 201
+    assert sent == [b'Name', b'Name\r\na\r\nb\r\n']
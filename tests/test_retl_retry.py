@@ -0,0 +1,82 @@
+"""
+rETL failure triage: which failed records are re-driven and which are reported.
+
+None of these tests talk to Salesforce or Snowflake.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lht.salesforce import retl_retry  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def retry_settings():
+    saved = retl_retry.settings()
+    yield
+    retl_retry._defaults.update(saved)
+
+
+# ----------------------------------------------------------------------
+# split_failures
+# ----------------------------------------------------------------------
+FAILED_CSV = (
+    '"sf__Id","sf__Error","Ext__c","Name"\r\n'
+    '"","UNABLE_TO_LOCK_ROW:unable to obtain exclusive access to this record","1","a"\r\n'
+    '"","REQUIRED_FIELD_MISSING:Required fields are missing: [LastName]:LastName","2",""\r\n'
+    '"","SERVER_UNAVAILABLE:try again","3","c"\r\n'
+)
+
+
+def test_split_failures_classifies_by_status_code():
+    retry, permanent = retl_retry.split_failures(FAILED_CSV)
+    assert list(retry.columns) == ['sf__Error', 'Ext__c', 'Name']
+    assert list(retry['Ext__c']) == ['1', '3']
+    assert permanent == [{
+        'error': 'REQUIRED_FIELD_MISSING:Required fields are missing: [LastName]:LastName',
+        'record': {'Ext__c': '2', 'Name': ''},
+    }]
+    assert retl_retry.failure_codes(permanent + retl_retry.to_failures(retry)) == {
+        'REQUIRED_FIELD_MISSING': 1, 'UNABLE_TO_LOCK_ROW': 1, 'SERVER_UNAVAILABLE': 1,
+    }
+
+
+def test_split_failures_without_failures():
+    assert retl_retry.split_failures('') == (None, [])
+    assert retl_retry.split_failures('"sf__Id","sf__Error","Ext__c"\r\n') == (None, [])
+
+
+def test_split_failures_only_permanent():
+    retry, permanent = retl_retry.split_failures('"sf__Id","sf__Error","Ext__c"\r\n"","INVALID_FIELD:bad","9"\r\n')
+    assert retry is None
+    assert [failure['record'] for failure in permanent] == [{'Ext__c': '9'}]
+
+
+def test_error_code():
+    assert retl_retry.error_code('UNABLE_TO_LOCK_ROW:locked') == 'UNABLE_TO_LOCK_ROW'
+    assert retl_retry.error_code('') == 'UNKNOWN'
+    assert retl_retry.is_retryable('QUERY_TIMEOUT:slow')
+    assert not retl_retry.is_retryable('DUPLICATE_VALUE:dup')
+
+
+def test_unknown_exception_is_not_retried_by_default():
+    failed = '"sf__Id","sf__Error","Ext__c"\r\n"","UNKNOWN_EXCEPTION:trigger failed","7"\r\n'
+    retry, permanent = retl_retry.split_failures(failed)
+    assert retry is None
+    assert [failure['record'] for failure in permanent] == [{'Ext__c': '7'}]
+    assert not retl_retry.is_retryable('UNKNOWN_EXCEPTION:trigger failed')
+
+
+def test_extra_errors_are_retried_when_configured():
+    retl_retry.configure(extra_errors=['unknown_exception '])
+    failed = '"sf__Id","sf__Error","Ext__c"\r\n"","UNKNOWN_EXCEPTION:trigger failed","7"\r\n'
+    retry, permanent = retl_retry.split_failures(failed)
+    assert list(retry['Ext__c']) == ['7']
+    assert permanent == []
+    assert retl_retry.is_retryable('UNKNOWN_EXCEPTION:trigger failed')